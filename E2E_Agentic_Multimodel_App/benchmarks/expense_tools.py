@@ -0,0 +1,259 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import asyncio
+import base64
+import datetime
+import io
+import os
+import random
+import statistics
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterator, List
+
+from google.adk.artifacts import InMemoryArtifactService
+from PIL import Image, ImageDraw
+
+from benchmarks.fakes import FakeFirestore, FakeGenaiClient, FakeToolContext
+from bulk_import import import_receipts
+from clients import override_clients
+from expense_manager_agent import tools
+from expense_manager_agent.vector_index import LocalVectorIndex
+from schema import ImageData
+from settings import get_settings
+from utils import store_uploaded_image_as_artifact
+
+SETTINGS = get_settings()
+APP_NAME = "expense_manager_benchmark"
+STORES = [
+    "Indomaret", "Alfamart", "Starbucks", "Kopi Kenangan", "Hypermart", "Guardian",
+    "Gramedia", "Uniqlo", "Shell", "Pertamina", "McDonald's", "Burger King",
+]
+ITEMS = [
+    ("Coffee Latte", 45000), ("Mineral Water", 5000), ("Instant Noodles", 3500),
+    ("Rice 5kg", 75000), ("Shampoo", 32000), ("Toothpaste", 18000), ("T-Shirt", 149000),
+    ("Novel", 98000), ("Fuel", 150000), ("Cheeseburger", 35000), ("French Fries", 22000),
+    ("Chocolate Bar", 15000), ("Eggs 10pcs", 28000), ("Cooking Oil", 36000),
+]
+QUERIES = [
+    "coffee", "groceries at the supermarket", "fuel for the car", "fast food dinner",
+    "books", "clothes", "toiletries like shampoo", "snacks and chocolate",
+]
+START_DATE = datetime.datetime(2022, 1, 1, tzinfo=datetime.timezone.utc)
+DATE_RANGE_DAYS = 3 * 365
+
+
+def synthetic_receipts(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Generate deterministic receipt records in the bulk import format."""
+    rng = random.Random(seed)
+    for idx in range(count):
+        items = [
+            {"name": name, "price": price, "quantity": rng.randint(1, 3)}
+            for name, price in rng.sample(ITEMS, rng.randint(1, 5))
+        ]
+        timestamp = START_DATE + datetime.timedelta(seconds=rng.randrange(DATE_RANGE_DAYS * 86400))
+        yield {
+            "receipt_id": f"r{seed:03d}{idx:08d}",
+            "store_name": rng.choice(STORES),
+            "transaction_time": timestamp.strftime("%Y-%m-%dT%H:%M:%S.000000Z"),
+            "total_amount": float(sum(item["price"] * item["quantity"] for item in items)),
+            "currency": "IDR" if rng.random() < 0.9 else "USD",
+            "purchased_items": items,
+        }
+
+
+def synthetic_receipt_image(seed: int) -> bytes:
+    """Draw a unique receipt-like JPEG, so every upload has a distinct content hash."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", (900, 1400), "white")
+    draw = ImageDraw.Draw(image)
+    for line in range(40):
+        draw.text((60, 60 + line * 32), f"{rng.choice(ITEMS)[0]:<20} {rng.randint(1, 99999):>8}", fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+async def _measure(operations: List[Callable[[], Awaitable[Any]]]) -> List[float]:
+    """Run operations one after another, returning their latencies in milliseconds."""
+    latencies = []
+    for operation in operations:
+        start = time.perf_counter()
+        await operation()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(name: str, latencies: List[float], note: str = "") -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    total_seconds = sum(latencies) / 1000
+    print(
+        f"  {name:<16} n={len(latencies):<6} p50={statistics.median(ordered):8.2f} ms  "
+        f"p95={p95:8.2f} ms  max={ordered[-1]:8.2f} ms  "
+        f"{len(latencies) / total_seconds if total_seconds else 0:9.1f} ops/s  {note}"
+    )
+
+
+async def run_size(size: int, args: argparse.Namespace, embedder: FakeGenaiClient) -> None:
+    """Seed one user with size receipts, then benchmark store, metadata and hybrid search."""
+    user_id = f"benchmark-{size}-{uuid.uuid4().hex[:8]}"
+    context = FakeToolContext(user_id)
+    rng = random.Random(size)
+    print(f"{size} receipts (user {user_id})")
+
+    # Seed through the bulk import path, which also benchmarks it
+    start = time.perf_counter()
+    async for progress in import_receipts(user_id, list(synthetic_receipts(size)), checkpoint_id="benchmark"):
+        pass
+    seconds = time.perf_counter() - start
+    print(f"  {'bulk import':<16} n={progress.imported:<6} {progress.imported / seconds:9.1f} receipts/s")
+
+    # The local index is loaded from Firestore on the first vector search of each user
+    tools.VECTOR_INDEX = (
+        LocalVectorIndex(
+            tools.EMBEDDING_DIMENSION,
+            SETTINGS.VECTOR_INDEX_CONSISTENCY_CHECK_SECONDS,
+            max(SETTINGS.VECTOR_INDEX_MAX_VECTORS, size + args.operations),
+        )
+        if args.local_index
+        else None
+    )
+
+    # Store: upload the image to the artifact store, then store the extracted receipt
+    artifact_service = InMemoryArtifactService()
+    image_ids = []
+
+    async def upload(idx: int) -> None:
+        image_id, _, _ = await store_uploaded_image_as_artifact(
+            artifact_service,
+            APP_NAME,
+            user_id,
+            "benchmark-session",
+            ImageData(
+                serialized_image=base64.b64encode(synthetic_receipt_image(size + idx)).decode("utf-8"),
+                mime_type="image/jpeg",
+            ),
+        )
+        image_ids.append(image_id)
+
+    uploads = await _measure([lambda idx=idx: upload(idx) for idx in range(args.operations)])
+    _report("image upload", uploads)
+
+    records = list(synthetic_receipts(args.operations, seed=1))
+    requests_before = embedder.requests
+    stores = await _measure(
+        [
+            lambda image_id=image_id, record=record: tools.store_receipt_data(
+                image_id,
+                record["store_name"],
+                record["transaction_time"],
+                record["total_amount"],
+                record["purchased_items"],
+                record["currency"],
+                tool_context=context,
+            )
+            for image_id, record in zip(image_ids, records)
+        ]
+    )
+    _report("store receipt", stores, f"embedding requests={embedder.requests - requests_before}")
+
+    # Metadata search: random 30 day windows, first page
+    def window() -> tuple:
+        begin = START_DATE + datetime.timedelta(days=rng.randrange(DATE_RANGE_DAYS - 30))
+        end = begin + datetime.timedelta(days=30)
+        return begin.strftime("%Y-%m-%dT%H:%M:%S.000000Z"), end.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+
+    metadata = await _measure(
+        [
+            lambda bounds=window(): tools.search_receipts_by_metadata_filter(
+                bounds[0], bounds[1], tool_context=context
+            )
+            for _ in range(args.operations)
+        ]
+    )
+    _report("metadata search", metadata)
+
+    # Hybrid search (word lookup + vector search): queries repeat, so later ones hit the embedding cache
+    requests_before = embedder.requests
+    hybrid = await _measure(
+        [
+            lambda query=rng.choice(QUERIES): tools.search_relevant_receipts_by_natural_language_query(
+                query, tool_context=context
+            )
+            for _ in range(args.operations)
+        ]
+    )
+    _report(
+        "hybrid search",
+        hybrid,
+        f"embedding requests={embedder.requests - requests_before} "
+        f"local index={'on' if tools.VECTOR_INDEX is not None else 'off'}",
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    embedder = FakeGenaiClient(tools.EMBEDDING_DIMENSION)
+    for size in args.sizes:
+        if args.firestore == "emulator":
+            firestore_client = None
+        else:
+            # Fresh store per size, preallocating the vector matrix for the seeded receipts
+            firestore_client = FakeFirestore(vector_capacity=size + args.operations)
+
+        with override_clients(firestore_client=firestore_client, genai_client=embedder):
+            await run_size(size, args, embedder)
+
+    print(f"Embedding cache: {tools.get_embedding_cache_stats()}")
+
+
+def main() -> None:
+    """Command line entry point: python -m benchmarks.expense_tools --sizes 1000,100000"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the expense tools offline, with a fake embedder and local artifact store"
+    )
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000",
+        type=lambda value: [int(size) for size in value.split(",")],
+        help="Comma separated receipt counts to seed per run, e.g. 1000,100000,1000000 "
+        "(1M needs about 6 GB of RAM with the in-memory store)",
+    )
+    parser.add_argument("--operations", type=int, default=50, help="Calls measured per operation")
+    parser.add_argument(
+        "--firestore",
+        choices=["memory", "emulator"],
+        default="memory",
+        help="In-memory fake, or the Firestore emulator at FIRESTORE_EMULATOR_HOST",
+    )
+    parser.add_argument(
+        "--local-index",
+        action=argparse.BooleanOptionalAction,
+        default=SETTINGS.LOCAL_VECTOR_INDEX_ENABLED,
+        help="Answer vector searches from the in-process index instead of find_nearest",
+    )
+    args = parser.parse_args()
+
+    if args.firestore == "emulator" and not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        parser.error("--firestore emulator requires FIRESTORE_EMULATOR_HOST, e.g. localhost:8086")
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
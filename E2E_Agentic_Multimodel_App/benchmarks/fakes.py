@@ -0,0 +1,514 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import copy
+import hashlib
+import re
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from google.api_core.exceptions import AlreadyExists, InvalidArgument
+from google.cloud.firestore_v1.base_aggregation import AggregationResult
+from google.cloud.firestore_v1.base_query import BaseCompositeFilter
+from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
+from google.cloud.firestore_v1.vector import Vector
+
+# Vertex AI rejects embedding requests with more texts than this
+MAX_EMBEDDING_BATCH = 250
+DOCUMENT_ID_FIELD = "__name__"
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class FakeToolContext:
+    """The parts of an ADK ToolContext used by the expense tools."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.state: Dict[str, Any] = {}
+
+
+class FakeGenaiClient:
+    """
+    Deterministic stand-in for the Vertex AI genai client's embed_content().
+
+    Texts are embedded with the hashing trick over their lowercase words, so texts
+    sharing words are close in Euclidean distance and vector search results are
+    meaningful. Request and text counters show the effect of the embedding cache.
+    """
+
+    def __init__(self, dimension: int = 768):
+        self.dimension = dimension
+        self.requests = 0
+        self.texts = 0
+        self.models = SimpleNamespace(embed_content=self._embed_content_sync)
+        self.aio = SimpleNamespace(models=SimpleNamespace(embed_content=self._embed_content))
+
+    def embed(self, text: str) -> List[float]:
+        """Return the embedding of a single text, without counting a request."""
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in _TOKEN_PATTERN.findall(text.lower()):
+            digest = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            vector[digest % self.dimension] += 1.0 if digest & (1 << 63) else -1.0
+
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def _embed_content_sync(self, model: str, contents: Any, config: Any = None):
+        texts = [contents] if isinstance(contents, str) else list(contents)
+        if len(texts) > MAX_EMBEDDING_BATCH:
+            raise InvalidArgument(f"At most {MAX_EMBEDDING_BATCH} texts per request, got {len(texts)}")
+
+        self.requests += 1
+        self.texts += len(texts)
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=self.embed(text)) for text in texts]
+        )
+
+    async def _embed_content(self, model: str, contents: Any, config: Any = None):
+        return self._embed_content_sync(model, contents, config)
+
+
+class _VectorStore:
+    """Vectors of one field of one collection, kept in a float32 matrix instead of per document."""
+
+    def __init__(self, dimension: int, capacity: int):
+        self.matrix = np.zeros((max(capacity, 16), dimension), dtype=np.float32)
+        self.rows: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def put(self, doc_id: str, values: Vector) -> None:
+        row = self.rows.get(doc_id)
+        if row is None:
+            row = self._free.pop() if self._free else len(self.rows)
+            if row >= len(self.matrix):
+                grown = np.zeros((len(self.matrix) * 2, self.matrix.shape[1]), dtype=np.float32)
+                grown[: len(self.matrix)] = self.matrix
+                self.matrix = grown
+            self.rows[doc_id] = row
+        self.matrix[row] = values
+
+    def remove(self, doc_id: str) -> None:
+        row = self.rows.pop(doc_id, None)
+        if row is not None:
+            self._free.append(row)
+
+
+class _CollectionData:
+    """Documents of one collection path, with vector fields stored in _VectorStores."""
+
+    def __init__(self, vector_capacity: int):
+        self.docs: Dict[str, Dict[str, Any]] = {}
+        self.vectors: Dict[str, _VectorStore] = {}
+        self.vector_capacity = vector_capacity
+
+    def write(self, doc_id: str, data: Dict[str, Any]) -> None:
+        self.delete(doc_id)
+        stored = {}
+        for field, value in data.items():
+            if isinstance(value, Vector):
+                store = self.vectors.get(field)
+                if store is None:
+                    store = self.vectors[field] = _VectorStore(len(value), self.vector_capacity)
+                store.put(doc_id, value)
+            else:
+                # Firestore serializes documents, so later changes by the caller are not seen
+                stored[field] = copy.deepcopy(value)
+        self.docs[doc_id] = stored
+
+    def delete(self, doc_id: str) -> None:
+        self.docs.pop(doc_id, None)
+        for store in self.vectors.values():
+            store.remove(doc_id)
+
+    def read(self, doc_id: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        data = dict(self.docs[doc_id])
+        for field, store in self.vectors.items():
+            row = store.rows.get(doc_id)
+            if row is not None:
+                data[field] = Vector(store.matrix[row].tolist())
+
+        if fields is not None:
+            data = {field: data[field] for field in fields if field in data}
+        return data
+
+    def value(self, doc_id: str, field: str) -> Any:
+        if field == DOCUMENT_ID_FIELD:
+            return doc_id
+        return self.docs[doc_id].get(field)
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return None if self._data is None else dict(self._data)
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeFirestore", collection_path: str, doc_id: str):
+        self._client = client
+        self._collection_path = collection_path
+        self.id = doc_id
+        self.path = f"{collection_path}/{doc_id}"
+
+    def _data(self) -> _CollectionData:
+        return self._client._collection_data(self._collection_path)
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+    async def create(self, document_data: Dict[str, Any]) -> None:
+        if self.id in self._data().docs:
+            raise AlreadyExists(f"Document already exists: {self.path}")
+        self._data().write(self.id, document_data)
+
+    async def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        if merge and self.id in self._data().docs:
+            document_data = {**self._data().read(self.id), **document_data}
+        self._data().write(self.id, document_data)
+
+    async def delete(self) -> None:
+        self._data().delete(self.id)
+
+    async def get(self) -> FakeDocumentSnapshot:
+        data = self._data()
+        return FakeDocumentSnapshot(self, data.read(self.id) if self.id in data.docs else None)
+
+
+def _matches(value: Any, op: str, expected: Any) -> bool:
+    """Evaluate one field filter, values of different types never match (as in Firestore)."""
+    try:
+        if op == "==":
+            return value == expected
+        if op == "!=":
+            return value is not None and value != expected
+        if op == "<":
+            return value < expected
+        if op == "<=":
+            return value <= expected
+        if op == ">":
+            return value > expected
+        if op == ">=":
+            return value >= expected
+        if op == "in":
+            return value in expected
+        if op == "not-in":
+            return value is not None and value not in expected
+        if op == "array_contains":
+            return isinstance(value, list) and expected in value
+        if op == "array_contains_any":
+            return isinstance(value, list) and any(item in value for item in expected)
+    except TypeError:
+        return False
+
+    raise ValueError(f"Unsupported filter operator: {op}")
+
+
+class FakeQuery:
+    """The query subset used by the expense tools: filters, ordering, cursors, projection, limits."""
+
+    def __init__(
+        self,
+        client: "FakeFirestore",
+        collection_path: str,
+        filters: Tuple[Tuple[str, str, Any], ...] = (),
+        orders: Tuple[Tuple[str, bool], ...] = (),
+        cursor: Optional[Dict[str, Any]] = None,
+        limit_count: Optional[int] = None,
+        projection: Optional[List[str]] = None,
+    ):
+        self._client = client
+        self._collection_path = collection_path
+        self._filters = filters
+        self._orders = orders
+        self._cursor = cursor
+        self._limit = limit_count
+        self._projection = projection
+
+    def _copy(self, **changes: Any) -> "FakeQuery":
+        arguments = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "cursor": self._cursor,
+            "limit_count": self._limit,
+            "projection": self._projection,
+        }
+        arguments.update(changes)
+        return FakeQuery(self._client, self._collection_path, **arguments)
+
+    def where(self, field_path: str = None, op_string: str = None, value: Any = None, filter=None) -> "FakeQuery":
+        return self._copy(filters=self._filters + tuple(_flatten_filter(field_path, op_string, value, filter)))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(orders=self._orders + ((field_path, direction == "DESCENDING"),))
+
+    def start_after(self, document_fields: Dict[str, Any]) -> "FakeQuery":
+        return self._copy(cursor=document_fields)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit_count=count)
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        return self._copy(projection=list(field_paths))
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).count(alias)
+
+    def sum(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).sum(field_ref, alias)
+
+    def avg(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return FakeAggregationQuery(self).avg(field_ref, alias)
+
+    def find_nearest(
+        self,
+        vector_field: str,
+        query_vector: Vector,
+        limit: int,
+        distance_measure: DistanceMeasure,
+        distance_result_field: Optional[str] = None,
+        distance_threshold: Optional[float] = None,
+    ) -> "FakeVectorQuery":
+        return FakeVectorQuery(self, vector_field, query_vector, limit, distance_measure)
+
+    def _matching_ids(self) -> List[str]:
+        data = self._client._collection_data(self._collection_path)
+        ids = [
+            doc_id
+            for doc_id in data.docs
+            if all(_matches(data.value(doc_id, field), op, value) for field, op, value in self._filters)
+        ]
+
+        # Firestore orders by the explicit order_by fields, then by document ID
+        orders = self._orders
+        if DOCUMENT_ID_FIELD not in [field for field, _ in orders]:
+            orders += ((DOCUMENT_ID_FIELD, orders[-1][1] if orders else False),)
+        # Documents missing an order_by field are excluded, as in Firestore
+        ids = [doc_id for doc_id in ids if all(data.value(doc_id, field) is not None for field, _ in orders)]
+        # Stable sorts from the last key to the first give a multi-key order with mixed directions
+        for field, descending in reversed(orders):
+            ids.sort(key=lambda doc_id: data.value(doc_id, field), reverse=descending)
+
+        if self._cursor is not None:
+            if any(descending for _, descending in orders):
+                raise ValueError("The fake only supports cursors on ascending orders")
+            orders = [field for field, _ in orders]
+            cursor = tuple(self._cursor.get(field) for field in orders[: len(self._cursor)])
+            ids = [
+                doc_id
+                for doc_id in ids
+                if tuple(data.value(doc_id, field) for field in orders[: len(cursor)]) > cursor
+            ]
+
+        return ids if self._limit is None else ids[: self._limit]
+
+    async def stream(self) -> AsyncIterator[FakeDocumentSnapshot]:
+        data = self._client._collection_data(self._collection_path)
+        for doc_id in self._matching_ids():
+            reference = FakeDocumentReference(self._client, self._collection_path, doc_id)
+            yield FakeDocumentSnapshot(reference, data.read(doc_id, self._projection))
+
+    async def get(self) -> List[FakeDocumentSnapshot]:
+        return [snapshot async for snapshot in self.stream()]
+
+
+def _flatten_filter(field_path, op_string, value, filter) -> List[Tuple[str, str, Any]]:
+    """Turn a where() call into (field, operator, value) conditions, only AND is supported."""
+    if filter is None:
+        return [(field_path, op_string, value)]
+    if isinstance(filter, BaseCompositeFilter):
+        if filter.operator.name != "AND":
+            raise ValueError("The fake only supports AND composite filters")
+        conditions = []
+        for child in filter.filters:
+            conditions.extend(_flatten_filter(None, None, None, child))
+        return conditions
+    return [(filter.field_path, filter.op_string, filter.value)]
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: "FakeFirestore", path: str):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+        self.path = path
+
+    def document(self, document_id: str) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, self.path, document_id)
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: FakeQuery):
+        self._query = query
+        self._aggregations: List[Tuple[str, Optional[str], str]] = []
+
+    def _add(self, kind: str, field: Optional[str], alias: Optional[str]) -> "FakeAggregationQuery":
+        self._aggregations.append((kind, field, alias or f"field_{len(self._aggregations) + 1}"))
+        return self
+
+    def count(self, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return self._add("count", None, alias)
+
+    def sum(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return self._add("sum", field_ref, alias)
+
+    def avg(self, field_ref: str, alias: Optional[str] = None) -> "FakeAggregationQuery":
+        return self._add("avg", field_ref, alias)
+
+    async def get(self) -> List[List[AggregationResult]]:
+        data = self._query._client._collection_data(self._query._collection_path)
+        ids = self._query._matching_ids()
+
+        results = []
+        for kind, field, alias in self._aggregations:
+            if kind == "count":
+                results.append(AggregationResult(alias=alias, value=len(ids)))
+                continue
+
+            numbers = [
+                value
+                for value in (data.value(doc_id, field) for doc_id in ids)
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            ]
+            if kind == "sum":
+                value = sum(numbers)
+            else:
+                value = sum(numbers) / len(numbers) if numbers else None
+            results.append(AggregationResult(alias=alias, value=value))
+
+        return [results]
+
+
+class FakeVectorQuery:
+    """Exact nearest neighbour search over the documents matching the base query."""
+
+    def __init__(
+        self,
+        query: FakeQuery,
+        vector_field: str,
+        query_vector: Vector,
+        limit: int,
+        distance_measure: DistanceMeasure,
+    ):
+        self._query = query
+        self._vector_field = vector_field
+        self._query_vector = np.asarray(list(query_vector), dtype=np.float32)
+        self._limit = limit
+        self._distance_measure = distance_measure
+
+    async def stream(self) -> AsyncIterator[FakeDocumentSnapshot]:
+        client = self._query._client
+        data = client._collection_data(self._query._collection_path)
+        store = data.vectors.get(self._vector_field)
+        if store is None or not store.rows:
+            return
+
+        if self._query._filters:
+            ids = [doc_id for doc_id in self._query._matching_ids() if doc_id in store.rows]
+        else:
+            ids = list(store.rows)
+        if not ids:
+            return
+
+        rows = np.fromiter((store.rows[doc_id] for doc_id in ids), dtype=np.int64, count=len(ids))
+        vectors = store.matrix[rows]
+        if self._distance_measure == DistanceMeasure.EUCLIDEAN:
+            scores = np.linalg.norm(vectors - self._query_vector, axis=1)
+        elif self._distance_measure == DistanceMeasure.COSINE:
+            norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(self._query_vector)
+            scores = 1.0 - (vectors @ self._query_vector) / np.where(norms == 0, 1.0, norms)
+        else:
+            # Larger dot products are closer
+            scores = -(vectors @ self._query_vector)
+
+        limit = min(self._limit, len(ids))
+        nearest = np.argpartition(scores, limit - 1)[:limit]
+        for idx in nearest[np.argsort(scores[nearest])]:
+            reference = FakeDocumentReference(client, self._query._collection_path, ids[idx])
+            yield FakeDocumentSnapshot(reference, data.read(ids[idx]))
+
+
+class FakeWriteBatch:
+    def __init__(self):
+        self._writes: List[Tuple[FakeDocumentReference, Dict[str, Any], bool]] = []
+
+    def _add(self, reference: FakeDocumentReference, document_data: Dict[str, Any], create: bool) -> None:
+        if len(self._writes) == 500:
+            raise InvalidArgument("A write batch cannot contain more than 500 operations")
+        self._writes.append((reference, copy.deepcopy(document_data), create))
+
+    def set(self, reference: FakeDocumentReference, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._add(reference, document_data, create=False)
+
+    def create(self, reference: FakeDocumentReference, document_data: Dict[str, Any]) -> None:
+        self._add(reference, document_data, create=True)
+
+    async def commit(self) -> None:
+        # The batch is atomic, nothing is written when one of its creates conflicts
+        for reference, _, create in self._writes:
+            if create and reference.id in reference._data().docs:
+                raise AlreadyExists(f"Document already exists: {reference.path}")
+        for reference, document_data, _ in self._writes:
+            reference._data().write(reference.id, document_data)
+        self._writes = []
+
+
+class FakeFirestore:
+    """
+    In-memory stand-in for firestore.AsyncClient, covering what the expense app uses.
+
+    Queries scan every document of the collection (there are no indexes), and
+    find_nearest() is an exact search. Vector fields are stored in a float32 matrix
+    per collection, so one million 768 dimensional receipts take about 3 GB.
+    """
+
+    def __init__(self, vector_capacity: int = 1024):
+        """
+        Args:
+            vector_capacity: Initial vector rows allocated per collection, set it to the
+                expected collection size to avoid reallocations while seeding.
+        """
+        self.vector_capacity = vector_capacity
+        self._collections: Dict[str, _CollectionData] = {}
+
+    def _collection_data(self, path: str) -> _CollectionData:
+        if path not in self._collections:
+            self._collections[path] = _CollectionData(self.vector_capacity)
+        return self._collections[path]
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch()
+
+    async def get_all(
+        self, references: List[FakeDocumentReference], field_paths: Optional[List[str]] = None
+    ) -> AsyncIterator[FakeDocumentSnapshot]:
+        for reference in references:
+            data = reference._data()
+            yield FakeDocumentSnapshot(
+                reference, data.read(reference.id, field_paths) if reference.id in data.docs else None
+            )
@@ -0,0 +1,90 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter, so every sample pays the full cold import
+PROBE = """
+import json, time
+start = time.perf_counter()
+import expense_manager_agent
+import utils
+imported = time.perf_counter() - start
+
+import clients
+factories = (clients._create_firestore_client, clients._create_genai_client)
+eager_clients = [f.__name__ for f in factories if f.cache_info().currsize]
+
+# Building clients needs credentials but no network round trip
+try:
+    start = time.perf_counter()
+    clients.get_firestore_client()
+    clients.get_genai_client()
+    first_clients = time.perf_counter() - start
+except Exception:
+    first_clients = None
+
+print(json.dumps({"import": imported, "clients": first_clients, "eager_clients": eager_clients}))
+"""
+
+
+def _run_probe() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Command line entry point: python -m benchmarks.startup --runs 5"""
+    parser = argparse.ArgumentParser(
+        description="Measure the cold import time of the expense agent and its first client construction"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    args = parser.parse_args()
+
+    samples = [_run_probe() for _ in range(args.runs)]
+    eager_clients = sorted({name for sample in samples for name in sample["eager_clients"]})
+
+    for key, label in (("import", "import expense_manager_agent, utils"), ("clients", "first Firestore + genai client")):
+        values = [sample[key] * 1000 for sample in samples if sample[key] is not None]
+        if not values:
+            print(f"{label}: skipped, no Google Cloud credentials")
+            continue
+        print(
+            f"{label}: median {statistics.median(values):.1f} ms, "
+            f"min {min(values):.1f} ms, max {max(values):.1f} ms ({len(values)} runs)"
+        )
+
+    if eager_clients:
+        print(f"Clients constructed at import: {', '.join(eager_clients)}", file=sys.stderr)
+        sys.exit(1)
+    print("No clients constructed at import")
+
+
+if __name__ == "__main__":
+    main()
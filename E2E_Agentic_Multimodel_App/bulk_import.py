@@ -0,0 +1,314 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import sys
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+from google.cloud.firestore_v1.async_collection import AsyncCollectionReference
+from google.cloud.firestore_v1.vector import Vector
+
+from clients import get_firestore_client
+from expense_manager_agent.tools import (
+    EMBEDDING_FIELD_NAME,
+    VECTOR_INDEX,
+    build_receipt_document,
+    embed_texts,
+    get_receipt_collection,
+    get_user_collection,
+    sanitize_image_id,
+)
+from schema import BulkImportProgress
+import logger
+
+# Firestore rejects write batches with more than 500 operations
+MAX_BATCH_WRITES = 500
+MAX_REPORTED_ERRORS = 20
+CHECKPOINT_COLLECTION_NAME = "bulk-import-checkpoints"
+
+
+def load_receipts_file(path: str) -> List[Dict[str, Any]]:
+    """
+    Read receipt records from a CSV, JSON or JSON Lines file.
+
+    CSV files need store_name, transaction_time and total_amount columns, and may have
+    receipt_id, currency and purchased_items (a JSON encoded list of items) columns.
+
+    Args:
+        path (str): Path of the file to read.
+
+    Returns:
+        List[Dict[str, Any]]: The receipt records in file order.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(file))
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in file if line.strip()]
+        return json.load(file)
+
+
+def default_checkpoint_id(records: List[Dict[str, Any]]) -> str:
+    """Derive a checkpoint ID from the content, so re-running the same import resumes it."""
+    digest = hashlib.sha256(
+        json.dumps(records, sort_keys=True, default=str).encode("utf-8")
+    )
+    return digest.hexdigest()[:16]
+
+
+def _receipt_id(record: Dict[str, Any]) -> str:
+    """Use the record's receipt ID, or a stable hash of its content for receipts without an image."""
+    if record.get("receipt_id"):
+        return sanitize_image_id(str(record["receipt_id"]))
+
+    content = json.dumps(
+        [record.get(key) for key in ("store_name", "transaction_time", "total_amount", "purchased_items")],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+
+
+def _normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a raw record (e.g. a CSV row of strings) into build_receipt_document arguments."""
+    purchased_items = record.get("purchased_items") or []
+    if isinstance(purchased_items, str):
+        purchased_items = json.loads(purchased_items)
+
+    return {
+        "image_id": _receipt_id(record),
+        "store_name": str(record["store_name"]),
+        "transaction_time": str(record["transaction_time"]),
+        "total_amount": float(record["total_amount"]),
+        "purchased_items": purchased_items,
+        "currency": record.get("currency") or "IDR",
+    }
+
+
+async def _with_retries(operation, retries: int, description: str):
+    """Await operation() with exponential backoff, re-raising after the last attempt."""
+    for attempt in range(retries + 1):
+        try:
+            return await operation()
+        except AlreadyExists:
+            # A conflict does not go away by retrying
+            raise
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 2**attempt
+            logger.warning(f"{description} failed ({e}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+
+async def _stored_receipt_ids(
+    collection: AsyncCollectionReference, documents: List[Dict[str, Any]]
+) -> Set[str]:
+    """Return the IDs of the documents already stored, read with one batched get_all()."""
+    references = [collection.document(doc["receipt_id"]) for doc in documents]
+    stored = set()
+    async for snapshot in get_firestore_client().get_all(references, field_paths=["receipt_id"]):
+        if snapshot.exists:
+            stored.add(snapshot.id)
+    return stored
+
+
+async def _commit_receipts(
+    collection: AsyncCollectionReference,
+    documents: List[Dict[str, Any]],
+    overwrite: bool,
+    retries: int,
+) -> int:
+    """
+    Write receipt documents with one WriteBatch and return how many were written.
+
+    Without overwrite the documents are written with create(). If store_receipt_data
+    stored one of them since the existence check, the whole batch is rejected, and it
+    is committed again without the receipts that now exist.
+    """
+    while documents:
+        batch = get_firestore_client().batch()
+        for doc in documents:
+            reference = collection.document(doc["receipt_id"])
+            if overwrite:
+                batch.set(reference, doc)
+            else:
+                batch.create(reference, doc)
+        try:
+            await _with_retries(batch.commit, retries, "Firestore batch commit")
+            return len(documents)
+        except AlreadyExists:
+            stored = await _stored_receipt_ids(collection, documents)
+            documents = [doc for doc in documents if doc["receipt_id"] not in stored]
+    return 0
+
+
+async def import_receipts(
+    user_id: str,
+    records: List[Dict[str, Any]],
+    checkpoint_id: Optional[str] = None,
+    batch_size: int = MAX_BATCH_WRITES,
+    retries: int = 3,
+    overwrite: bool = False,
+) -> AsyncIterator[BulkImportProgress]:
+    """
+    Import receipts for a user, yielding progress after every committed batch.
+
+    Each batch of records is validated, checked against the stored receipts with one
+    get_all(), embedded with batched embedding requests and written with one Firestore
+    WriteBatch. Receipts already stored under the same receipt ID (e.g. through
+    store_receipt_data) are counted as existing and left unchanged, so replaying a
+    batch is idempotent. After each commit the position is saved under the user's bulk
+    import checkpoints, and calling this again with the same records (or checkpoint_id)
+    continues after the last committed batch.
+
+    Args:
+        user_id (str): The user owning the receipts.
+        records (List[Dict[str, Any]]): Receipt records, see load_receipts_file().
+        checkpoint_id (str, optional): Checkpoint to resume, derived from the records if omitted.
+        batch_size (int): Receipts per WriteBatch, at most 500.
+        retries (int): Retries of a failed embedding request or batch commit.
+        overwrite (bool): Replace stored receipts instead of skipping them, e.g. to
+            rebuild their search terms and embeddings.
+
+    Yields:
+        BulkImportProgress: Cumulative progress, the last update has done set.
+
+    Raises:
+        Exception: If a batch still fails after the retries. Progress up to the last
+            committed batch is kept in the checkpoint.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_WRITES))
+    checkpoint_id = checkpoint_id or default_checkpoint_id(records)
+    checkpoint_ref = (
+        get_user_collection().document(user_id)
+        .collection(CHECKPOINT_COLLECTION_NAME)
+        .document(checkpoint_id)
+    )
+    collection = get_receipt_collection(user_id)
+
+    checkpoint = await checkpoint_ref.get()
+    progress = BulkImportProgress(total=len(records))
+    if checkpoint.exists:
+        progress = BulkImportProgress(**checkpoint.to_dict())
+        progress.total = len(records)
+        logger.info(f"Resuming bulk import {checkpoint_id} at record {progress.processed}")
+
+    reported = False
+    while progress.processed < progress.total:
+        chunk = records[progress.processed : progress.processed + batch_size]
+
+        documents, descriptions, receipt_ids = [], [], set()
+        for offset, record in enumerate(chunk):
+            try:
+                doc, description = build_receipt_document(**_normalize_record(record))
+            except (KeyError, TypeError, ValueError) as e:
+                progress.skipped += 1
+                reason = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+                if len(progress.errors) < MAX_REPORTED_ERRORS:
+                    progress.errors.append(f"Record {progress.processed + offset}: {reason}")
+                continue
+            if doc["receipt_id"] in receipt_ids:
+                # Repeated in the same batch, only the first record is imported
+                progress.existing += 1
+                continue
+            receipt_ids.add(doc["receipt_id"])
+            documents.append(doc)
+            descriptions.append(description)
+
+        if documents and not overwrite:
+            stored = await _with_retries(
+                lambda: _stored_receipt_ids(collection, documents), retries, "Stored receipt lookup"
+            )
+            new = [idx for idx, doc in enumerate(documents) if doc["receipt_id"] not in stored]
+            documents = [documents[idx] for idx in new]
+            descriptions = [descriptions[idx] for idx in new]
+
+        imported = 0
+        if documents:
+            # One-off descriptions would only evict the cached search queries
+            embeddings = await _with_retries(
+                lambda: embed_texts(descriptions, use_cache=False), retries, "Embedding batch"
+            )
+            for doc, embedding in zip(documents, embeddings):
+                doc[EMBEDDING_FIELD_NAME] = Vector(embedding)
+            imported = await _commit_receipts(collection, documents, overwrite, retries)
+
+        progress.imported += imported
+        progress.existing += len(receipt_ids) - imported
+        progress.processed += len(chunk)
+        progress.done = progress.processed >= progress.total
+        await checkpoint_ref.set(
+            {**progress.model_dump(), "updated_at": firestore.SERVER_TIMESTAMP}
+        )
+
+        reported = True
+        yield progress.model_copy(deep=True)
+
+    if VECTOR_INDEX is not None:
+        # Bulk writes bypass the index, reload it from Firestore on the next search
+        VECTOR_INDEX.invalidate(user_id)
+
+    if not reported:
+        # Nothing left to import, e.g. an empty file or an already completed checkpoint
+        progress.done = True
+        yield progress
+
+
+async def _run_cli(args: argparse.Namespace) -> int:
+    records = load_receipts_file(args.file)
+    try:
+        async for progress in import_receipts(
+            args.user_id, records, args.checkpoint_id, args.batch_size, args.retries, args.overwrite
+        ):
+            print(
+                f"[{progress.processed}/{progress.total}] imported={progress.imported} "
+                f"existing={progress.existing} skipped={progress.skipped}",
+                flush=True,
+            )
+    except Exception as e:
+        print(f"Import interrupted: {e}. Re-run the same command to resume.", file=sys.stderr)
+        return 1
+
+    for error in progress.errors:
+        print(f"Skipped {error}", file=sys.stderr)
+    return 0
+
+
+def main() -> None:
+    """Command line entry point: python bulk_import.py receipts.csv --user-id alice"""
+    parser = argparse.ArgumentParser(description="Bulk import receipts into Firestore")
+    parser.add_argument("file", help="CSV, JSON or JSON Lines file with receipt records")
+    parser.add_argument("--user-id", required=True, help="User owning the receipts")
+    parser.add_argument(
+        "--checkpoint-id", default=None, help="Checkpoint to resume (default: derived from the file content)"
+    )
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_WRITES)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument(
+        "--overwrite", action="store_true", help="Replace receipts that are already stored instead of skipping them"
+    )
+    sys.exit(asyncio.run(_run_cli(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import contextlib
+import functools
+from typing import Any, Dict, Iterator
+
+from settings import get_settings
+
+SETTINGS = get_settings()
+# Clients installed by override_clients(), e.g. the offline fakes in benchmarks/fakes.py
+_OVERRIDES: Dict[str, Any] = {}
+
+
+@contextlib.contextmanager
+def override_clients(firestore_client: Any = None, genai_client: Any = None) -> Iterator[None]:
+    """
+    Make the client factories return the given clients instead of the real ones.
+
+    Used to run the tools against the Firestore emulator, in-memory fakes or a fake
+    embedder. Clients left as None keep their real factory.
+
+    Args:
+        firestore_client: Replacement for get_firestore_client().
+        genai_client: Replacement for get_genai_client().
+    """
+    previous = dict(_OVERRIDES)
+    for name, client in (("firestore", firestore_client), ("genai", genai_client)):
+        if client is not None:
+            _OVERRIDES[name] = client
+    try:
+        yield
+    finally:
+        _OVERRIDES.clear()
+        _OVERRIDES.update(previous)
+
+
+def get_firestore_client():
+    """Return the process-wide Firestore AsyncClient.
+
+    The client, and with it the gRPC channel, is created on first use and then
+    shared by every tool and request. Like any asyncio gRPC client, it must be
+    used from a single event loop.
+
+    Returns:
+        google.cloud.firestore.AsyncClient: The shared client for the "(default)" database.
+    """
+    if "firestore" in _OVERRIDES:
+        return _OVERRIDES["firestore"]
+    return _create_firestore_client()
+
+
+@functools.lru_cache(maxsize=None)
+def _create_firestore_client():
+    from google.cloud import firestore
+
+    return firestore.AsyncClient(project=SETTINGS.GCLOUD_PROJECT_ID)
+
+
+def get_genai_client():
+    """Return the process-wide Vertex AI genai client, sharing one HTTP connection pool.
+
+    Returns:
+        google.genai.Client: The shared client.
+    """
+    if "genai" in _OVERRIDES:
+        return _OVERRIDES["genai"]
+    return _create_genai_client()
+
+
+@functools.lru_cache(maxsize=None)
+def _create_genai_client():
+    from google import genai
+
+    return genai.Client(
+        vertexai=True, location=SETTINGS.GCLOUD_LOCATION, project=SETTINGS.GCLOUD_PROJECT_ID
+    )
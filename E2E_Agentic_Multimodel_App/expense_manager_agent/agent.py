@@ -2,14 +2,18 @@
 
 from google.adk.agents import Agent
 from expense_manager_agent.tools import (
-    store_receipt_data,
+    extract_and_store_receipt,
+    extract_receipts_before_model,
     search_receipts_by_metadata_filter,
     search_relevant_receipts_by_natural_language_query,
     get_receipt_data_by_image_id,
+    get_expense_summary,
 )
 from expense_manager_agent.callbacks import modify_image_data_in_history
+import functools
 import os
 from settings import get_settings
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.planners import BuiltInPlanner
 from google.genai import types
 
@@ -18,11 +22,21 @@ os.environ["GOOGLE_CLOUD_PROJECT"] = SETTINGS.GCLOUD_PROJECT_ID
 os.environ["GOOGLE_CLOUD_LOCATION"] = SETTINGS.GCLOUD_LOCATION
 os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "TRUE"
 
-# Get the code file directory path and read the task prompt file
+# Get the code file directory path, the task prompt file is read on the first model call
 current_dir = os.path.dirname(os.path.abspath(__file__))
 prompt_path = os.path.join(current_dir, "task_prompt.md")
-with open(prompt_path, "r") as file:
-    task_prompt = file.read()
+
+
+@functools.lru_cache(maxsize=None)
+def read_task_prompt() -> str:
+    with open(prompt_path, "r") as file:
+        return file.read()
+
+
+def task_prompt(context: ReadonlyContext) -> str:
+    # Instruction provider, the prompt has no session state placeholders
+    return read_task_prompt()
+
 
 root_agent = Agent(
     name="expense_manager_agent",
@@ -32,15 +46,17 @@ root_agent = Agent(
     ),
     instruction=task_prompt,
     tools=[
-        store_receipt_data,
+        extract_and_store_receipt,
         get_receipt_data_by_image_id,
         search_receipts_by_metadata_filter,
         search_relevant_receipts_by_natural_language_query,
+        get_expense_summary,
     ],
     planner=BuiltInPlanner(
         thinking_config=types.ThinkingConfig(
             thinking_budget=2048,
         )
     ),
-    before_model_callback=modify_image_data_in_history,
+    # Receipts are extracted and stored before the agent model sees the request
+    before_model_callback=[extract_receipts_before_model, modify_image_data_in_history],
 )
\ No newline at end of file
@@ -1,55 +1,146 @@
 # expense_manager_agent/callbacks.py
 
 import hashlib
+import io
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 from google.genai import types
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models.llm_request import LlmRequest
+from PIL import Image
+from settings import get_settings
 
+SETTINGS = get_settings()
+# Session state key mapping image IDs to a one-line description of the stored receipt
+RECEIPT_DESCRIPTIONS_STATE_KEY = "receipt_descriptions"
+# Gemini bills an image up to 384x384 as 258 tokens, larger images as 258 tokens per 768x768 tile
+IMAGE_TOKENS_PER_TILE = 258
+IMAGE_SMALL_DIMENSION = 384
+IMAGE_TILE_DIMENSION = 768
 
-def modify_image_data_in_history(
-    callback_context: CallbackContext, llm_request: LlmRequest
-) -> None:
-    # The following code will modify the request sent to LLM
-    # We will only keep image data in the last 3 user messages using a reverse and counter approach
 
-    # Count how many user messages we've processed
-    user_message_count = 0
+def format_receipt_description(receipt: Dict[str, Any]) -> str:
+    """Summarize stored receipt data in one line, used in place of its image in older turns."""
+    items = receipt.get("purchased_items") or []
+    return (
+        f"Receipt {receipt.get('receipt_id', '')}: {receipt.get('store_name', '')}, "
+        f"{receipt.get('transaction_time', '')}, total {receipt.get('total_amount', '')} "
+        f"{receipt.get('currency', '')}, {len(items)} items"
+    )
 
-    # Process the reversed list
-    for content in reversed(llm_request.contents):
-        # Only count for user manual query, not function call
-        if (content.role == "user") and (content.parts[0].function_response is None):
-            user_message_count += 1
-            modified_content_parts = []
 
-            # Check any missing image ID placeholder for any image data
-            # Then remove image data from conversation history if more than 3 user messages
+def estimate_image_tokens(image_data: bytes) -> int:
+    """Estimate the prompt tokens of an image from its dimensions (only the header is decoded)."""
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            width, height = image.size
+    except Exception:
+        # Unknown format, assume a single tile
+        return IMAGE_TOKENS_PER_TILE
+
+    if width <= IMAGE_SMALL_DIMENSION and height <= IMAGE_SMALL_DIMENSION:
+        return IMAGE_TOKENS_PER_TILE
+
+    tiles = math.ceil(width / IMAGE_TILE_DIMENSION) * math.ceil(height / IMAGE_TILE_DIMENSION)
+    return tiles * IMAGE_TOKENS_PER_TILE
+
+
+class MultimodalContextManager:
+    """
+    before_model_callback that bounds the image content sent to the model.
+
+    Walking from the newest user message to the oldest, images are kept while
+    their estimated tokens fit in the image token budget. Images of the latest
+    user message are always kept. Older images are replaced with the description
+    of the stored receipt (recorded in session state by the receipt tools) or
+    just their [IMAGE-ID <hash-id>] placeholder. Token estimates are cached by
+    image ID, taken from the placeholder following the image when there is one, so
+    each image is measured only once and the cache holds no image bytes.
+    """
+
+    def __init__(self, image_token_budget: int, max_cached_images: int = 1024):
+        """
+        Args:
+            image_token_budget: Maximum estimated image tokens kept in a model request.
+            max_cached_images: Number of image IDs whose token estimate is cached.
+        """
+        self.image_token_budget = image_token_budget
+        self.max_cached_images = max_cached_images
+        # Image ID -> estimated tokens, in least recently used order
+        self._image_tokens: "OrderedDict[str, int]" = OrderedDict()
+
+    def image_info(self, image_data: bytes, image_hash_id: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Return the image ID and estimated tokens of image data, measuring each image once.
+
+        Args:
+            image_data: The image bytes.
+            image_hash_id: The image ID from the placeholder, hashed from the data if omitted.
+        """
+        if image_hash_id is None:
+            image_hash_id = hashlib.sha256(image_data).hexdigest()[:12]
+
+        tokens = self._image_tokens.get(image_hash_id)
+        if tokens is not None:
+            self._image_tokens.move_to_end(image_hash_id)
+            return image_hash_id, tokens
+
+        tokens = estimate_image_tokens(image_data)
+        self._image_tokens[image_hash_id] = tokens
+        while len(self._image_tokens) > self.max_cached_images:
+            self._image_tokens.popitem(last=False)
+
+        return image_hash_id, tokens
+
+    def __call__(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[types.Content]:
+        descriptions = callback_context.state.get(RECEIPT_DESCRIPTIONS_STATE_KEY) or {}
+        remaining_tokens = self.image_token_budget
+        is_latest_message = True
+
+        # Process the reversed list, so the budget goes to the most recent images
+        for content in reversed(llm_request.contents):
+            # Only count for user manual query, not function call
+            if content.role != "user" or content.parts[0].function_response is not None:
+                continue
+
+            modified_content_parts = []
             for idx, part in enumerate(content.parts):
                 if part.inline_data is None:
                     modified_content_parts.append(part)
                     continue
 
-                if (
-                    (idx + 1 >= len(content.parts))
-                    or (content.parts[idx + 1].text is None)
-                    or (not content.parts[idx + 1].text.startswith("[IMAGE-ID "))
-                ):
-                    # Generate hash ID for the image and add a placeholder
-                    image_data = part.inline_data.data
-                    hasher = hashlib.sha256(image_data)
-                    image_hash_id = hasher.hexdigest()[:12]
-                    placeholder = f"[IMAGE-ID {image_hash_id}]"
+                next_part = content.parts[idx + 1] if idx + 1 < len(content.parts) else None
+                has_placeholder = (
+                    next_part is not None
+                    and next_part.text is not None
+                    and next_part.text.startswith("[IMAGE-ID ")
+                )
 
-                    # Only keep image data in the last 3 user messages
-                    if user_message_count <= 3:
-                        modified_content_parts.append(part)
+                placeholder_id = (
+                    next_part.text.split("ID ")[1].split("]")[0].strip() if has_placeholder else None
+                )
+                image_hash_id, tokens = self.image_info(part.inline_data.data, placeholder_id)
 
-                    modified_content_parts.append(types.Part(text=placeholder))
+                if is_latest_message or tokens <= remaining_tokens:
+                    remaining_tokens -= tokens
+                    modified_content_parts.append(part)
+                elif image_hash_id in descriptions:
+                    modified_content_parts.append(types.Part(text=descriptions[image_hash_id]))
 
-                else:
-                    # Only keep image data in the last 3 user messages
-                    if user_message_count <= 3:
-                        modified_content_parts.append(part)
+                # Add the ID placeholder if the image data came without one
+                if not has_placeholder:
+                    modified_content_parts.append(types.Part(text=f"[IMAGE-ID {image_hash_id}]"))
 
             # This will modify the contents inside the llm_request
             content.parts = modified_content_parts
+            is_latest_message = False
+
+        return None
+
+
+modify_image_data_in_history = MultimodalContextManager(
+    image_token_budget=SETTINGS.IMAGE_CONTEXT_TOKEN_BUDGET
+)
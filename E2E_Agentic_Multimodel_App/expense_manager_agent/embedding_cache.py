@@ -0,0 +1,178 @@
+# expense_manager_agent/embedding_cache.py
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Build the cache key for an embedding: a hash of the model name and the exact text."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+SQLITE_MAX_PARAMETERS = 500
+
+
+class EmbeddingCache:
+    """
+    Two-level cache for text embeddings.
+
+    The first level is an in-process LRU bounded by entry count. The optional
+    second level is a SQLite file, so embeddings survive process restarts and
+    can be shared by workers on the same host. Entries are keyed by
+    embedding_cache_key(), so switching the embedding model never returns a
+    vector produced by another model.
+
+    The in-memory level is served on the event loop. SQLite reads and writes run
+    in worker threads, serialized on their own lock.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_path: Optional[str] = None):
+        """
+        Args:
+            max_entries (int): Maximum number of embeddings kept in memory.
+            disk_path (str, optional): Path of the SQLite file used as the on-disk store.
+                The on-disk store is disabled when empty.
+        """
+        self.max_entries = max(0, max_entries)
+        self.disk_path = disk_path or None
+        self._memory: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if self.disk_path:
+            self._disk = sqlite3.connect(self.disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
+    async def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings, promoting on-disk hits into memory.
+
+        Memory hits are answered on the event loop. The remaining keys are read from
+        disk in a worker thread with one query, so SQLite never blocks the loop.
+
+        Args:
+            model (str): The embedding model name.
+            texts (List[str]): The embedded texts.
+
+        Returns:
+            List[Optional[List[float]]]: The embedding values per text, None on a miss.
+        """
+        keys = [embedding_cache_key(model, text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        with self._lock:
+            for idx, key in enumerate(keys):
+                values = self._memory.get(key)
+                if values is not None:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    results[idx] = list(values)
+
+        missing = [idx for idx, values in enumerate(results) if values is None]
+        on_disk: Dict[str, Tuple[float, ...]] = {}
+        if missing and self._disk is not None:
+            on_disk = await asyncio.to_thread(self._read_disk, [keys[idx] for idx in missing])
+
+        with self._lock:
+            for idx in missing:
+                values = on_disk.get(keys[idx])
+                if values is None:
+                    self._stats["misses"] += 1
+                    continue
+                self._remember(keys[idx], values)
+                self._stats["disk_hits"] += 1
+                results[idx] = list(values)
+        return results
+
+    async def put_many(self, model: str, texts: List[str], vectors: List[List[float]]) -> None:
+        """
+        Store embeddings in memory and, when enabled, on disk.
+
+        The on-disk write runs in a worker thread as one transaction.
+
+        Args:
+            model (str): The embedding model name.
+            texts (List[str]): The embedded texts.
+            vectors (List[List[float]]): The embedding values, in the same order as the texts.
+        """
+        entries = [
+            (embedding_cache_key(model, text), tuple(float(value) for value in values))
+            for text, values in zip(texts, vectors)
+        ]
+        with self._lock:
+            for key, values in entries:
+                self._remember(key, values)
+        if self._disk is not None and entries:
+            await asyncio.to_thread(self._write_disk, model, entries)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, Tuple[float, ...]]:
+        """Read embeddings from SQLite, called from a worker thread."""
+        found: Dict[str, Tuple[float, ...]] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._disk_lock:
+            # SQLite limits the number of bound parameters per statement
+            for start in range(0, len(unique_keys), SQLITE_MAX_PARAMETERS):
+                chunk = unique_keys[start : start + SQLITE_MAX_PARAMETERS]
+                rows = self._disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                found.update((key, tuple(array("d", vector))) for key, vector in rows)
+        return found
+
+    def _write_disk(self, model: str, entries: List[Tuple[str, Tuple[float, ...]]]) -> None:
+        """Write embeddings to SQLite in one transaction, called from a worker thread."""
+        with self._disk_lock:
+            self._disk.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                [(key, model, array("d", values).tobytes()) for key, values in entries],
+            )
+            self._disk.commit()
+
+    def _remember(self, key: str, values: Tuple[float, ...]) -> None:
+        """Insert into the in-memory LRU, evicting the least recently used entries."""
+        if self.max_entries == 0:
+            return
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            Dict[str, float]: Hit and miss counters, the overall hit rate and the
+                number of embeddings currently held in memory.
+        """
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hits": hits,
+                "lookups": lookups,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self) -> None:
+        """Drop every cached embedding and reset the counters. Blocks on the on-disk store."""
+        with self._lock:
+            self._memory.clear()
+            self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        with self._disk_lock:
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM embeddings")
+                self._disk.commit()
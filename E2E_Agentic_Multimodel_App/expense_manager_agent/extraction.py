@@ -0,0 +1,175 @@
+# expense_manager_agent/extraction.py
+
+import datetime
+import json
+import math
+import re
+from typing import Any, Dict, List
+
+from google.genai import types
+from pydantic import create_model
+
+from clients import get_genai_client
+from schema import ReceiptExtraction
+from settings import get_settings
+import logger
+
+SETTINGS = get_settings()
+CURRENCY_PATTERN = re.compile(r"^[A-Z]{3}$")
+EXTRACTION_PROMPT = """
+Extract the data of this purchase receipt.
+- transaction_time: the printed date and time of purchase in ISO 8601 format. Use 00:00:00 if no time is printed.
+- currency: the ISO 4217 code. If it is not printed, derive it from the store location, if unsure use "IDR".
+- purchased_items: every purchased item with its unit price and quantity.
+If the image is not a purchase receipt, set is_receipt to false and leave the other fields empty.
+"""
+RETRY_PROMPT = """
+Some values extracted from this receipt were invalid:
+{errors}
+Read the receipt again and return corrected values for only these fields.
+"""
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_receipt_fields(receipt: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Check extracted receipt values with the rules applied by store_receipt_data.
+
+    Args:
+        receipt (Dict[str, Any]): The extracted receipt fields.
+
+    Returns:
+        Dict[str, str]: An error message per invalid field, empty when all fields are valid.
+    """
+    errors = {}
+
+    if not str(receipt.get("store_name") or "").strip():
+        errors["store_name"] = "the store name is empty"
+
+    try:
+        datetime.datetime.fromisoformat(str(receipt.get("transaction_time")).replace("Z", "+00:00"))
+    except ValueError:
+        errors["transaction_time"] = (
+            f"{receipt.get('transaction_time')!r} is not an ISO 8601 date and time"
+        )
+
+    if not _is_number(receipt.get("total_amount")) or receipt["total_amount"] < 0:
+        errors["total_amount"] = f"{receipt.get('total_amount')!r} is not a non-negative amount"
+
+    if not CURRENCY_PATTERN.match(str(receipt.get("currency") or "").strip().upper()):
+        errors["currency"] = f"{receipt.get('currency')!r} is not an ISO 4217 currency code"
+
+    items = receipt.get("purchased_items")
+    if not isinstance(items, list):
+        errors["purchased_items"] = "the items are not a list"
+    else:
+        for idx, item in enumerate(items):
+            if (
+                not isinstance(item, dict)
+                or not str(item.get("name") or "").strip()
+                or not _is_number(item.get("price"))
+                or not _is_number(item.get("quantity"))
+                or item["quantity"] <= 0
+            ):
+                errors["purchased_items"] = (
+                    f"item {idx} needs a name, a numeric price and a positive quantity"
+                )
+                break
+
+    return errors
+
+
+def _normalize_receipt(receipt: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert validated values to the stored format, times become UTC 'YYYY-MM-DDTHH:MM:SS.ssssssZ'."""
+    transaction_time = datetime.datetime.fromisoformat(
+        str(receipt["transaction_time"]).replace("Z", "+00:00")
+    )
+    if transaction_time.tzinfo is not None:
+        transaction_time = transaction_time.astimezone(datetime.timezone.utc)
+
+    return {
+        "store_name": receipt["store_name"].strip(),
+        "transaction_time": transaction_time.strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+        "total_amount": float(receipt["total_amount"]),
+        "currency": receipt["currency"].strip().upper(),
+        "purchased_items": [
+            {
+                "name": item["name"].strip(),
+                "price": item["price"],
+                "quantity": int(item["quantity"])
+                if float(item["quantity"]).is_integer()
+                else item["quantity"],
+            }
+            for item in receipt["purchased_items"]
+        ],
+    }
+
+
+async def _generate_json(contents: List[Any], response_schema: Any) -> Dict[str, Any]:
+    """Run one schema-constrained generation without thinking and parse its JSON output."""
+    response = await get_genai_client().aio.models.generate_content(
+        model=SETTINGS.RECEIPT_EXTRACTION_MODEL,
+        contents=contents,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=response_schema,
+            temperature=0,
+            thinking_config=types.ThinkingConfig(thinking_budget=0),
+        ),
+    )
+    return json.loads(response.text)
+
+
+async def extract_receipt(image: types.Part) -> Dict[str, Any]:
+    """
+    Extract receipt data from an image with a response schema constrained model call.
+
+    The output is validated locally. Invalid fields are requested again, with a schema
+    holding only those fields, up to RECEIPT_EXTRACTION_RETRIES times, so a single
+    misread value does not cost a full extraction.
+
+    Args:
+        image (types.Part): The receipt image.
+
+    Returns:
+        Dict[str, Any]: {"is_receipt": False} for non-receipt images, otherwise
+            is_receipt plus the store_receipt_data arguments (store_name, transaction_time,
+            total_amount, currency and purchased_items).
+
+    Raises:
+        ValueError: If some fields are still invalid after the retries.
+    """
+    receipt = await _generate_json([image, EXTRACTION_PROMPT], ReceiptExtraction)
+    if not receipt.get("is_receipt"):
+        return {"is_receipt": False}
+
+    errors = validate_receipt_fields(receipt)
+    for _ in range(SETTINGS.RECEIPT_EXTRACTION_RETRIES):
+        if not errors:
+            break
+
+        logger.warning(f"Retrying invalid extracted receipt fields: {errors}")
+        field_schema = create_model(
+            "ReceiptFieldCorrection",
+            **{
+                field: (ReceiptExtraction.model_fields[field].annotation, ReceiptExtraction.model_fields[field])
+                for field in errors
+            },
+        )
+        prompt = RETRY_PROMPT.format(
+            errors="\n".join(f"- {field}: {error}" for field, error in errors.items())
+        )
+        corrected = await _generate_json([image, prompt], field_schema)
+        receipt.update({field: corrected[field] for field in errors if field in corrected})
+        errors = validate_receipt_fields(receipt)
+
+    if errors:
+        raise ValueError(
+            "Could not read valid values for "
+            + "; ".join(f"{field} ({error})" for field, error in errors.items())
+        )
+
+    return {"is_receipt": True, **_normalize_receipt(receipt)}
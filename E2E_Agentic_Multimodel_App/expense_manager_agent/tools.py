@@ -1,25 +1,72 @@
 # expense_manager_agent/tools.py
 
+import asyncio
+import base64
 import datetime
-from typing import Dict, List, Any
-from google.cloud import firestore
+import functools
+import json
+import re
+from typing import Dict, List, Any, Optional, Tuple
 from google.cloud.firestore_v1.vector import Vector
 from google.cloud.firestore_v1 import FieldFilter
 from google.cloud.firestore_v1.base_query import And
 from google.cloud.firestore_v1.base_vector_query import DistanceMeasure
+from google.cloud.firestore_v1.async_collection import AsyncCollectionReference
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools import ToolContext
+from google.genai import types
+from google.api_core.exceptions import AlreadyExists
 from settings import get_settings
-from google import genai
+from clients import get_firestore_client, get_genai_client
+from expense_manager_agent.embedding_cache import EmbeddingCache
+from expense_manager_agent.extraction import extract_receipt
+from image_pipeline import artifact_filename
+from expense_manager_agent.callbacks import (
+    RECEIPT_DESCRIPTIONS_STATE_KEY,
+    format_receipt_description,
+)
+import logger
 
 SETTINGS = get_settings()
-DB_CLIENT = firestore.Client(
-    project=SETTINGS.GCLOUD_PROJECT_ID
-)  # Will use "(default)" database
-COLLECTION = DB_CLIENT.collection(SETTINGS.DB_COLLECTION_NAME)
-GENAI_CLIENT = genai.Client(
-    vertexai=True, location=SETTINGS.GCLOUD_LOCATION, project=SETTINGS.GCLOUD_PROJECT_ID
+EMBEDDING_CACHE = EmbeddingCache(
+    max_entries=SETTINGS.EMBEDDING_CACHE_SIZE, disk_path=SETTINGS.EMBEDDING_CACHE_PATH
 )
 EMBEDDING_DIMENSION = 768
+SUMMARY_GROUP_BY_OPTIONS = ("none", "currency", "store", "month", "item")
+SUMMARY_MAX_ROWS = 50
+METADATA_SEARCH_MAX_PAGE_SIZE = 100
+# Rough token estimate used for the tool output budget
+CHARS_PER_TOKEN = 4
 EMBEDDING_FIELD_NAME = "embedding"
+# Inverted index over store and item names, maintained by build_receipt_document()
+SEARCH_TERMS_FIELD_NAME = "search_terms"
+STORE_TERM_PREFIX = "store:"
+ITEM_TERM_PREFIX = "item:"
+# Firestore allows at most 30 values in an array-contains-any filter
+MAX_QUERY_TERMS = 30
+HYBRID_CANDIDATES = 20
+# Reciprocal rank fusion constant, damps the weight of the top ranks
+RRF_K = 60
+SEARCH_MODE_OPTIONS = ("hybrid", "vector")
+QUERY_STOPWORDS = frozenset(
+    ["a", "an", "and", "at", "for", "from", "in", "my", "of", "on", "the", "to", "with"]
+)
+# Session state key mapping image IDs that were not stored on upload to the reason
+IMAGE_EXTRACTION_NOTES_STATE_KEY = "image_extraction_notes"
+RECEIPT_FIELDS = [
+    "receipt_id", "store_name", "transaction_time", "total_amount", "currency", "purchased_items"
+]
+VECTOR_INDEX = None
+if SETTINGS.LOCAL_VECTOR_INDEX_ENABLED:
+    # Imported here so NumPy is only loaded when the local index is used
+    from expense_manager_agent.vector_index import LocalVectorIndex
+
+    VECTOR_INDEX = LocalVectorIndex(
+        dimension=EMBEDDING_DIMENSION,
+        consistency_check_interval=SETTINGS.VECTOR_INDEX_CONSISTENCY_CHECK_SECONDS,
+        max_vectors=SETTINGS.VECTOR_INDEX_MAX_VECTORS,
+    )
 INVALID_ITEMS_FORMAT_ERR = """
 Invalid items format. Must be a list of dictionaries with 'name', 'price', and 'quantity' keys."""
 RECEIPT_DESC_FORMAT = """
@@ -38,16 +85,424 @@ def sanitize_image_id(image_id: str) -> str:
     if image_id.startswith("[IMAGE-"):
         image_id = image_id.split("ID ")[1].split("]")[0]
 
-    return image_id.strip()
+    image_id = image_id.strip()
+    # The image ID is used as the Firestore document ID
+    if not image_id or "/" in image_id:
+        raise ValueError(f"Invalid image ID: {image_id!r}")
+
+    return image_id
+
+
+async def embed_texts(texts: List[str], use_cache: bool = True) -> List[List[float]]:
+    """
+    Embed many texts with the configured embedding model, reusing cached embeddings.
+
+    Cache misses are sent to the model in requests of up to EMBEDDING_BATCH_SIZE texts.
+
+    Args:
+        texts (List[str]): The texts to embed.
+        use_cache (bool): Read and fill the embedding cache. Bulk imports turn it off, so
+            one-off receipt descriptions do not evict the cached search queries.
+
+    Returns:
+        List[List[float]]: The embedding values, in the same order as the texts.
+    """
+    model = SETTINGS.EMBEDDING_MODEL
+    embeddings: List[Optional[List[float]]] = [None] * len(texts)
+    if use_cache:
+        lookups_before = EMBEDDING_CACHE.stats()["lookups"]
+        embeddings = await EMBEDDING_CACHE.get_many(model, texts)
+        _log_embedding_cache_stats(lookups_before, len(texts))
+    missing = [idx for idx, embedding in enumerate(embeddings) if embedding is None]
+
+    batch_size = max(1, SETTINGS.EMBEDDING_BATCH_SIZE)
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start : start + batch_size]
+        result = await get_genai_client().aio.models.embed_content(
+            model=model, contents=[texts[idx] for idx in batch]
+        )
+        for idx, embedding in zip(batch, result.embeddings):
+            embeddings[idx] = embedding.values
+        if use_cache:
+            await EMBEDDING_CACHE.put_many(
+                model, [texts[idx] for idx in batch], [embeddings[idx] for idx in batch]
+            )
+
+    return embeddings
+
+
+async def embed_text(text: str) -> List[float]:
+    """
+    Embed text with the configured embedding model, reusing cached embeddings.
+
+    Args:
+        text (str): The text to embed.
+
+    Returns:
+        List[float]: The embedding values.
+    """
+    return (await embed_texts([text]))[0]
+
+
+def get_embedding_cache_stats() -> Dict[str, float]:
+    """Return hit and miss counters and the hit rate of the embedding cache."""
+    return EMBEDDING_CACHE.stats()
+
+
+def _log_embedding_cache_stats(lookups_before: int, lookups: int) -> None:
+    """Log the embedding cache stats each time EMBEDDING_CACHE_STATS_LOG_INTERVAL more lookups were made."""
+    interval = SETTINGS.EMBEDDING_CACHE_STATS_LOG_INTERVAL
+    if interval > 0 and lookups_before // interval != (lookups_before + lookups) // interval:
+        logger.info("Embedding cache stats", **get_embedding_cache_stats())
+
+
+def get_user_collection() -> AsyncCollectionReference:
+    """Return the collection holding one document per user."""
+    return get_firestore_client().collection(SETTINGS.DB_USER_COLLECTION_NAME)
+
+
+def get_receipt_collection(user_id: str) -> AsyncCollectionReference:
+    """
+    Return the receipt subcollection of a user.
+
+    Receipts are stored under users/{user_id}/receipts (with the configured collection
+    names), so every query only touches the documents of one user. The receipt
+    subcollections share the DB_COLLECTION_NAME collection group, which is where the
+    vector and composite indexes are defined.
+
+    Args:
+        user_id (str): The user identifier.
+
+    Returns:
+        AsyncCollectionReference: The user's receipt collection.
+    """
+    if not user_id:
+        raise ValueError("A user ID is required to access receipts")
+
+    return get_user_collection().document(user_id).collection(SETTINGS.DB_COLLECTION_NAME)
+
+
+async def _fetch_vector_index_entries(
+    user_id: str,
+) -> List[Tuple[str, List[float], Dict[str, Any]]]:
+    """Read every receipt of a user with its embedding from Firestore to (re)build the local index."""
+    entries = []
+    async for doc in get_receipt_collection(user_id).stream():
+        data = doc.to_dict()
+        embedding = data.pop(EMBEDDING_FIELD_NAME, None)
+        data.pop(SEARCH_TERMS_FIELD_NAME, None)
+        if embedding is not None:
+            entries.append((doc.id, list(embedding), data))
+
+    return entries
+
+
+async def _count_receipts(user_id: str) -> int:
+    """Count a user's receipts with an aggregation query, without reading documents."""
+    result = await get_receipt_collection(user_id).count().get()
+    return int(result[0][0].value)
+
+
+async def _search_local_vector_index(
+    user_id: str, query_embedding: List[float], limit: int
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Answer a nearest neighbour query from the local vector index.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: Receipt data ordered by distance, or None when the
+            index is disabled or unavailable and the Firestore vector query should be used.
+    """
+    if VECTOR_INDEX is None:
+        return None
+
+    try:
+        await VECTOR_INDEX.ensure_consistent(
+            user_id,
+            functools.partial(_fetch_vector_index_entries, user_id),
+            functools.partial(_count_receipts, user_id),
+        )
+        return VECTOR_INDEX.search(user_id, query_embedding, limit)
+    except Exception as e:
+        logger.warning(f"Local vector index unavailable, using Firestore vector search: {e}")
+        VECTOR_INDEX.invalidate(user_id)
+        return None
+
+
+def _encode_page_token(transaction_time: str, receipt_id: str) -> str:
+    """Encode the sort key of the last returned receipt as an opaque continuation token."""
+    payload = json.dumps([transaction_time, receipt_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
 
+def _decode_page_token(page_token: str) -> Tuple[str, str]:
+    """Decode a continuation token produced by _encode_page_token."""
+    try:
+        transaction_time, receipt_id = json.loads(base64.urlsafe_b64decode(page_token))
+    except ValueError:
+        raise ValueError("Invalid page_token, use the token returned by the previous page")
+
+    return transaction_time, receipt_id
+
+
+def _format_receipt_row(doc_id: str, data: Dict[str, Any]) -> str:
+    """Render a receipt as a single compact table row."""
+    items = "; ".join(
+        f"{item.get('name', '')} x{item.get('quantity', 1)} @{item.get('price', '')}"
+        for item in data.get("purchased_items") or []
+    )
+    return " | ".join(
+        [
+            doc_id,
+            str(data.get("transaction_time", "")),
+            str(data.get("store_name", "")),
+            str(data.get("total_amount", "")),
+            str(data.get("currency", "")),
+            items,
+        ]
+    )
+
+
+def _validate_time_range(start_time: str, end_time: str) -> None:
+    """Raise ValueError unless both bounds are ISO formatted datetime strings."""
+    if not isinstance(start_time, str) or not isinstance(end_time, str):
+        raise ValueError("start_time and end_time must be strings in ISO format")
+    try:
+        datetime.datetime.fromisoformat(start_time.replace("Z", "+00:00"))
+        datetime.datetime.fromisoformat(end_time.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("start_time and end_time must be strings in ISO format")
+
+
+def normalize_search_text(text: str) -> str:
+    """Lowercase text and collapse everything but letters and digits into single spaces."""
+    return " ".join(re.findall(r"\w+", str(text).lower()))
+
+
+def build_search_terms(store_name: str, purchased_items: List[Dict[str, Any]]) -> List[str]:
+    """
+    Build the search_terms array of a receipt.
+
+    The array holds the full normalized store name and item names (prefixed with
+    "store:" and "item:") for exact name lookups, plus their individual words for
+    partial matches.
+
+    Args:
+        store_name (str): The name of the store.
+        purchased_items (List[Dict[str, Any]]): The validated purchased items.
+
+    Returns:
+        List[str]: The sorted, deduplicated search terms.
+    """
+    terms = set()
+    names = [(STORE_TERM_PREFIX, normalize_search_text(store_name))]
+    names += [(ITEM_TERM_PREFIX, normalize_search_text(item["name"])) for item in purchased_items]
+    for prefix, name in names:
+        if name:
+            terms.add(prefix + name)
+            terms.update(word for word in name.split() if len(word) > 1)
+
+    return sorted(terms)
+
+
+def _query_terms(query_text: str) -> List[str]:
+    """Split a query into the words matched against search_terms, without stopwords."""
+    words = []
+    for word in normalize_search_text(query_text).split():
+        if len(word) > 1 and word not in QUERY_STOPWORDS and word not in words:
+            words.append(word)
 
-def store_receipt_data(
+    return words[:MAX_QUERY_TERMS]
+
+
+def _reciprocal_rank_fusion(
+    rankings: List[List[Dict[str, Any]]], k: int = RRF_K
+) -> List[Dict[str, Any]]:
+    """Merge ranked receipt lists, scoring each receipt by the sum of 1 / (k + rank)."""
+    scores: Dict[str, float] = {}
+    receipts: Dict[str, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, receipt in enumerate(ranking, start=1):
+            receipt_id = receipt["receipt_id"]
+            scores[receipt_id] = scores.get(receipt_id, 0.0) + 1.0 / (k + rank)
+            receipts.setdefault(receipt_id, receipt)
+
+    return [receipts[receipt_id] for receipt_id in sorted(scores, key=scores.get, reverse=True)]
+
+
+async def _exact_name_search(user_id: str, query_text: str, limit: int) -> List[Dict[str, Any]]:
+    """Find the most recent receipts whose store or an item is exactly named query_text."""
+    name = normalize_search_text(query_text)
+    if not name:
+        return []
+
+    query = (
+        get_receipt_collection(user_id)
+        .where(
+            filter=FieldFilter(
+                SEARCH_TERMS_FIELD_NAME,
+                "array_contains_any",
+                [STORE_TERM_PREFIX + name, ITEM_TERM_PREFIX + name],
+            )
+        )
+        .order_by("transaction_time", direction="DESCENDING")
+        .limit(limit)
+        .select(RECEIPT_FIELDS)
+    )
+
+    return [{**doc.to_dict(), "receipt_id": doc.id} async for doc in query.stream()]
+
+
+async def _lexical_search(user_id: str, query_text: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Rank receipts sharing words with the query by the number of matching words.
+
+    The candidates are the newest limit matching receipts, served by the
+    (search_terms, transaction_time DESC) composite index, so the result is
+    deterministic instead of depending on Firestore's document order.
+    """
+    words = _query_terms(query_text)
+    if not words:
+        return []
+
+    query = (
+        get_receipt_collection(user_id)
+        .where(filter=FieldFilter(SEARCH_TERMS_FIELD_NAME, "array_contains_any", words))
+        .order_by("transaction_time", direction="DESCENDING")
+        .limit(limit)
+        .select(RECEIPT_FIELDS + [SEARCH_TERMS_FIELD_NAME])
+    )
+
+    receipts = []
+    async for doc in query.stream():
+        data = doc.to_dict()
+        terms = set(data.pop(SEARCH_TERMS_FIELD_NAME, None) or [])
+        data["receipt_id"] = doc.id
+        receipts.append((sum(word in terms for word in words), data))
+
+    receipts.sort(key=lambda match: (match[0], match[1].get("transaction_time", "")), reverse=True)
+    return [data for _, data in receipts]
+
+
+async def _vector_search(user_id: str, query_text: str, limit: int) -> List[Dict[str, Any]]:
+    """Return the receipts nearest to the query embedding, from the local index or Firestore."""
+    query_embedding = await embed_text(query_text)
+
+    # Answer from the local index when enabled, Firestore remains the fallback
+    local_results = await _search_local_vector_index(user_id, query_embedding, limit)
+    if local_results is not None:
+        return local_results
+
+    vector_query = get_receipt_collection(user_id).find_nearest(
+        vector_field=EMBEDDING_FIELD_NAME,
+        query_vector=Vector(query_embedding),
+        distance_measure=DistanceMeasure.EUCLIDEAN,
+        limit=limit,
+    )
+
+    receipts = []
+    async for doc in vector_query.stream():
+        data = doc.to_dict()
+        # Remove embedding and search terms as they're not needed for display
+        data.pop(EMBEDDING_FIELD_NAME, None)
+        data.pop(SEARCH_TERMS_FIELD_NAME, None)
+        data["receipt_id"] = doc.id
+        receipts.append(data)
+
+    return receipts
+
+
+def _remember_receipt_description(tool_context: ToolContext, receipt: Dict[str, Any]) -> None:
+    """Record a short receipt description in session state, shown in place of older images."""
+    descriptions = dict(tool_context.state.get(RECEIPT_DESCRIPTIONS_STATE_KEY) or {})
+    descriptions[receipt["receipt_id"]] = format_receipt_description(receipt)
+    # Reassign so the state change is persisted
+    tool_context.state[RECEIPT_DESCRIPTIONS_STATE_KEY] = descriptions
+
+
+def build_receipt_document(
     image_id: str,
     store_name: str,
     transaction_time: str,
     total_amount: float,
     purchased_items: List[Dict[str, Any]],
     currency: str = "IDR",
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Validate receipt fields and build the Firestore document and the text to embed.
+
+    Args:
+        image_id (str): The sanitized image ID, used as the receipt ID.
+        store_name (str): The name of the store.
+        transaction_time (str): The time of purchase, in ISO format.
+        total_amount (float): The total amount spent.
+        purchased_items (List[Dict[str, Any]]): Items with 'name', 'price' and optional 'quantity'.
+        currency (str, optional): The currency of the transaction.
+
+    Returns:
+        Tuple[Dict[str, Any], str]: The receipt document (with its search terms but without
+            its embedding), and the receipt description to embed.
+
+    Raises:
+        ValueError: If the transaction time or items are invalid.
+    """
+    # Validate transaction time
+    if not isinstance(transaction_time, str):
+        raise ValueError(
+            "Invalid transaction time: must be a string in ISO format 'YYYY-MM-DDTHH:MM:SS.ssssssZ'"
+        )
+    try:
+        datetime.datetime.fromisoformat(transaction_time.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(
+            "Invalid transaction time format. Must be in ISO format 'YYYY-MM-DDTHH:MM:SS.ssssssZ'"
+        )
+
+    # Validate items format
+    if not isinstance(purchased_items, list):
+        raise ValueError(INVALID_ITEMS_FORMAT_ERR)
+
+    for _item in purchased_items:
+        if (
+            not isinstance(_item, dict)
+            or "name" not in _item
+            or "price" not in _item
+        ):
+            raise ValueError(INVALID_ITEMS_FORMAT_ERR)
+
+        if "quantity" not in _item:
+            _item["quantity"] = 1
+
+    description = RECEIPT_DESC_FORMAT.format(
+        store_name=store_name,
+        transaction_time=transaction_time,
+        total_amount=total_amount,
+        currency=currency,
+        purchased_items=purchased_items,
+        receipt_id=image_id,
+    )
+
+    doc = {
+        "receipt_id": image_id,
+        "store_name": store_name,
+        "transaction_time": transaction_time,
+        "total_amount": total_amount,
+        "currency": currency,
+        "purchased_items": purchased_items,
+        SEARCH_TERMS_FIELD_NAME: build_search_terms(store_name, purchased_items),
+    }
+
+    return doc, description
+
+
+async def store_receipt_data(
+    image_id: str,
+    store_name: str,
+    transaction_time: str,
+    total_amount: float,
+    purchased_items: List[Dict[str, Any]],
+    currency: str = "IDR",
+    tool_context: ToolContext = None,
 ) -> str:
     """
     Store receipt data in the database.
@@ -64,6 +519,7 @@ def store_receipt_data(
             - quantity (int, optional): The quantity of the item. Defaults to 1 if not provided.
         currency (str, optional): The currency of the transaction, can be derived from the store location.
             If unsure, default is "IDR".
+        tool_context (ToolContext): The tool context, used to store the receipt for the current user.
 
     Returns:
         str: A success message with the receipt ID.
@@ -75,108 +531,211 @@ def store_receipt_data(
         # In case of it provide full image placeholder, extract the id string
         image_id = sanitize_image_id(image_id)
 
-        # Check if the receipt already exists
-        doc = get_receipt_data_by_image_id(image_id)
+        doc, description = build_receipt_document(
+            image_id, store_name, transaction_time, total_amount, purchased_items, currency
+        )
+
+        # Create a combined text from all receipt information for better embedding
+        embedding = await embed_text(description)
+        doc[EMBEDDING_FIELD_NAME] = Vector(embedding)
 
-        if doc:
+        # The image hash is the document ID, so create() is an atomic create-if-absent:
+        # duplicates are rejected by Firestore without a prior lookup
+        try:
+            await get_receipt_collection(tool_context.user_id).document(image_id).create(doc)
+        except AlreadyExists:
+            _remember_receipt_description(tool_context, doc)
             return f"Receipt with ID {image_id} already exists"
 
-        # Validate transaction time
-        if not isinstance(transaction_time, str):
-            raise ValueError(
-                "Invalid transaction time: must be a string in ISO format 'YYYY-MM-DDTHH:MM:SS.ssssssZ'"
-            )
+        _remember_receipt_description(tool_context, doc)
+
+        if VECTOR_INDEX is not None:
+            doc.pop(EMBEDDING_FIELD_NAME)
+            doc.pop(SEARCH_TERMS_FIELD_NAME)
+            VECTOR_INDEX.add(tool_context.user_id, image_id, embedding, doc)
+
+        return f"Receipt stored successfully with ID: {image_id}"
+    except Exception as e:
+        raise Exception(f"Failed to store receipt: {str(e)}")
+
+
+async def _extract_and_store(
+    image_id: str, context: CallbackContext, image: Optional[types.Part] = None
+) -> Tuple[bool, str]:
+    """
+    Extract one receipt image and store its data, loading the image artifact unless given.
+
+    Args:
+        image_id (str): The sanitized image ID.
+        context (CallbackContext): The tool or callback context of the current user.
+        image (types.Part, optional): The image, when it is already at hand.
+
+    Returns:
+        Tuple[bool, str]: Whether the receipt is stored (now or before), and the outcome
+            reported to the agent.
+    """
+    # Already stored receipts need neither the image nor a model call
+    existing = await get_receipt_collection(context.user_id).document(image_id).get()
+    if existing.exists:
+        doc_data = existing.to_dict()
+        doc_data.pop(EMBEDDING_FIELD_NAME, None)
+        doc_data.pop(SEARCH_TERMS_FIELD_NAME, None)
+        _remember_receipt_description(context, doc_data)
+        return True, f"Receipt with ID {image_id} already exists:\n{RECEIPT_DESC_FORMAT.format(**doc_data)}"
+
+    if image is None:
+        # Images stored before the user-scoped layout are named by their hash only
+        for filename in (artifact_filename(image_id), image_id):
+            image = await context.load_artifact(filename)
+            if image is not None:
+                break
+    if image is None:
+        raise ValueError(f"No uploaded image with ID {image_id}")
+
+    receipt = await extract_receipt(image)
+    if not receipt.pop("is_receipt"):
+        return False, f"Image {image_id} is not a receipt, nothing was stored"
+
+    # store_receipt_data only uses the user ID and session state of its context
+    result = await store_receipt_data(image_id, tool_context=context, **receipt)
+    return True, f"{result}\n{RECEIPT_DESC_FORMAT.format(receipt_id=image_id, **receipt)}"
+
+
+async def extract_receipts_before_model(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[types.Content]:
+    """
+    before_model_callback storing the receipt images of the latest user message before the
+    agent model reads it.
+
+    Each new image is read by the schema-constrained extraction model and stored, before
+    the agent turn and once per image. Stored receipts are replaced in every request by
+    their description (the full extracted data on the call that stored them), so the
+    agent model never receives their image bytes. Images that
+    are not receipts or could not be read are kept, followed by a note, and the outcome
+    is kept in session state so they are not extracted again.
+    """
+    descriptions = callback_context.state.get(RECEIPT_DESCRIPTIONS_STATE_KEY) or {}
+    notes = dict(callback_context.state.get(IMAGE_EXTRACTION_NOTES_STATE_KEY) or {})
+    user_contents = [
+        content
+        for content in llm_request.contents
+        if content.role == "user" and content.parts and content.parts[0].function_response is None
+    ]
+
+    # Image IDs by part index, for the image parts followed by their [IMAGE-ID] placeholder
+    image_ids_by_content = []
+    for content in user_contents:
+        image_ids = {}
+        for idx, (part, next_part) in enumerate(zip(content.parts, content.parts[1:])):
+            if part.inline_data is not None and (next_part.text or "").startswith("[IMAGE-ID "):
+                image_ids[idx] = sanitize_image_id(next_part.text)
+        image_ids_by_content.append(image_ids)
+
+    new_images = {}
+    if user_contents:
+        for idx, image_id in image_ids_by_content[-1].items():
+            if image_id not in descriptions and image_id not in notes:
+                new_images[image_id] = user_contents[-1].parts[idx]
+
+    outcomes = {}
+
+    async def extract(image_id: str, part: types.Part) -> None:
         try:
-            datetime.datetime.fromisoformat(transaction_time.replace("Z", "+00:00"))
-        except ValueError:
-            raise ValueError(
-                "Invalid transaction time format. Must be in ISO format 'YYYY-MM-DDTHH:MM:SS.ssssssZ'"
-            )
+            stored, outcome = await _extract_and_store(image_id, callback_context, part)
+        except Exception as e:
+            stored, outcome = False, f"Receipt {image_id} could not be read automatically: {e}"
+        if stored:
+            outcomes[image_id] = outcome
+        else:
+            notes[image_id] = outcome
 
-        # Validate items format
-        if not isinstance(purchased_items, list):
-            raise ValueError(INVALID_ITEMS_FORMAT_ERR)
+    if new_images:
+        await asyncio.gather(*(extract(image_id, part) for image_id, part in new_images.items()))
+        callback_context.state[IMAGE_EXTRACTION_NOTES_STATE_KEY] = notes
+        descriptions = callback_context.state.get(RECEIPT_DESCRIPTIONS_STATE_KEY) or {}
 
-        for _item in purchased_items:
-            if (
-                not isinstance(_item, dict)
-                or "name" not in _item
-                or "price" not in _item
-            ):
-                raise ValueError(INVALID_ITEMS_FORMAT_ERR)
+    for content, image_ids in zip(user_contents, image_ids_by_content):
+        parts = []
+        for idx, part in enumerate(content.parts):
+            image_id = image_ids.get(idx)
+            if image_id in descriptions:
+                text = outcomes.get(image_id) or f"Stored receipt. {descriptions[image_id]}"
+                parts.append(types.Part(text=text))
+                continue
+            parts.append(part)
+            # The note goes after the placeholder, which must directly follow its image
+            if image_ids.get(idx - 1) in notes:
+                parts.append(types.Part(text=notes[image_ids[idx - 1]]))
+        content.parts = parts
 
-            if "quantity" not in _item:
-                _item["quantity"] = 1
+    return None
 
-        # Create a combined text from all receipt information for better embedding
-        result = GENAI_CLIENT.models.embed_content(
-            model="text-embedding-004",
-            contents=RECEIPT_DESC_FORMAT.format(
-                store_name=store_name,
-                transaction_time=transaction_time,
-                total_amount=total_amount,
-                currency=currency,
-                purchased_items=purchased_items,
-                receipt_id=image_id,
-            ),
-        )
 
-        embedding = result.embeddings[0].values
+async def extract_and_store_receipt(image_id: str, tool_context: ToolContext = None) -> str:
+    """
+    Read a receipt image, extract its data and store it, in a single step.
+    Use this tool to store receipt images from earlier messages that were not stored yet.
 
-        doc = {
-            "receipt_id": image_id,
-            "store_name": store_name,
-            "transaction_time": transaction_time,
-            "total_amount": total_amount,
-            "currency": currency,
-            "purchased_items": purchased_items,
-            EMBEDDING_FIELD_NAME: Vector(embedding),
-        }
+    Args:
+        image_id (str): The unique identifier of the image. For example IMAGE-POSITION 0-ID 12345,
+            the ID of the image is 12345.
+        tool_context (ToolContext): The tool context, used to load the image and store the receipt
+            for the current user.
 
-        COLLECTION.add(doc)
+    Returns:
+        str: The stored receipt data, the already stored data if the receipt was stored before,
+            or a message that the image is not a receipt.
 
-        return f"Receipt stored successfully with ID: {image_id}"
+    Raises:
+        Exception: If the image cannot be found or its data cannot be read.
+    """
+    try:
+        _, outcome = await _extract_and_store(sanitize_image_id(image_id), tool_context)
+        return outcome
     except Exception as e:
-        raise Exception(f"Failed to store receipt: {str(e)}")
+        raise Exception(f"Failed to extract receipt: {str(e)}")
 
 
-def search_receipts_by_metadata_filter(
+async def search_receipts_by_metadata_filter(
     start_time: str,
     end_time: str,
     min_total_amount: float = -1.0,
     max_total_amount: float = -1.0,
+    page_size: int = 20,
+    page_token: str = "",
+    tool_context: ToolContext = None,
 ) -> str:
     """
     Filter receipts by metadata within a specific time range and optionally by amount.
+    Results are ordered by transaction time and returned one page at a time.
 
     Args:
         start_time (str): The start datetime for the filter (in ISO format, e.g. 'YYYY-MM-DDTHH:MM:SS.ssssssZ').
         end_time (str): The end datetime for the filter (in ISO format, e.g. 'YYYY-MM-DDTHH:MM:SS.ssssssZ').
         min_total_amount (float): The minimum total amount for the filter (inclusive). Defaults to -1.
         max_total_amount (float): The maximum total amount for the filter (inclusive). Defaults to -1.
+        page_size (int, optional): Maximum number of receipts to return (default: 20, max: 100).
+        page_token (str, optional): The page_token returned by the previous call, to get the next page.
+            Leave empty for the first page.
+        tool_context (ToolContext): The tool context, used to only search the current user's receipts.
 
     Returns:
-        str: A string containing the list of receipt data matching all applied filters.
+        str: A table of the receipts in this page, one row per receipt, followed by the
+            page_token of the next page when more receipts match.
 
     Raises:
         Exception: If the search failed or input is invalid.
     """
     try:
         # Validate start and end times
-        if not isinstance(start_time, str) or not isinstance(end_time, str):
-            raise ValueError("start_time and end_time must be strings in ISO format")
-        try:
-            datetime.datetime.fromisoformat(start_time.replace("Z", "+00:00"))
-            datetime.datetime.fromisoformat(end_time.replace("Z", "+00:00"))
-        except ValueError:
-            raise ValueError("start_time and end_time must be strings in ISO format")
+        _validate_time_range(start_time, end_time)
 
-        # Start with the base collection reference
-        query = COLLECTION
+        # Start with the user's receipt collection
+        query = get_receipt_collection(tool_context.user_id)
 
-        # Build the composite query by properly chaining conditions
-        # Notes that this demo assume 1 user only,
-        # need to refactor the query for multiple user
+        # Build the composite query by properly chaining conditions,
+        # range filters on both fields are served by the composite index in firestore.indexes.json
         filters = [
             FieldFilter("transaction_time", ">=", start_time),
             FieldFilter("transaction_time", "<=", end_time),
@@ -189,67 +748,105 @@ def search_receipts_by_metadata_filter(
         if max_total_amount != -1:
             filters.append(FieldFilter("total_amount", "<=", max_total_amount))
 
-        # Apply the filters
+        # Apply the filters, ordered by a unique key so pages never overlap or skip receipts
         composite_filter = And(filters=filters)
-        query = query.where(filter=composite_filter)
+        query = query.where(filter=composite_filter).order_by("transaction_time").order_by("__name__")
+
+        if page_token:
+            last_time, last_id = _decode_page_token(page_token)
+            query = query.start_after({"transaction_time": last_time, "__name__": last_id})
+
+        # Fetch one extra receipt to know whether another page exists
+        page_size = max(1, min(int(page_size), METADATA_SEARCH_MAX_PAGE_SIZE))
+        query = query.limit(page_size + 1).select(
+            ["store_name", "transaction_time", "total_amount", "currency", "purchased_items"]
+        )
 
-        # Execute the query and collect results
-        search_result_description = "Search by Metadata Results:\n"
-        for doc in query.stream():
+        # Render rows until the page or the tool output token budget is full
+        header = "receipt_id | transaction_time | store_name | total_amount | currency | purchased_items (name xqty @price)"
+        lines = ["Search by Metadata Results:", header]
+        budget_chars = SETTINGS.TOOL_OUTPUT_TOKEN_BUDGET * CHARS_PER_TOKEN - len(header)
+        last_row, has_more = None, False
+        async for doc in query.stream():
             data = doc.to_dict()
-            data.pop(
-                EMBEDDING_FIELD_NAME, None
-            )  # Remove embedding as it's not needed for display
+            row = _format_receipt_row(doc.id, data)
+            if len(lines) - 2 == page_size or (last_row and len(row) + 1 > budget_chars):
+                has_more = True
+                break
 
-            search_result_description += f"\n{RECEIPT_DESC_FORMAT.format(**data)}"
+            lines.append(row)
+            budget_chars -= len(row) + 1
+            last_row = (data.get("transaction_time", ""), doc.id)
+
+        if last_row is None:
+            lines.append("No receipts found.")
+        elif has_more:
+            lines.append(
+                f'More receipts match. Call again with page_token="{_encode_page_token(*last_row)}" '
+                "for the next page, or use get_expense_summary for totals."
+            )
+        else:
+            lines.append("End of results.")
+
+        search_result_description = "\n".join(lines)
 
         return search_result_description
     except Exception as e:
         raise Exception(f"Error filtering receipts: {str(e)}")
 
 
-def search_relevant_receipts_by_natural_language_query(
-    query_text: str, limit: int = 5
+async def search_relevant_receipts_by_natural_language_query(
+    query_text: str, limit: int = 5, mode: str = "hybrid", tool_context: ToolContext = None
 ) -> str:
     """
-    Search for receipts with content most similar to the query using vector search.
-    This tool can be use for user query that is difficult to translate into metadata filters.
-    Such as store name or item name which sensitive to string matching.
+    Search for receipts most relevant to the query.
+    This tool can be use for user query that is difficult to translate into metadata filters,
+    such as a store name, an item name or a description of the purchase.
     Use this tool if you cannot utilize the search by metadata filter tool.
 
+    When the query is exactly a store or item name (e.g. "Starbucks"), the most recent
+    receipts with that name are returned directly. Otherwise receipts matching words of
+    the query and receipts similar in meaning are merged into one ranking.
+
     Args:
-        query_text (str): The search text (e.g., "coffee", "dinner", "groceries").
+        query_text (str): The search text (e.g., "Starbucks", "coffee", "dinner", "groceries").
         limit (int, optional): Maximum number of results to return (default: 5).
+        mode (str, optional): "hybrid" (default) combines name matching with vector search,
+            "vector" only uses vector search.
+        tool_context (ToolContext): The tool context, used to only search the current user's receipts.
 
     Returns:
-        str: A string containing the list of contextually relevant receipt data.
+        str: A string containing the list of relevant receipt data.
 
     Raises:
         Exception: If the search failed or input is invalid.
     """
     try:
-        # Generate embedding for the query text
-        result = GENAI_CLIENT.models.embed_content(
-            model="text-embedding-004", contents=query_text
-        )
-        query_embedding = result.embeddings[0].values
-
-        # Notes that this demo assume 1 user only,
-        # need to refactor the query for multiple user
-        vector_query = COLLECTION.find_nearest(
-            vector_field=EMBEDDING_FIELD_NAME,
-            query_vector=Vector(query_embedding),
-            distance_measure=DistanceMeasure.EUCLIDEAN,
-            limit=limit,
-        )
+        mode = (mode or "hybrid").strip().lower()
+        if mode not in SEARCH_MODE_OPTIONS:
+            raise ValueError(f"mode must be one of {', '.join(SEARCH_MODE_OPTIONS)}")
 
-        # Execute the query and collect results
-        search_result_description = "Search by Contextual Relevance Results:\n"
-        for doc in vector_query.stream():
-            data = doc.to_dict()
-            data.pop(
-                EMBEDDING_FIELD_NAME, None
-            )  # Remove embedding as it's not needed for display
+        user_id = tool_context.user_id
+        if mode == "vector":
+            results = await _vector_search(user_id, query_text, limit)
+            search_result_description = "Search by Contextual Relevance Results:\n"
+        else:
+            # An exact store or item name is answered by one indexed lookup, without embedding the query
+            results = await _exact_name_search(user_id, query_text, limit)
+            if results:
+                search_result_description = (
+                    "Search by Exact Name Results (most recent first):\n"
+                )
+            else:
+                candidates = max(limit, HYBRID_CANDIDATES)
+                lexical_results, vector_results = await asyncio.gather(
+                    _lexical_search(user_id, query_text, candidates),
+                    _vector_search(user_id, query_text, candidates),
+                )
+                results = _reciprocal_rank_fusion([lexical_results, vector_results])[:limit]
+                search_result_description = "Search by Contextual Relevance Results:\n"
+
+        for data in results:
             search_result_description += f"\n{RECEIPT_DESC_FORMAT.format(**data)}"
 
         return search_result_description
@@ -257,13 +854,16 @@ def search_relevant_receipts_by_natural_language_query(
         raise Exception(f"Error searching receipts: {str(e)}")
 
 
-def get_receipt_data_by_image_id(image_id: str) -> Dict[str, Any]:
+async def get_receipt_data_by_image_id(
+    image_id: str, tool_context: ToolContext = None
+) -> Dict[str, Any]:
     """
     Retrieve receipt data from the database using the image_id.
 
     Args:
         image_id (str): The unique identifier of the receipt image. For example, if the placeholder is
             [IMAGE-ID 12345], the ID to use is 12345.
+        tool_context (ToolContext): The tool context, used to only look up the current user's receipts.
 
     Returns:
         Dict[str, Any]: A dictionary containing the receipt data with the following keys:
@@ -278,17 +878,155 @@ def get_receipt_data_by_image_id(image_id: str) -> Dict[str, Any]:
     # In case of it provide full image placeholder, extract the id string
     image_id = sanitize_image_id(image_id)
 
-    # Query the receipts collection for documents with matching receipt_id (image_id)
-    # Notes that this demo assume 1 user only,
-    # need to refactor the query for multiple user
-    query = COLLECTION.where(filter=FieldFilter("receipt_id", "==", image_id)).limit(1)
-    docs = list(query.stream())
+    # Receipts are keyed by their image ID, so this is a direct document read
+    doc = await get_receipt_collection(tool_context.user_id).document(image_id).get()
 
-    if not docs:
+    if not doc.exists:
         return {}
 
-    # Get the first matching document
-    doc_data = docs[0].to_dict()
+    doc_data = doc.to_dict()
     doc_data.pop(EMBEDDING_FIELD_NAME, None)
+    doc_data.pop(SEARCH_TERMS_FIELD_NAME, None)
+    _remember_receipt_description(tool_context, doc_data)
+
+    return doc_data
+
+
+def _format_summary_table(
+    header: List[str], rows: List[Tuple[Any, ...]], max_rows: int = SUMMARY_MAX_ROWS
+) -> str:
+    """Render rows as a compact pipe separated table, keeping the first max_rows rows."""
+    lines = [" | ".join(header)]
+    for row in rows[:max_rows]:
+        lines.append(
+            " | ".join(f"{value:.2f}" if isinstance(value, float) else str(value) for value in row)
+        )
+
+    if len(rows) > max_rows:
+        lines.append(f"... {len(rows) - max_rows} more groups not shown")
+
+    return "\n".join(lines)
+
+
+async def get_expense_summary(
+    start_time: str,
+    end_time: str,
+    group_by: str = "currency",
+    currency: str = "",
+    tool_context: ToolContext = None,
+) -> str:
+    """
+    Compute spending totals, averages and receipt counts within a time range.
+    Use this tool instead of adding up search results yourself whenever the user asks
+    how much they spent, how often they bought something, or for their average spend.
+
+    Args:
+        start_time (str): The start datetime for the summary (in ISO format, e.g. 'YYYY-MM-DDTHH:MM:SS.ssssssZ').
+        end_time (str): The end datetime for the summary (in ISO format, e.g. 'YYYY-MM-DDTHH:MM:SS.ssssssZ').
+        group_by (str, optional): How to group the results, one of "none", "currency", "store",
+            "month" (YYYY-MM of the transaction time) or "item" (purchased item name).
+            Defaults to "currency". Amounts are never added across currencies, so
+            "none" requires the currency argument.
+        currency (str, optional): Only include receipts in this currency (e.g. "IDR").
+            Defaults to all currencies.
+        tool_context (ToolContext): The tool context, used to only summarize the current user's receipts.
+
+    Returns:
+        str: A compact table with total, average and count per group. For "item" the
+            total is price x quantity and the count is the purchased quantity.
+
+    Raises:
+        Exception: If the aggregation failed or input is invalid.
+    """
+    try:
+        _validate_time_range(start_time, end_time)
+        group_by = (group_by or "none").strip().lower()
+        if group_by not in SUMMARY_GROUP_BY_OPTIONS:
+            raise ValueError(f"group_by must be one of {', '.join(SUMMARY_GROUP_BY_OPTIONS)}")
+
+        filters = [
+            FieldFilter("transaction_time", ">=", start_time),
+            FieldFilter("transaction_time", "<=", end_time),
+        ]
+        if currency:
+            filters.append(FieldFilter("currency", "==", currency))
+        query = get_receipt_collection(tool_context.user_id).where(filter=And(filters=filters))
+
+        title = f"Expense summary from {start_time} to {end_time}"
+        if group_by == "none":
+            if not currency:
+                raise ValueError('group_by "none" requires a currency, or group by "currency"')
 
-    return doc_data
\ No newline at end of file
+            # Computed by Firestore, no receipt documents are transferred
+            aggregation = (
+                query.count(alias="count")
+                .sum("total_amount", alias="total")
+                .avg("total_amount", alias="average")
+            )
+            results = {
+                result.alias: result.value for result in (await aggregation.get())[0]
+            }
+            row = (
+                currency,
+                float(results.get("total") or 0),
+                float(results.get("average") or 0),
+                int(results.get("count") or 0),
+            )
+            return f"{title}:\n" + _format_summary_table(
+                ["currency", "total", "average", "count"], [row]
+            )
+
+        # Firestore aggregations cannot group, so stream only the fields needed
+        # (never the embeddings) and aggregate the groups here
+        fields = ["currency", "total_amount", "transaction_time", "store_name"]
+        if group_by == "item":
+            fields.append("purchased_items")
+
+        groups: Dict[Tuple[str, str], List[float]] = {}
+        async for doc in query.select(fields).stream():
+            data = doc.to_dict()
+            doc_currency = data.get("currency", "")
+
+            if group_by == "item":
+                entries = [
+                    (
+                        str(item.get("name", "")).strip(),
+                        float(item.get("price", 0)) * float(item.get("quantity", 1)),
+                        float(item.get("quantity", 1)),
+                    )
+                    for item in data.get("purchased_items") or []
+                ]
+            elif group_by == "store":
+                entries = [(data.get("store_name", ""), float(data.get("total_amount", 0)), 1)]
+            elif group_by == "month":
+                entries = [(str(data.get("transaction_time", ""))[:7], float(data.get("total_amount", 0)), 1)]
+            else:
+                entries = [(doc_currency, float(data.get("total_amount", 0)), 1)]
+
+            for key, amount, count in entries:
+                total = groups.setdefault((key, doc_currency), [0.0, 0.0])
+                total[0] += amount
+                total[1] += count
+
+        rows = [
+            (key, doc_currency, total, total / count if count else 0.0, int(count))
+            for (key, doc_currency), (total, count) in groups.items()
+        ]
+        if group_by == "currency":
+            rows = [(key, total, average, count) for key, _, total, average, count in rows]
+            header = ["currency", "total", "average", "count"]
+        else:
+            header = [group_by, "currency", "total", "average", "count"]
+
+        # Months read best chronologically, other groups by largest spend first
+        if group_by == "month":
+            rows.sort(key=lambda row: row[0])
+        else:
+            rows.sort(key=lambda row: row[-3], reverse=True)
+
+        if not rows:
+            return f"{title}: no receipts found"
+
+        return f"{title} grouped by {group_by}:\n" + _format_summary_table(header, rows)
+    except Exception as e:
+        raise Exception(f"Error summarizing expenses: {str(e)}")
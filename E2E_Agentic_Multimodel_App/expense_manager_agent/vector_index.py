@@ -0,0 +1,201 @@
+# expense_manager_agent/vector_index.py
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+IndexEntry = Tuple[str, List[float], Dict[str, Any]]
+
+
+class _Partition:
+    """
+    Embeddings of one partition stored as a dense float32 matrix.
+
+    The matrix has spare rows: its capacity doubles when full, so adding a vector
+    is amortised O(1) instead of copying the whole matrix. Only the first size()
+    rows are valid.
+    """
+
+    def __init__(self, dimension: int):
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.payloads: List[Dict[str, Any]] = []
+        self.matrix = np.empty((0, dimension), dtype=np.float32)
+        self.squared_norms = np.empty((0,), dtype=np.float32)
+        self.loaded = False
+        self.last_checked = 0.0
+        self.lock = asyncio.Lock()
+
+    def size(self) -> int:
+        return len(self.ids)
+
+    def capacity(self) -> int:
+        return self.matrix.shape[0]
+
+    def grow(self) -> None:
+        """Double the capacity, keeping the stored rows."""
+        capacity = max(16, 2 * self.capacity())
+        matrix = np.empty((capacity, self.matrix.shape[1]), dtype=np.float32)
+        matrix[: self.size()] = self.matrix[: self.size()]
+        squared_norms = np.empty((capacity,), dtype=np.float32)
+        squared_norms[: self.size()] = self.squared_norms[: self.size()]
+        self.matrix, self.squared_norms = matrix, squared_norms
+
+
+class LocalVectorIndex:
+    """
+    In-process brute-force vector index over receipt embeddings.
+
+    Firestore stays the source of truth: a partition is loaded from Firestore the
+    first time it is searched, kept current by add() when receipts are stored by
+    this process, and reloaded whenever the periodic consistency check finds that
+    its size no longer matches the Firestore document count (for example because
+    another instance stored a receipt).
+
+    Partitions are kept in least recently used order. When the allocated rows of all
+    partitions exceed max_vectors, the least recently used ones are dropped and
+    reloaded from Firestore on their next search.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        consistency_check_interval: float = 60.0,
+        max_vectors: int = 200_000,
+    ):
+        """
+        Args:
+            dimension (int): Dimension of the embedding vectors.
+            consistency_check_interval (float): Seconds between document count checks
+                against Firestore for a loaded partition.
+            max_vectors (int): Maximum allocated vectors over all partitions.
+        """
+        self.dimension = dimension
+        self.consistency_check_interval = consistency_check_interval
+        self.max_vectors = max_vectors
+        self._partitions: "OrderedDict[str, _Partition]" = OrderedDict()
+
+    def _partition(self, partition: str) -> _Partition:
+        """Return a partition, creating it if needed, and mark it most recently used."""
+        if partition not in self._partitions:
+            self._partitions[partition] = _Partition(self.dimension)
+        self._partitions.move_to_end(partition)
+        return self._partitions[partition]
+
+    def _evict(self) -> None:
+        """Drop least recently used partitions until the allocated vectors fit max_vectors."""
+        allocated = sum(state.capacity() for state in self._partitions.values())
+        # The most recently used partition is kept even if it alone exceeds the limit
+        while allocated > self.max_vectors and len(self._partitions) > 1:
+            _, state = self._partitions.popitem(last=False)
+            allocated -= state.capacity()
+
+    def size(self, partition: str) -> int:
+        """Return the number of vectors held for a partition."""
+        state = self._partitions.get(partition)
+        return state.size() if state is not None else 0
+
+    def load(self, partition: str, entries: Iterable[IndexEntry]) -> None:
+        """
+        Replace the contents of a partition.
+
+        Args:
+            partition (str): The partition key.
+            entries (Iterable[IndexEntry]): (document ID, embedding, receipt data) tuples.
+        """
+        ids, vectors, payloads = [], [], []
+        for doc_id, vector, payload in entries:
+            ids.append(doc_id)
+            vectors.append(vector)
+            payloads.append(payload)
+
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        state = self._partition(partition)
+        state.ids, state.payloads, state.matrix = ids, payloads, matrix
+        state.positions = {doc_id: position for position, doc_id in enumerate(ids)}
+        state.squared_norms = np.einsum("ij,ij->i", matrix, matrix)
+        state.loaded = True
+        state.last_checked = time.monotonic()
+        self._evict()
+
+    def add(self, partition: str, doc_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        """
+        Add one vector to a loaded partition. Unloaded partitions are skipped, they
+        pick the document up from Firestore when they are first loaded.
+        """
+        state = self._partitions.get(partition)
+        if state is None or not state.loaded or doc_id in state.positions:
+            return
+
+        if state.size() == state.capacity():
+            state.grow()
+        row = np.asarray(vector, dtype=np.float32).reshape(self.dimension)
+        position = state.size()
+        state.matrix[position] = row
+        state.squared_norms[position] = np.dot(row, row)
+        state.positions[doc_id] = position
+        state.ids.append(doc_id)
+        state.payloads.append(payload)
+        self._partitions.move_to_end(partition)
+        self._evict()
+
+    def search(self, partition: str, query_vector: List[float], limit: int) -> List[Dict[str, Any]]:
+        """
+        Return the payloads of the nearest vectors by Euclidean distance.
+
+        Args:
+            partition (str): The partition key.
+            query_vector (List[float]): The query embedding.
+            limit (int): Maximum number of results.
+
+        Returns:
+            List[Dict[str, Any]]: Receipt data ordered from nearest to farthest.
+        """
+        state = self._partitions.get(partition)
+        if state is None or not state.ids or limit <= 0:
+            return []
+        self._partitions.move_to_end(partition)
+
+        size = state.size()
+        query = np.asarray(query_vector, dtype=np.float32)
+        # ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2, the last term does not change the order
+        distances = state.squared_norms[:size] - 2.0 * (state.matrix[:size] @ query)
+        limit = min(limit, size)
+        nearest = np.argpartition(distances, limit - 1)[:limit]
+        nearest = nearest[np.argsort(distances[nearest])]
+
+        return [state.payloads[i] for i in nearest]
+
+    async def ensure_consistent(
+        self,
+        partition: str,
+        fetch_entries: Callable[[], Awaitable[Iterable[IndexEntry]]],
+        fetch_count: Callable[[], Awaitable[int]],
+    ) -> None:
+        """
+        Load a partition on first use and reload it when it has drifted from Firestore.
+
+        Args:
+            partition (str): The partition key.
+            fetch_entries: Coroutine function returning every entry of the partition.
+            fetch_count: Coroutine function returning the Firestore document count.
+        """
+        state = self._partition(partition)
+        async with state.lock:
+            if not state.loaded:
+                self.load(partition, await fetch_entries())
+                return
+
+            if time.monotonic() - state.last_checked < self.consistency_check_interval:
+                return
+
+            state.last_checked = time.monotonic()
+            if await fetch_count() != len(state.ids):
+                self.load(partition, await fetch_entries())
+
+    def invalidate(self, partition: str) -> None:
+        """Drop a partition so it is reloaded from Firestore on the next search."""
+        self._partitions.pop(partition, None)
@@ -0,0 +1,161 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# (version, mime type, image bytes)
+CachedImage = tuple[int, str, bytes]
+
+
+class ImageCache:
+    """Two-tier cache of downloaded image artifacts.
+
+    The first tier is an in-memory LRU bounded by total image bytes. The optional
+    second tier is a directory on local disk, bounded the same way by evicting the
+    least recently written files. Entries are keyed by (user ID, artifact filename)
+    and remember the artifact version they hold. Callers pass the current version
+    from the artifact service, which plays the role of the GCS generation, and
+    stale entries are treated as misses.
+
+    The files of the disk tier and their total size are tracked in memory, the
+    directory is only scanned once at startup. Files written by other processes
+    sharing the directory are counted after a restart.
+    """
+
+    def __init__(self, max_memory_bytes: int, disk_dir: str = "", max_disk_bytes: int = 0):
+        """
+        Args:
+            max_memory_bytes: Maximum total size of the images kept in memory.
+            disk_dir: Directory of the disk tier, disabled when empty.
+            max_disk_bytes: Maximum total size of the disk tier.
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[tuple[str, str], CachedImage]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        # Disk tier file path -> size, least recently written first
+        self._disk_files: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._scan_disk()
+
+    def _scan_disk(self) -> None:
+        """Record the files already in the disk tier, oldest first."""
+        entries = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        for _, size, path in sorted(entries):
+            self._disk_files[path] = size
+            self._disk_bytes += size
+
+    def _disk_path(self, user_id: str, filename: str) -> str:
+        key = hashlib.sha256(f"{user_id}\x00{filename}".encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, key)
+
+    def get(self, user_id: str, filename: str, version: int) -> tuple[str, bytes] | None:
+        """Return (mime type, image bytes) if the given version is cached, otherwise None.
+
+        Performs blocking disk reads, run it in a worker thread from async code.
+        """
+        key = (user_id, filename)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and cached[0] == version:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return cached[1], cached[2]
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(user_id, filename), "rb") as file:
+                    header, data = file.read().split(b"\n", 1)
+                cached_version, mime_type = header.decode("utf-8").split(" ", 1)
+                if int(cached_version) == version:
+                    self._remember(key, (version, mime_type, data))
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                    return mime_type, data
+            except (OSError, ValueError):
+                pass
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, user_id: str, filename: str, version: int, mime_type: str, data: bytes) -> None:
+        """Cache a downloaded image version in both tiers.
+
+        Performs blocking disk writes, run it in a worker thread from async code.
+        """
+        self._remember((user_id, filename), (version, mime_type, data))
+
+        if self.disk_dir:
+            path = self._disk_path(user_id, filename)
+            # Write to a temporary file first so readers never see a partial image
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            header = f"{version} {mime_type}\n".encode("utf-8")
+            with os.fdopen(fd, "wb") as file:
+                file.write(header)
+                file.write(data)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                self._disk_bytes += len(header) + len(data) - self._disk_files.pop(path, 0)
+                self._disk_files[path] = len(header) + len(data)
+                if self.max_disk_bytes > 0 and self._disk_bytes > self.max_disk_bytes:
+                    self._trim_disk()
+
+    def _remember(self, key: tuple[str, str], entry: CachedImage) -> None:
+        """Insert into the memory tier, evicting least recently used images over the byte bound."""
+        size = len(entry[2])
+        if size > self.max_memory_bytes:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous[2])
+
+            self._memory[key] = entry
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted[2])
+
+    def _trim_disk(self) -> None:
+        """Delete the least recently written files until the disk tier fits max_disk_bytes.
+
+        Called with the lock held, only once the tracked size exceeds the limit.
+        """
+        while self._disk_bytes > self.max_disk_bytes and self._disk_files:
+            path, size = self._disk_files.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,106 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import io
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from settings import get_settings
+import logger
+
+SETTINGS = get_settings()
+# Artifacts prefixed with "user:" are scoped to the user instead of the session
+USER_ARTIFACT_PREFIX = "user:"
+THUMBNAIL_SUFFIX = "-thumb"
+JPEG_MIME_TYPE = "image/jpeg"
+
+
+@dataclass
+class ProcessedImage:
+    """A receipt image prepared for storage.
+
+    Attributes:
+        image_hash_id: Content hash of the uploaded bytes, used as the image ID.
+        data: The recompressed original (or the upload itself if that is smaller).
+        mime_type: MIME type of data.
+        thumbnail: Small preview used for attachments.
+        thumbnail_mime_type: MIME type of thumbnail.
+    """
+
+    image_hash_id: str
+    data: bytes
+    mime_type: str
+    thumbnail: bytes
+    thumbnail_mime_type: str
+
+
+def content_hash_id(image_byte: bytes) -> str:
+    """Return the image ID for uploaded image bytes."""
+    return hashlib.sha256(image_byte).hexdigest()[:12]
+
+
+def artifact_filename(image_hash_id: str, thumbnail: bool = False) -> str:
+    """Return the user-scoped artifact filename of an image or its thumbnail."""
+    suffix = THUMBNAIL_SUFFIX if thumbnail else ""
+    return f"{USER_ARTIFACT_PREFIX}{image_hash_id}{suffix}"
+
+
+def _encode_jpeg(image: Image.Image, max_dimension: int, quality: int) -> bytes:
+    """Downscale an image to fit max_dimension and encode it as JPEG."""
+    image = image.copy()
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def process_image(image_byte: bytes, mime_type: str) -> ProcessedImage:
+    """
+    Recompress an uploaded image and build its thumbnail.
+
+    The image ID is always the hash of the uploaded bytes, so the same photo maps to
+    the same ID regardless of how it is stored. This is CPU bound, call it from a
+    worker thread in async code.
+
+    Args:
+        image_byte: The uploaded image bytes.
+        mime_type: The MIME type of the upload.
+
+    Returns:
+        ProcessedImage: The image ID, stored original and thumbnail. Images that cannot
+            be decoded are kept unchanged and used as their own thumbnail.
+    """
+    image_hash_id = content_hash_id(image_byte)
+
+    try:
+        with Image.open(io.BytesIO(image_byte)) as image:
+            # Apply the camera orientation before the EXIF data is dropped
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            data = _encode_jpeg(image, SETTINGS.IMAGE_MAX_DIMENSION, SETTINGS.IMAGE_JPEG_QUALITY)
+            thumbnail = _encode_jpeg(
+                image, SETTINGS.THUMBNAIL_MAX_DIMENSION, SETTINGS.IMAGE_JPEG_QUALITY
+            )
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Could not process image {image_hash_id}, storing it unchanged: {e}")
+        return ProcessedImage(image_hash_id, image_byte, mime_type, image_byte, mime_type)
+
+    if len(data) >= len(image_byte):
+        # Already well compressed, keep the upload as is
+        return ProcessedImage(image_hash_id, image_byte, mime_type, thumbnail, JPEG_MIME_TYPE)
+
+    return ProcessedImage(image_hash_id, data, JPEG_MIME_TYPE, thumbnail, JPEG_MIME_TYPE)
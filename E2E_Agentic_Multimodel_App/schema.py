@@ -14,7 +14,7 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
@@ -60,3 +60,65 @@ class ChatResponse(BaseModel):
     thinking_process: str = ""
     attachments: List[ImageData] = []
     error: Optional[str] = None
+
+
+class BulkImportProgress(BaseModel):
+    """Model for a progress update of a bulk receipt import.
+
+    Attributes:
+        total: Number of records in the import.
+        processed: Number of records handled so far, including skipped ones.
+        imported: Number of receipts written to Firestore.
+        existing: Number of receipts already stored, left unchanged.
+        skipped: Number of invalid records that were not imported.
+        errors: Validation errors of skipped records (capped).
+        done: Whether the import has finished.
+    """
+
+    total: int
+    processed: int = 0
+    imported: int = 0
+    existing: int = 0
+    skipped: int = 0
+    errors: List[str] = []
+    done: bool = False
+
+
+class ExtractedItem(BaseModel):
+    """Model for a purchased item read from a receipt image.
+
+    Attributes:
+        name: Item name as printed on the receipt.
+        price: Unit price of the item.
+        quantity: Number of units purchased.
+    """
+
+    name: str
+    price: float
+    quantity: float = Field(description="Number of units, 1 if not printed")
+
+
+class ReceiptExtraction(BaseModel):
+    """Model for the structured output of the receipt extraction stage.
+
+    Used as the Gemini response schema, so the field descriptions are part of the prompt.
+
+    Attributes:
+        is_receipt: Whether the image is a receipt at all.
+        store_name: Store or merchant name.
+        transaction_time: Time of purchase in ISO 8601 format.
+        total_amount: Total amount paid.
+        currency: ISO 4217 currency code.
+        purchased_items: Items listed on the receipt.
+    """
+
+    is_receipt: bool = Field(description="False if the image is not a purchase receipt")
+    store_name: str = Field(description="Store or merchant name")
+    transaction_time: str = Field(
+        description="Time of purchase in ISO 8601 format, e.g. 2024-05-01T13:45:00Z"
+    )
+    total_amount: float = Field(description="Total amount paid, after tax and discounts")
+    currency: str = Field(
+        description="ISO 4217 currency code, derived from the store location if not printed"
+    )
+    purchased_items: List[ExtractedItem]
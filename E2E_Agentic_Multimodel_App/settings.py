@@ -35,7 +35,27 @@ class Settings(BaseSettings):
         GCLOUD_PROJECT_ID: Google Cloud project identifier.
         BACKEND_URL: URL for the backend service API endpoint.
         STORAGE_BUCKET_NAME: Name of the Google Cloud Storage bucket for storing receipts.
-        DB_COLLECTION_NAME: Name of the Firestore collection for storing receipts.
+        DB_COLLECTION_NAME: Name of the per-user Firestore subcollection for storing receipts.
+        DB_USER_COLLECTION_NAME: Name of the Firestore collection holding one document per user.
+        EMBEDDING_MODEL: Name of the text embedding model.
+        EMBEDDING_BATCH_SIZE: Maximum number of texts sent in one embedding request.
+        EMBEDDING_CACHE_SIZE: Maximum number of embeddings kept in the in-process cache.
+        EMBEDDING_CACHE_PATH: SQLite file for the on-disk embedding cache, disabled when empty.
+        EMBEDDING_CACHE_STATS_LOG_INTERVAL: Embedding lookups between hit rate log lines, 0 disables them.
+        TOOL_OUTPUT_TOKEN_BUDGET: Approximate maximum number of tokens in one search tool result.
+        IMAGE_MAX_DIMENSION: Longest side in pixels of stored receipt images.
+        IMAGE_JPEG_QUALITY: JPEG quality used when recompressing receipt images.
+        THUMBNAIL_MAX_DIMENSION: Longest side in pixels of receipt thumbnails.
+        ARTIFACT_IO_CONCURRENCY: Maximum concurrent image uploads or downloads per request.
+        IMAGE_CACHE_MEMORY_BYTES: Maximum bytes of downloaded images cached in memory.
+        IMAGE_CACHE_DIR: Directory of the on-disk image cache, disabled when empty.
+        IMAGE_CACHE_DISK_BYTES: Maximum bytes of the on-disk image cache.
+        IMAGE_CONTEXT_TOKEN_BUDGET: Estimated image tokens kept in the conversation sent to the model.
+        LOCAL_VECTOR_INDEX_ENABLED: Answer semantic search from an in-process vector index.
+        VECTOR_INDEX_CONSISTENCY_CHECK_SECONDS: Interval between index/Firestore count checks.
+        VECTOR_INDEX_MAX_VECTORS: Vectors kept in the local index over all users before eviction.
+        RECEIPT_EXTRACTION_MODEL: Gemini model reading receipt images into structured data.
+        RECEIPT_EXTRACTION_RETRIES: Re-requests of invalid extracted fields per receipt.
     """
 
     GCLOUD_LOCATION: str
@@ -43,6 +63,26 @@ class Settings(BaseSettings):
     STORAGE_BUCKET_NAME: str
     BACKEND_URL: str = "http://localhost:8081/chat"
     DB_COLLECTION_NAME: str = "personal-expense-assistant-receipts"
+    DB_USER_COLLECTION_NAME: str = "personal-expense-assistant-users"
+    EMBEDDING_MODEL: str = "text-embedding-004"
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_CACHE_PATH: str = ""
+    EMBEDDING_CACHE_STATS_LOG_INTERVAL: int = 500
+    TOOL_OUTPUT_TOKEN_BUDGET: int = 2000
+    IMAGE_MAX_DIMENSION: int = 1600
+    IMAGE_JPEG_QUALITY: int = 85
+    THUMBNAIL_MAX_DIMENSION: int = 384
+    ARTIFACT_IO_CONCURRENCY: int = 4
+    IMAGE_CACHE_MEMORY_BYTES: int = 64 * 1024 * 1024
+    IMAGE_CACHE_DIR: str = ""
+    IMAGE_CACHE_DISK_BYTES: int = 512 * 1024 * 1024
+    IMAGE_CONTEXT_TOKEN_BUDGET: int = 6000
+    LOCAL_VECTOR_INDEX_ENABLED: bool = False
+    VECTOR_INDEX_CONSISTENCY_CHECK_SECONDS: float = 60.0
+    VECTOR_INDEX_MAX_VECTORS: int = 200_000
+    RECEIPT_EXTRACTION_MODEL: str = "gemini-2.5-flash"
+    RECEIPT_EXTRACTION_RETRIES: int = 1
 
     model_config = SettingsConfigDict(
         yaml_file="settings.yaml", yaml_file_encoding="utf-8"
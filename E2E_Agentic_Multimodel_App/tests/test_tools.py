@@ -0,0 +1,100 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import FakeFirestore, FakeGenaiClient, FakeToolContext
+from clients import override_clients
+from expense_manager_agent import tools
+
+START_TIME = "2025-01-01T00:00:00.000000Z"
+END_TIME = "2025-12-31T23:59:59.000000Z"
+
+
+@pytest.fixture
+def context(monkeypatch):
+    """A tool context of a user with one stored receipt, on the in-memory fakes."""
+    monkeypatch.setattr(tools, "VECTOR_INDEX", None)
+    context = FakeToolContext("alice")
+    with override_clients(
+        firestore_client=FakeFirestore(), genai_client=FakeGenaiClient(tools.EMBEDDING_DIMENSION)
+    ):
+        asyncio.run(
+            tools.store_receipt_data(
+                "receipt-1",
+                "Starbucks",
+                "2025-03-14T08:30:00.000000Z",
+                55000.0,
+                [{"name": "Coffee Latte", "price": 45000, "quantity": 1},
+                 {"name": "Croissant", "price": 10000, "quantity": 1}],
+                "IDR",
+                tool_context=context,
+            )
+        )
+        yield context
+
+
+def test_store_receipt_rejects_duplicates(context):
+    result = asyncio.run(
+        tools.store_receipt_data(
+            "receipt-1", "Starbucks", "2025-03-14T08:30:00.000000Z", 55000.0,
+            [{"name": "Coffee Latte", "price": 45000, "quantity": 1}], "IDR", tool_context=context,
+        )
+    )
+
+    assert result == "Receipt with ID receipt-1 already exists"
+
+
+def test_metadata_search_filters_by_time_and_amount(context):
+    found = asyncio.run(
+        tools.search_receipts_by_metadata_filter(START_TIME, END_TIME, tool_context=context)
+    )
+    too_expensive = asyncio.run(
+        tools.search_receipts_by_metadata_filter(
+            START_TIME, END_TIME, min_total_amount=100000.0, tool_context=context
+        )
+    )
+
+    assert "receipt-1" in found and "Starbucks" in found
+    assert "receipt-1" not in too_expensive
+
+
+def test_hybrid_search_finds_store_and_item_names(context):
+    by_store = asyncio.run(
+        tools.search_relevant_receipts_by_natural_language_query("Starbucks", tool_context=context)
+    )
+    by_item = asyncio.run(
+        tools.search_relevant_receipts_by_natural_language_query("latte", tool_context=context)
+    )
+
+    assert "receipt-1" in by_store
+    assert "receipt-1" in by_item
+
+
+def test_expense_summary_totals_per_currency(context):
+    summary = asyncio.run(tools.get_expense_summary(START_TIME, END_TIME, tool_context=context))
+
+    assert "IDR | 55000.00 | 55000.00 | 1" in summary
+
+
+def test_expense_summary_counts_purchased_items(context):
+    summary = asyncio.run(
+        tools.get_expense_summary(START_TIME, END_TIME, group_by="item", tool_context=context)
+    )
+
+    assert "Croissant" in summary and "Coffee Latte" in summary
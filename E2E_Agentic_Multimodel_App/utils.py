@@ -14,22 +14,30 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from google.cloud import storage
 from settings import get_settings
+import asyncio
 import base64
 import re
 from schema import ChatRequest, ImageData
 from google.genai import types
-import hashlib
 import json
 from google.adk.artifacts import GcsArtifactService
+from image_cache import ImageCache
+from image_pipeline import (
+    USER_ARTIFACT_PREFIX,
+    artifact_filename,
+    content_hash_id,
+    process_image,
+)
 import logger
 
 
 SETTINGS = get_settings()
 
-GCS_BUCKET_CLIENT = storage.Client(project=SETTINGS.GCLOUD_PROJECT_ID).get_bucket(
-    SETTINGS.STORAGE_BUCKET_NAME
+IMAGE_CACHE = ImageCache(
+    max_memory_bytes=SETTINGS.IMAGE_CACHE_MEMORY_BYTES,
+    disk_dir=SETTINGS.IMAGE_CACHE_DIR,
+    max_disk_bytes=SETTINGS.IMAGE_CACHE_DISK_BYTES,
 )
 
 
@@ -39,48 +47,83 @@ async def store_uploaded_image_as_artifact(
     user_id: str,
     session_id: str,
     image_data: ImageData,
-) -> tuple[str, bytes]:
+    existing_filenames: set[str] | None = None,
+) -> tuple[str, bytes, str]:
     """
     Store an uploaded image as an artifact in Google Cloud Storage.
 
+    The image is stored as a recompressed original plus a thumbnail, both as
+    user-scoped artifacts keyed by the content hash. Uploading the same receipt
+    again, in this or any other session of the user, skips the upload.
+
     Args:
         artifact_service: The artifact service to use for storing artifacts
         app_name: The name of the application
         user_id: The ID of the user
         session_id: The ID of the session
         image_data: The image data to store
+        existing_filenames: Artifact filenames already listed for the user and session.
+            When omitted, the existence of this image is checked with its own request.
 
     Returns:
-        tuple[str, bytes]: A tuple containing the image hash ID and the image byte
+        tuple[str, bytes, str]: A tuple containing the image hash ID, the stored image bytes
+            and their MIME type
     """
 
     # Decode the base64 image data and use it to generate a hash id
     image_byte = base64.b64decode(image_data.serialized_image)
-    hasher = hashlib.sha256(image_byte)
-    image_hash_id = hasher.hexdigest()[:12]
-
-    artifact_versions = await artifact_service.list_versions(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        filename=image_hash_id,
-    )
-    if artifact_versions:
+    image_hash_id = content_hash_id(image_byte)
+
+    if existing_filenames is not None:
+        processed = await asyncio.to_thread(process_image, image_byte, image_data.mime_type)
+        already_stored = artifact_filename(image_hash_id) in existing_filenames
+    else:
+        # Check for the stored image while recompressing it in a worker thread
+        artifact_versions, processed = await asyncio.gather(
+            artifact_service.list_versions(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=artifact_filename(image_hash_id),
+            ),
+            asyncio.to_thread(process_image, image_byte, image_data.mime_type),
+        )
+        already_stored = bool(artifact_versions)
+
+    if already_stored:
         logger.info(f"Image {image_hash_id} already exists in GCS, skipping upload")
 
-        return image_hash_id, image_byte
+        return image_hash_id, processed.data, processed.mime_type
 
-    await artifact_service.save_artifact(
-        app_name=app_name,
-        user_id=user_id,
-        session_id=session_id,
-        filename=image_hash_id,
-        artifact=types.Part(
-            inline_data=types.Blob(mime_type=image_data.mime_type, data=image_byte)
+    await asyncio.gather(
+        artifact_service.save_artifact(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            filename=artifact_filename(image_hash_id, thumbnail=True),
+            artifact=types.Part(
+                inline_data=types.Blob(
+                    mime_type=processed.thumbnail_mime_type, data=processed.thumbnail
+                )
+            ),
+        ),
+        artifact_service.save_artifact(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            filename=artifact_filename(image_hash_id),
+            artifact=types.Part(
+                inline_data=types.Blob(mime_type=processed.mime_type, data=processed.data)
+            ),
         ),
     )
 
-    return image_hash_id, image_byte
+    return image_hash_id, processed.data, processed.mime_type
+
+
+def _image_cache_key(session_id: str, filename: str) -> str:
+    """Cache key of an artifact, session-scoped (legacy) artifacts are only unique within their session."""
+    return filename if filename.startswith(USER_ARTIFACT_PREFIX) else f"{session_id}/{filename}"
 
 
 async def download_image_from_gcs(
@@ -89,11 +132,16 @@ async def download_image_from_gcs(
     user_id: str,
     session_id: str,
     image_hash: str,
+    thumbnail: bool = True,
 ) -> tuple[str, str] | None:
     """
     Downloads an image artifact from Google Cloud Storage and
     returns it as base64 encoded string with its MIME type.
-    Uses local caching to avoid redundant downloads.
+    Uses local caching to avoid redundant downloads: the latest artifact version
+    is listed (metadata only) and the image is served from the memory or disk
+    cache when that version is already cached.
+
+    Images stored before the user-scoped layout are looked up in the session.
 
     Args:
         artifact_service: The artifact service to use for downloading artifacts
@@ -101,16 +149,39 @@ async def download_image_from_gcs(
         user_id: The ID of the user
         session_id: The ID of the session
         image_hash: The hash identifier of the image to download
+        thumbnail: Download the thumbnail (used for attachments) instead of the full image
 
     Returns:
         tuple[str, str] | None: A tuple containing (base64_encoded_data, mime_type), or None if download fails
     """
     try:
+        for filename in (artifact_filename(image_hash, thumbnail), image_hash):
+            versions = await artifact_service.list_versions(
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                filename=filename,
+            )
+            if versions:
+                break
+        else:
+            logger.info(f"Image {image_hash} does not exist in GCS Artifact Service")
+            return None
+
+        cache_key = _image_cache_key(session_id, filename)
+        version = max(versions)
+
+        cached = await asyncio.to_thread(IMAGE_CACHE.get, user_id, cache_key, version)
+        if cached is not None:
+            mime_type, image_data = cached
+            return base64.b64encode(image_data).decode("utf-8"), mime_type
+
         artifact = await artifact_service.load_artifact(
             app_name=app_name,
             user_id=user_id,
             session_id=session_id,
-            filename=image_hash,
+            filename=filename,
+            version=version,
         )
         if not artifact:
             logger.info(f"Image {image_hash} does not exist in GCS Artifact Service")
@@ -121,6 +192,9 @@ async def download_image_from_gcs(
         mime_type = artifact.inline_data.mime_type
 
         logger.info(f"Downloaded image {image_hash} with type {mime_type}")
+        await asyncio.to_thread(
+            IMAGE_CACHE.put, user_id, cache_key, version, mime_type, image_data
+        )
 
         return base64.b64encode(image_data).decode("utf-8"), mime_type
     except Exception as e:
@@ -128,6 +202,46 @@ async def download_image_from_gcs(
         return None
 
 
+async def download_images_from_gcs(
+    artifact_service: GcsArtifactService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    image_hashes: list[str],
+    thumbnail: bool = True,
+) -> list[tuple[str, str] | None]:
+    """
+    Download several image artifacts concurrently, at most
+    ARTIFACT_IO_CONCURRENCY at a time.
+
+    Args:
+        artifact_service: The artifact service to use for downloading artifacts
+        app_name: The name of the application
+        user_id: The ID of the user
+        session_id: The ID of the session
+        image_hashes: The hash identifiers of the images to download
+        thumbnail: Download the thumbnails instead of the full images
+
+    Returns:
+        list[tuple[str, str] | None]: The (base64_encoded_data, mime_type) of each image in the
+            order of image_hashes, None for images that failed to download
+    """
+    semaphore = asyncio.Semaphore(SETTINGS.ARTIFACT_IO_CONCURRENCY)
+
+    async def download(image_hash: str) -> tuple[str, str] | None:
+        async with semaphore:
+            return await download_image_from_gcs(
+                artifact_service=artifact_service,
+                app_name=app_name,
+                user_id=user_id,
+                session_id=session_id,
+                image_hash=image_hash,
+                thumbnail=thumbnail,
+            )
+
+    return await asyncio.gather(*(download(image_hash) for image_hash in image_hashes))
+
+
 async def format_user_request_to_adk_content_and_store_artifacts(
     request: ChatRequest, app_name: str, artifact_service: GcsArtifactService
 ) -> types.Content:
@@ -144,23 +258,41 @@ async def format_user_request_to_adk_content_and_store_artifacts(
     # Create a list to hold parts
     parts = []
 
-    # Handle image files if present
-    for data in request.files:
-        # Process the image and add string placeholder
-
-        image_hash_id, image_byte = await store_uploaded_image_as_artifact(
-            artifact_service=artifact_service,
-            app_name=app_name,
-            user_id=request.user_id,
-            session_id=request.session_id,
-            image_data=data,
+    stored_images = []
+    if request.files:
+        # One listing covers the existence checks of every uploaded image
+        existing_filenames = set(
+            await artifact_service.list_artifact_keys(
+                app_name=app_name,
+                user_id=request.user_id,
+                session_id=request.session_id,
+            )
         )
+        # The same receipt attached twice is processed, uploaded and sent to the model once
+        unique_files: dict[str, ImageData] = {}
+        for data in request.files:
+            unique_files.setdefault(content_hash_id(base64.b64decode(data.serialized_image)), data)
+        semaphore = asyncio.Semaphore(SETTINGS.ARTIFACT_IO_CONCURRENCY)
+
+        async def store(data: ImageData) -> tuple[str, bytes, str]:
+            async with semaphore:
+                return await store_uploaded_image_as_artifact(
+                    artifact_service=artifact_service,
+                    app_name=app_name,
+                    user_id=request.user_id,
+                    session_id=request.session_id,
+                    image_data=data,
+                    existing_filenames=existing_filenames,
+                )
+
+        # Process and upload the images concurrently, results keep the upload order
+        stored_images = await asyncio.gather(*(store(data) for data in unique_files.values()))
 
+    # Handle image files if present
+    for image_hash_id, image_byte, mime_type in stored_images:
         # Add inline data part
         parts.append(
-            types.Part(
-                inline_data=types.Blob(mime_type=data.mime_type, data=image_byte)
-            )
+            types.Part(inline_data=types.Blob(mime_type=mime_type, data=image_byte))
         )
 
         # Add image placeholder identifier
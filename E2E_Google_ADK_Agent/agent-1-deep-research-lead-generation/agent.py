@@ -1,10 +1,13 @@
+import asyncio
 from google import genai
 from google.genai.types import Tool, GenerateContentConfig, FunctionDeclaration
+from concurrency import get_executor
 from config import GEN_ADVANCED_MODEL
+from llm_client import get_client
 from models import IntentExtractionResult, PatternReport, LeadReport
 from sub_agents.intent_extractor.agent import extract_intent
-from sub_agents.pattern_discovery.agent import pattern_discovery_workflow
-from sub_agents.lead_generation.agent import lead_generation_workflow
+from sub_agents.pattern_discovery.agent import run_pattern_discovery
+from sub_agents.lead_generation.agent import run_lead_generation
 from callbacks.state_manager import load_or_create_session, save_session
 from tools.user_interaction import get_user_choice
 from typing import Optional
@@ -35,12 +38,17 @@ Workflow:
 
 class InteractiveLeadGenerator:
     def __init__(self, session_id: Optional[str] = None):
-        self.client = genai.Client()
+        self.client = get_client()
         self.session = load_or_create_session(session_id)
         self.model = GEN_ADVANCED_MODEL
         
-    def run(self, user_input: str) -> str:
-        """Main conversation loop."""
+    async def run(self, user_input: str) -> str:
+        """Handle one user message and return the reply.
+
+        Stages run on the caller's event loop and share its LLM executor, so many
+        sessions can be served concurrently from one process. Calls for the same
+        session must not overlap.
+        """
         
         # Add to conversation history
         self.session.conversation_history.append({
@@ -50,11 +58,11 @@ class InteractiveLeadGenerator:
         
         # Route based on current stage
         if self.session.current_stage == "intent":
-            response = self._handle_intent_stage(user_input)
+            response = await self._handle_intent_stage(user_input)
         elif self.session.current_stage == "pattern_discovery":
-            response = self._handle_pattern_discovery_stage(user_input)
+            response = await self._handle_pattern_discovery_stage(user_input)
         elif self.session.current_stage == "review":
-            response = self._handle_review_stage(user_input)
+            response = await self._handle_review_stage(user_input)
         elif self.session.current_stage == "lead_generation":
             response = self._handle_lead_generation_stage(user_input)
         elif self.session.current_stage == "complete":
@@ -68,15 +76,15 @@ class InteractiveLeadGenerator:
             "role": "assistant",
             "content": response
         })
-        save_session(self.session)
+        await asyncio.to_thread(save_session, self.session)
         
         return response
     
-    def _handle_intent_stage(self, user_input: str) -> str:
+    async def _handle_intent_stage(self, user_input: str) -> str:
         """Handle intent extraction stage."""
         try:
             print("\n🎯 Extracting intent...")
-            intent = extract_intent(user_input)
+            intent = await get_executor().run(extract_intent, user_input)
             self.session.intent_data = intent
             
             # Confirm with user
@@ -93,7 +101,7 @@ Is this correct? (yes/no)"""
         except Exception as e:
             return f"I had trouble understanding your request. Could you please specify the industry and country you're interested in? Error: {str(e)}"
     
-    def _handle_pattern_discovery_stage(self, user_input: str) -> str:
+    async def _handle_pattern_discovery_stage(self, user_input: str) -> str:
         """Handle pattern discovery stage."""
         user_input_lower = user_input.lower().strip()
         
@@ -107,7 +115,7 @@ Is this correct? (yes/no)"""
         # Run pattern discovery
         try:
             print("\n🔬 Running pattern discovery workflow...")
-            pattern_report = pattern_discovery_workflow(self.session.intent_data)
+            pattern_report = await run_pattern_discovery(self.session.intent_data)
             self.session.pattern_report = pattern_report
             self.session.current_stage = "review"
             
@@ -127,7 +135,7 @@ Would you like to proceed with lead generation based on these patterns? (yes/no/
         except Exception as e:
             return f"I encountered an error during pattern discovery: {str(e)}\n\nWould you like to try again?"
     
-    def _handle_review_stage(self, user_input: str) -> str:
+    async def _handle_review_stage(self, user_input: str) -> str:
         """Handle pattern review stage."""
         user_input_lower = user_input.lower().strip()
         
@@ -144,7 +152,7 @@ Would you like to proceed with lead generation based on these patterns? (yes/no/
         # Run lead generation
         try:
             print("\n🚀 Running lead generation workflow...")
-            lead_report = lead_generation_workflow(self.session.pattern_report)
+            lead_report = await run_lead_generation(self.session.pattern_report)
             self.session.lead_report = lead_report
             self.session.current_stage = "complete"
             
@@ -0,0 +1,93 @@
+import argparse
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from google import genai
+from google.genai import types
+
+from config import GEN_FAST_MODEL
+from llm_client import get_client, http_client_args
+
+PROMPT = "Reply with the single word OK."
+
+
+class ConnectionCounter:
+    """Counts TCP connections opened by httpx (httpcore connects through socket.create_connection)."""
+
+    def __init__(self):
+        self.count = 0
+        self._create_connection = socket.create_connection
+
+    def __enter__(self) -> "ConnectionCounter":
+        def counting_create_connection(*args, **kwargs):
+            self.count += 1
+            return self._create_connection(*args, **kwargs)
+
+        socket.create_connection = counting_create_connection
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        socket.create_connection = self._create_connection
+
+
+def measure_construction(runs: int) -> float:
+    """Average milliseconds to construct a genai.Client, the cost paid per call before pooling."""
+    start = time.perf_counter()
+    for _ in range(runs):
+        genai.Client()
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def call(client_factory: Callable[[], genai.Client]) -> float:
+    start = time.perf_counter()
+    client_factory().models.generate_content(
+        model=GEN_FAST_MODEL,
+        contents=PROMPT,
+        config=types.GenerateContentConfig(max_output_tokens=4),
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_calls(name: str, client_factory: Callable[[], genai.Client], calls: int, concurrency: int) -> None:
+    with ConnectionCounter() as connections, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        latencies: List[float] = list(pool.map(lambda _: call(client_factory), range(calls)))
+        seconds = time.perf_counter() - start
+
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"  {name:<16} calls={calls:<4} p50={statistics.median(ordered):8.1f} ms  "
+        f"p95={p95:8.1f} ms  total={seconds:6.2f} s  connections opened={connections.count}"
+    )
+
+
+def main() -> None:
+    """Compare a new genai.Client per call with the shared pooled client."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--calls", type=int, default=30, help="LLM calls per mode")
+    parser.add_argument("--concurrency", type=int, default=10, help="Calls in flight at once")
+    parser.add_argument(
+        "--construction-only",
+        action="store_true",
+        help="Only measure client construction, without calling the API",
+    )
+    args = parser.parse_args()
+
+    print(f"HTTP client: {http_client_args()}")
+    print(f"Client construction: {measure_construction(20):.2f} ms per genai.Client()")
+    if args.construction_only:
+        return
+
+    print("Calls:")
+    measure_calls("client per call", genai.Client, args.calls, args.concurrency)
+    # Warm the shared client once, as the running app would have
+    call(get_client)
+    measure_calls("shared client", get_client, args.calls, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
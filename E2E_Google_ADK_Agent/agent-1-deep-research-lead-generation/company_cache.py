@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+from config import (
+    COMPANY_CACHE_COMPANY_TTL_DAYS,
+    COMPANY_CACHE_ENABLED,
+    COMPANY_CACHE_PATH,
+    COMPANY_CACHE_SIGNALS_TTL_DAYS,
+    COMPANY_CACHE_VALIDATION_TTL_DAYS,
+)
+from models import CompanyData, LeadData, SignalAnalysis, ValidationResult
+from sub_agents.shared.batching import normalize_company_name
+
+SECONDS_PER_DAY = 86400
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def company_key(name: str, country: Optional[str]) -> str:
+    """Cache key of a company: normalized name and country."""
+    return f"{normalize_company_name(name)}|{normalize_company_name(country or '')}"
+
+
+def signals_key(lead: LeadData, pattern_descriptions: Optional[Dict[str, str]] = None) -> str:
+    """Cache key of a signal analysis: the company plus a digest of what the lead was matched against.
+
+    Analyses judged against other patterns are not reused. The match score is left out,
+    it is generated anew by the LLM on every run and would make every key unique.
+    """
+    patterns = sorted((pattern_descriptions or {}).get(pattern, pattern) for pattern in lead.matching_patterns)
+    digest = hashlib.sha256(json.dumps(patterns).encode()).hexdigest()[:16]
+    return f"{company_key(lead.company.name, lead.company.country)}|{digest}"
+
+
+class CompanyCache:
+    """Persistent SQLite cache of company research shared by all sessions.
+
+    Stores CompanyData and ValidationResult per company (keyed by normalized name and
+    country), SignalAnalysis per company and matched patterns, and the companies found
+    per industry and country. Entries older than their TTL are treated as missing and
+    overwritten when the company is researched again.
+
+    Methods do blocking SQLite I/O, call them from async code through asyncio.to_thread.
+    Each call uses one connection and at most one commit, whatever the number of entries.
+    """
+
+    def __init__(
+        self,
+        path: str = COMPANY_CACHE_PATH,
+        company_ttl_days: float = COMPANY_CACHE_COMPANY_TTL_DAYS,
+        validation_ttl_days: float = COMPANY_CACHE_VALIDATION_TTL_DAYS,
+        signals_ttl_days: float = COMPANY_CACHE_SIGNALS_TTL_DAYS,
+    ):
+        self.path = Path(path)
+        self.ttls = {
+            "company": company_ttl_days * SECONDS_PER_DAY,
+            "discovery": company_ttl_days * SECONDS_PER_DAY,
+            "validation": validation_ttl_days * SECONDS_PER_DAY,
+            "signals": signals_ttl_days * SECONDS_PER_DAY,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS company_cache (
+                    kind TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (kind, key)
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _get_many(self, kind: str, keys: Sequence[str]) -> List[Optional[str]]:
+        """Fresh data per key, None for missing or stale keys."""
+        if not keys:
+            return []
+        unique_keys = list(dict.fromkeys(keys))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT key, data FROM company_cache WHERE kind = ? AND updated_at >= ? "
+                f"AND key IN ({', '.join('?' * len(unique_keys))})",
+                (kind, time.time() - self.ttls[kind], *unique_keys),
+            ).fetchall()
+        data = dict(rows)
+        return [data.get(key) for key in keys]
+
+    def _put(self, entries: Sequence[tuple]) -> None:
+        """Write (kind, key, data) entries in one transaction."""
+        if not entries:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO company_cache (kind, key, data, updated_at) VALUES (?, ?, ?, ?)",
+                [(kind, key, data, now) for kind, key, data in entries],
+            )
+
+    def _get_models(self, kind: str, keys: Sequence[str], model: Type[Model]) -> List[Optional[Model]]:
+        return [model.model_validate_json(data) if data else None for data in self._get_many(kind, keys)]
+
+    @staticmethod
+    def _company_entries(companies: Sequence[CompanyData]) -> List[tuple]:
+        return [
+            ("company", company_key(company.name, company.country), company.model_dump_json())
+            for company in companies
+        ]
+
+    def put_companies(self, companies: Sequence[CompanyData]) -> None:
+        self._put(self._company_entries(companies))
+
+    def get_discovery(self, industry: str, country: str) -> Optional[List[CompanyData]]:
+        """Companies found for an industry and country, None if any of them is missing or stale."""
+        [data] = self._get_many("discovery", [company_key(industry, country)])
+        if data is None:
+            return None
+        companies = self._get_models("company", json.loads(data), CompanyData)
+        return companies if all(companies) else None
+
+    def put_discovery(self, industry: str, country: str, companies: Sequence[CompanyData]) -> None:
+        keys = [company_key(company.name, company.country) for company in companies]
+        self._put(
+            self._company_entries(companies)
+            + [("discovery", company_key(industry, country), json.dumps(keys))]
+        )
+
+    def get_validations(self, companies: Sequence[CompanyData]) -> List[Optional[ValidationResult]]:
+        keys = [company_key(company.name, company.country) for company in companies]
+        return [
+            # The cached assessment applies to the company as it is described now
+            result.model_copy(update={"company": company}) if result else None
+            for company, result in zip(companies, self._get_models("validation", keys, ValidationResult))
+        ]
+
+    def put_validations(self, results: Sequence[ValidationResult]) -> None:
+        self._put(
+            [
+                ("validation", company_key(result.company.name, result.company.country), result.model_dump_json())
+                for result in results
+            ]
+        )
+
+    def get_signals(
+        self, leads: Sequence[LeadData], pattern_descriptions: Optional[Dict[str, str]] = None
+    ) -> List[Optional[SignalAnalysis]]:
+        keys = [signals_key(lead, pattern_descriptions) for lead in leads]
+        return [
+            result.model_copy(update={"lead": lead}) if result else None
+            for lead, result in zip(leads, self._get_models("signals", keys, SignalAnalysis))
+        ]
+
+    def put_signals(
+        self, results: Sequence[SignalAnalysis], pattern_descriptions: Optional[Dict[str, str]] = None
+    ) -> None:
+        self._put(
+            self._company_entries([result.lead.company for result in results])
+            + [("signals", signals_key(result.lead, pattern_descriptions), result.model_dump_json()) for result in results]
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_company_cache() -> Optional[CompanyCache]:
+    """Return the process-wide company cache, None when COMPANY_CACHE_ENABLED is off."""
+    return CompanyCache() if COMPANY_CACHE_ENABLED else None
+
+
+async def resolve_with_cache(
+    items: Sequence[Any],
+    get_cached: Optional[Callable[[List[Any]], List[Optional[Any]]]],
+    compute: Callable[[List[Any]], Awaitable[List[Optional[Any]]]],
+    store: Optional[Callable[[List[Any]], None]],
+    label: str,
+) -> List[Optional[Any]]:
+    """Return one result per item, reusing fresh cached results and computing only the rest.
+
+    get_cached and compute receive lists of items and return lists aligned with them,
+    with None for misses and failures. Computed results are passed to store. The
+    blocking cache calls run in a worker thread, once per list.
+    """
+    results = await asyncio.to_thread(get_cached, list(items)) if get_cached else [None] * len(items)
+    missing = [idx for idx, result in enumerate(results) if result is None]
+    if len(missing) < len(items):
+        print(f"♻️  Reusing {len(items) - len(missing)} cached {label}")
+
+    if missing:
+        computed = await compute([items[idx] for idx in missing])
+        for idx, result in zip(missing, computed):
+            results[idx] = result
+        if store:
+            await asyncio.to_thread(store, [result for result in computed if result is not None])
+    return results
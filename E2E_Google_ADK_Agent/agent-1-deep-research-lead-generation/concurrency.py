@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import random
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+import httpx
+from google.genai import errors
+
+from config import LLM_MAX_CONCURRENCY, LLM_MAX_RETRIES
+from error_handling import AgentError
+
+# Rate limits and transient server errors are worth retrying, other API errors are not
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RATE_LIMIT_STATUS_CODE = 429
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return whether a failed LLM call may succeed when retried."""
+    if isinstance(error, (httpx.TimeoutException, httpx.ConnectError, ConnectionError)):
+        return True
+    return isinstance(error, errors.APIError) and error.code in RETRYABLE_STATUS_CODES
+
+
+class LLMCallExecutor:
+    """Runs blocking LLM calls concurrently with a concurrency limit and backoff.
+
+    Calls run on a dedicated thread pool sized from the concurrency limit, so they
+    are not capped by the small default asyncio pool. Timeouts are enforced by the
+    HTTP client (see llm_client.get_client), so a timed-out call has really returned
+    before it is retried. A concurrency slot is held until the worker thread finishes,
+    even if the awaiting task is cancelled, so at most max_concurrency calls are ever
+    in flight. Timeouts, rate limits and server errors are retried with exponential
+    backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        max_retries: int = LLM_MAX_RETRIES,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(1, max_retries)
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm-call")
+
+    async def __aenter__(self) -> "LLMCallExecutor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the worker threads without waiting for running calls."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = self.initial_delay * (2 ** attempt)
+        if isinstance(error, errors.APIError) and error.code == RATE_LIMIT_STATUS_CODE:
+            # Quota windows are per minute, back off harder than for transient errors
+            delay *= 2
+        return min(self.max_delay, delay) * random.uniform(0.5, 1.0)
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in the pool, holding a concurrency slot until the thread is done."""
+        await self._semaphore.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(func, *args))
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._semaphore.release())
+        # Shielded, so cancelling the caller does not release the slot of a still running call
+        return await asyncio.shield(future)
+
+    async def run(self, func: Callable[..., Any], *args: Any, name: Optional[str] = None) -> Any:
+        """Run func(*args) in the pool once a concurrency slot is free, retrying transient failures."""
+        name = name or getattr(func, "__name__", "llm_call")
+
+        for attempt in range(self.max_retries):
+            try:
+                return await self._call(func, *args)
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries - 1:
+                    raise AgentError(
+                        agent_name=name,
+                        error_type="TIMEOUT" if isinstance(e, httpx.TimeoutException) else "LLM_CALL_FAILED",
+                        message=f"Failed after {attempt + 1} attempts: {str(e) or type(e).__name__}",
+                        recoverable=False,
+                    ) from e
+
+                delay = self._backoff(attempt, e)
+                print(f"⚠️  {name} attempt {attempt + 1} failed ({str(e) or type(e).__name__}), retrying in {delay:.1f}s...")
+                # Sleep outside the semaphore so other calls keep the slots busy
+                await asyncio.sleep(delay)
+
+
+
+# One executor per event loop, shared by all workflows and sessions running on it
+_EXECUTORS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMCallExecutor]" = weakref.WeakKeyDictionary()
+
+
+def get_executor() -> LLMCallExecutor:
+    """Return the LLMCallExecutor of the running event loop, creating it on first use.
+
+    Sharing it makes LLM_MAX_CONCURRENCY a limit for the whole process instead of per
+    workflow, however many sessions run at once.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _EXECUTORS.get(loop)
+    if executor is None:
+        executor = _EXECUTORS[loop] = LLMCallExecutor()
+    return executor
+
+
+def close_executor(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """Close the executor of loop (default: the running loop), if any, when the loop is shutting down."""
+    executor = _EXECUTORS.pop(loop or asyncio.get_running_loop(), None)
+    if executor is not None:
+        executor.close()
+
+
+async def run_in_batches(
+    executor: LLMCallExecutor,
+    batch_func: Callable[[List[Any]], List[Optional[Any]]],
+    items: Sequence[Any],
+    batch_size: int,
+    name: Optional[str] = None,
+) -> List[Optional[Any]]:
+    """Run batch_func over batches of at most batch_size items, returning one result per item.
+
+    batch_func takes a list of items and returns a list aligned with it, holding None
+    for items it could not answer. A batch that failed on an unusable response (e.g.
+    invalid JSON), and the unanswered items of a partially answered one, are split in
+    half and retried until they are single items, so one bad item only costs its own
+    result. A batch whose call failed on a retryable error (rate limit, server error,
+    timeout) after all executor retries is not split, as more requests would only add
+    load; its items get None, as do items that fail alone.
+    """
+    name = name or getattr(batch_func, "__name__", "llm_batch")
+
+    async def run_batch(batch: List[Any]) -> List[Optional[Any]]:
+        try:
+            results = await executor.run(batch_func, batch, name=f"{name}[{len(batch)}]")
+        except AgentError as e:
+            if len(batch) == 1 or (e.__cause__ is not None and is_retryable(e.__cause__)):
+                return [None] * len(batch)
+            results = [None] * len(batch)
+
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing and len(batch) > 1:
+            print(f"⚠️  {name}: {len(missing)} of {len(batch)} items unanswered, splitting the batch...")
+            retry = [batch[idx] for idx in missing]
+            half = (len(retry) + 1) // 2
+            halves = [retry[:half], retry[half:]] if len(retry) > 1 else [retry]
+            retried = [result for part in await asyncio.gather(*map(run_batch, halves)) for result in part]
+            for idx, result in zip(missing, retried):
+                results[idx] = result
+        return results
+
+    batch_size = max(1, batch_size)
+    batches = [list(items[start:start + batch_size]) for start in range(0, len(items), batch_size)]
+    return [result for part in await asyncio.gather(*map(run_batch, batches)) for result in part]
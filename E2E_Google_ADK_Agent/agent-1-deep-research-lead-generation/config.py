@@ -6,6 +6,21 @@ load_dotenv()
 GEN_ADVANCED_MODEL = os.getenv("GEN_ADVANCED_MODEL", "gemini-2.5-flash")
 GEN_FAST_MODEL = os.getenv("GEN_FAST_MODEL", "gemini-2.5-flash")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "60"))
+LLM_GENERATION_TIMEOUT = float(os.getenv("LLM_GENERATION_TIMEOUT", "300"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "5"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+COMPANY_CACHE_ENABLED = os.getenv("COMPANY_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPANY_CACHE_PATH = os.getenv("COMPANY_CACHE_PATH", ".cache/companies.sqlite3")
+COMPANY_CACHE_COMPANY_TTL_DAYS = float(os.getenv("COMPANY_CACHE_COMPANY_TTL_DAYS", "30"))
+COMPANY_CACHE_VALIDATION_TTL_DAYS = float(os.getenv("COMPANY_CACHE_VALIDATION_TTL_DAYS", "14"))
+COMPANY_CACHE_SIGNALS_TTL_DAYS = float(os.getenv("COMPANY_CACHE_SIGNALS_TTL_DAYS", "3"))
+SERVER_MAX_ACTIVE_SESSIONS = int(os.getenv("SERVER_MAX_ACTIVE_SESSIONS", "1000"))
 
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY environment variable is required")
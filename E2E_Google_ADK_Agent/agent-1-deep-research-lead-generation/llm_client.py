@@ -0,0 +1,53 @@
+import functools
+import importlib.util
+from typing import Any, Dict
+
+import httpx
+from google import genai
+from google.genai import types
+
+from config import (
+    LLM_CALL_TIMEOUT,
+    LLM_GENERATION_TIMEOUT,
+    LLM_HTTP2,
+    LLM_KEEPALIVE_EXPIRY,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+def http_client_args() -> Dict[str, Any]:
+    """httpx arguments of the shared client: pool limits, keep-alive and HTTP/2 when h2 is installed."""
+    return {
+        "http2": LLM_HTTP2 and importlib.util.find_spec("h2") is not None,
+        "limits": httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def generation_http_options() -> types.HttpOptions:
+    """Per-request options for long single generations, which get LLM_GENERATION_TIMEOUT instead of LLM_CALL_TIMEOUT."""
+    return types.HttpOptions(timeout=int(LLM_GENERATION_TIMEOUT * 1000))
+
+
+@functools.lru_cache(maxsize=None)
+def get_client() -> genai.Client:
+    """Return the process-wide genai client shared by all sub-agents.
+
+    The client is created on first use. Its sync and async HTTP connection pools are
+    kept alive between calls, so sub-agents reuse TLS connections instead of opening
+    new ones per call. With HTTP/2, concurrent calls are multiplexed over a few
+    connections. Requests time out after LLM_CALL_TIMEOUT seconds in the HTTP client,
+    which raises httpx.TimeoutException in the calling thread.
+    """
+    client_args = http_client_args()
+    return genai.Client(
+        http_options=types.HttpOptions(
+            client_args=client_args,
+            async_client_args=client_args,
+            timeout=int(LLM_CALL_TIMEOUT * 1000),
+        )
+    )
@@ -4,6 +4,7 @@ Deep Research Lead Generation Agent
 Main entry point for the interactive lead generation system.
 """
 
+import asyncio
 import sys
 import os
 from pathlib import Path
@@ -19,6 +20,7 @@ print()
 # Import and run
 try:
     from agent import InteractiveLeadGenerator
+    from concurrency import close_executor
     
     print("✅ Modules loaded successfully")
     print()
@@ -39,6 +41,9 @@ try:
     print("Example: 'Find SaaS companies in California'")
     print()
     
+    # One event loop for the whole conversation, so the LLM executor is reused between turns
+    loop = asyncio.new_event_loop()
+    
     # Main loop
     while True:
         try:
@@ -53,7 +58,7 @@ try:
             
             # Process
             print()
-            response = agent.run(user_input)
+            response = loop.run_until_complete(agent.run(user_input))
             
             # Clean output
             print("─" * 70)
@@ -67,6 +72,9 @@ try:
         except Exception as e:
             print(f"\n⚠️  Error: {str(e)}")
             print("Please try again or type 'quit' to exit.\n")
+    
+    close_executor(loop)
+    loop.close()
 
 except ImportError as e:
     print(f"❌ Import error: {e}")
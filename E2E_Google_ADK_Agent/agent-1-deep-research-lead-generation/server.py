@@ -0,0 +1,135 @@
+"""
+Deep Research Lead Generation API
+Serves many concurrent lead generation sessions from one process:
+
+    uvicorn server:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from agent import InteractiveLeadGenerator
+from callbacks.state_manager import SESSION_DIR, save_session
+from concurrency import close_executor, get_executor
+from config import SERVER_MAX_ACTIVE_SESSIONS
+from llm_client import get_client
+
+
+class MessageRequest(BaseModel):
+    message: str
+
+
+class MessageResponse(BaseModel):
+    session_id: str
+    stage: str
+    response: str
+
+
+class SessionResponse(BaseModel):
+    session_id: str
+    stage: str
+    conversation_history: List[Dict[str, Any]]
+
+
+class SessionRegistry:
+    """Active sessions of the server, each with a lock so its turns run one at a time.
+
+    Sessions are persisted after every turn, so the least recently used idle ones are
+    dropped from memory above max_active and reloaded from disk when used again.
+    """
+
+    def __init__(self, max_active: int = SERVER_MAX_ACTIVE_SESSIONS):
+        self.max_active = max_active
+        self._agents: "OrderedDict[str, InteractiveLeadGenerator]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def create(self) -> InteractiveLeadGenerator:
+        agent = InteractiveLeadGenerator()
+        await asyncio.to_thread(save_session, agent.session)
+        self._add(agent)
+        return agent
+
+    async def get(self, session_id: str) -> InteractiveLeadGenerator:
+        """Return the session's agent, loading it from disk if needed. Raises HTTPException 404."""
+        if session_id in self._agents:
+            self._agents.move_to_end(session_id)
+            return self._agents[session_id]
+
+        # Session IDs are file names, only accept the UUIDs created by this server
+        try:
+            uuid.UUID(session_id)
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if not (SESSION_DIR / f"{session_id}.json").exists():
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        agent = await asyncio.to_thread(InteractiveLeadGenerator, session_id)
+        # A concurrent request may have loaded the same session meanwhile
+        if session_id in self._agents:
+            return self._agents[session_id]
+        self._add(agent)
+        return agent
+
+    def lock(self, session_id: str) -> asyncio.Lock:
+        return self._locks[session_id]
+
+    def _add(self, agent: InteractiveLeadGenerator) -> None:
+        session_id = agent.session.session_id
+        self._agents[session_id] = agent
+        self._locks[session_id] = asyncio.Lock()
+
+        idle = [sid for sid in self._agents if not self._locks[sid].locked() and sid != session_id]
+        for sid in idle[: max(0, len(self._agents) - self.max_active)]:
+            del self._agents[sid]
+            del self._locks[sid]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared client and the loop's executor up front, not on the first request
+    get_client()
+    get_executor()
+    yield
+    close_executor()
+
+
+app = FastAPI(title="Deep Research Lead Generation Agent", lifespan=lifespan)
+sessions = SessionRegistry()
+
+
+def _session_response(agent: InteractiveLeadGenerator) -> SessionResponse:
+    return SessionResponse(
+        session_id=agent.session.session_id,
+        stage=agent.session.current_stage,
+        conversation_history=agent.session.conversation_history,
+    )
+
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session() -> SessionResponse:
+    """Start a new lead generation session."""
+    return _session_response(await sessions.create())
+
+
+@app.get("/sessions/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str) -> SessionResponse:
+    """Return the stage and conversation history of a session."""
+    return _session_response(await sessions.get(session_id))
+
+
+@app.post("/sessions/{session_id}/messages", response_model=MessageResponse)
+async def send_message(session_id: str, request: MessageRequest) -> MessageResponse:
+    """Send a user message to a session and return the agent's reply.
+
+    Messages of the same session are handled in order, different sessions run concurrently.
+    """
+    agent = await sessions.get(session_id)
+    async with sessions.lock(session_id):
+        response = await agent.run(request.message)
+    return MessageResponse(session_id=session_id, stage=agent.session.current_stage, response=response)
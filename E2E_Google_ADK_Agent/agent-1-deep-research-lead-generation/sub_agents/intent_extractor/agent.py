@@ -1,6 +1,8 @@
 from google import genai
 from google.genai import types
 from config import GEN_FAST_MODEL
+from llm_client import generation_http_options, get_client
+from typing import Optional
 from models import IntentExtractionResult
 import json
 
@@ -35,19 +37,19 @@ Example outputs:
 }"""
 
 
-def create_intent_extractor_agent():
-    client = genai.Client()
-    return client, INTENT_EXTRACTOR_PROMPT
+def create_intent_extractor_agent(client: Optional[genai.Client] = None):
+    return client or get_client(), INTENT_EXTRACTOR_PROMPT
 
 
-def extract_intent(user_input: str) -> IntentExtractionResult:
-    client, prompt = create_intent_extractor_agent()
+def extract_intent(user_input: str, client: Optional[genai.Client] = None) -> IntentExtractionResult:
+    client, prompt = create_intent_extractor_agent(client)
     
     response = client.models.generate_content(
         model=GEN_FAST_MODEL,
         contents=f"{prompt}\n\nUser request: {user_input}\n\nProvide the JSON response:",
         config=types.GenerateContentConfig(
-            response_mime_type="application/json"
+            response_mime_type="application/json",
+            http_options=generation_http_options()
         )
     )
     
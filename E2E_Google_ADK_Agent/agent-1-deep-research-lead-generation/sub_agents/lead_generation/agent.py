@@ -1,4 +1,4 @@
-import asyncio
+from concurrency import get_executor
 from models import PatternReport, LeadReport
 from sub_agents.lead_generation.lead_finder.agent import find_leads
 from sub_agents.lead_generation.lead_formatter.agent import format_leads
@@ -8,11 +8,16 @@ from sub_agents.lead_generation.report_compiler.agent import compile_report
 
 
 async def run_lead_generation(pattern_report: PatternReport) -> LeadReport:
-    """Execute the complete Lead Generation workflow."""
+    """Execute the complete Lead Generation workflow.
+
+    Blocking LLM calls run on the shared executor, so the event loop keeps serving
+    other sessions meanwhile.
+    """
+    executor = get_executor()
     
     # Step 1: Find leads
     print(f"🔍 Finding leads based on {len(pattern_report.patterns)} patterns...")
-    raw_leads = find_leads(pattern_report)
+    raw_leads = await executor.run(find_leads, pattern_report)
     
     # Step 2: Format leads
     pattern_ids = [p.pattern_id for p in pattern_report.patterns]
@@ -32,7 +37,10 @@ async def run_lead_generation(pattern_report: PatternReport) -> LeadReport:
     
     # Step 3: Lead research orchestration (parallel validation + analysis)
     print(f"✅ Analyzing {len(formatted_leads)} leads in parallel...")
-    analysis_results = await orchestrate_lead_research(formatted_leads)
+    pattern_descriptions = {p.pattern_id: p.description for p in pattern_report.patterns}
+    analysis_results = await orchestrate_lead_research(
+        formatted_leads, executor=executor, pattern_descriptions=pattern_descriptions
+    )
     
     # Step 4: Consolidate results
     print(f"🔄 Consolidating analysis results...")
@@ -40,11 +48,7 @@ async def run_lead_generation(pattern_report: PatternReport) -> LeadReport:
     
     # Step 5: Compile report
     print(f"📊 Compiling final report...")
-    lead_report = compile_report(consolidated_data)
+    lead_report = await executor.run(compile_report, consolidated_data)
     
     return lead_report
 
-
-def lead_generation_workflow(pattern_report: PatternReport) -> LeadReport:
-    """Synchronous wrapper for lead generation."""
-    return asyncio.run(run_lead_generation(pattern_report))
@@ -1,7 +1,9 @@
 from google import genai
+from google.genai import types
 from config import GEN_FAST_MODEL
 from models import PatternReport
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from llm_client import generation_http_options, get_client
 import json
 
 LEAD_FINDER_PROMPT = """You are a lead discovery specialist. Your task is to find companies that match the success patterns identified in the pattern report.
@@ -15,8 +17,8 @@ Use the patterns to construct targeted searches for similar companies. Look for:
 Return 20-30 potential leads with basic information."""
 
 
-def find_leads(pattern_report: PatternReport) -> List[Dict[str, Any]]:
-    client = genai.Client()
+def find_leads(pattern_report: PatternReport, client: Optional[genai.Client] = None) -> List[Dict[str, Any]]:
+    client = client or get_client()
     
     patterns_summary = "\n".join([
         f"- {p.description} (Confidence: {p.confidence_score}, Frequency: {p.frequency})"
@@ -34,7 +36,8 @@ Find potential leads matching these patterns. Return JSON array with fields: nam
     
     response = client.models.generate_content(
         model=GEN_FAST_MODEL,
-        contents=prompt
+        contents=prompt,
+        config=types.GenerateContentConfig(http_options=generation_http_options())
     )
     
     try:
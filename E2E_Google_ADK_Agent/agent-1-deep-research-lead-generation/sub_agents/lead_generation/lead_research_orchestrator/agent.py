@@ -1,32 +1,55 @@
 import asyncio
-from typing import List
-from models import LeadData, LeadAnalysisResult, ValidationResult, SignalAnalysis
-from sub_agents.shared.validator.agent import validate_company
-from sub_agents.lead_generation.signal_analyzer.agent import analyze_signals
+from typing import Dict, List, Optional
+from company_cache import get_company_cache, resolve_with_cache
+from concurrency import LLMCallExecutor, get_executor
+from config import LLM_BATCH_SIZE
+from models import LeadData, LeadAnalysisResult
+from sub_agents.shared.validator.agent import validate_companies
+from sub_agents.lead_generation.signal_analyzer.agent import analyze_leads_signals
 
 
-async def analyze_lead_async(lead: LeadData) -> LeadAnalysisResult:
-    """Run validator and signal analyzer in parallel for a single lead."""
-    validation_task = asyncio.to_thread(validate_company, lead.company)
-    signals_task = asyncio.to_thread(analyze_signals, lead)
-    
-    validation, signals = await asyncio.gather(validation_task, signals_task)
-    
-    return LeadAnalysisResult(
-        lead=lead,
-        validation=validation,
-        signals=signals
-    )
+async def orchestrate_lead_research(
+    leads: List[LeadData],
+    batch_size: int = LLM_BATCH_SIZE,
+    executor: Optional[LLMCallExecutor] = None,
+    pattern_descriptions: Optional[Dict[str, str]] = None,
+) -> List[LeadAnalysisResult]:
+    """Execute validation and signal analysis in parallel for all leads.
 
-
-async def orchestrate_lead_research(leads: List[LeadData]) -> List[LeadAnalysisResult]:
-    """Execute analysis pipelines in parallel for all leads."""
-    analysis_tasks = [analyze_lead_async(lead) for lead in leads]
-    results = await asyncio.gather(*analysis_tasks, return_exceptions=True)
+    With a batch_size above 1, leads are validated and analyzed in batched requests,
+    cutting the request count and the repeated prompt tokens by about batch_size times.
+    Fresh results from the company cache are reused, only unseen or stale companies
+    are sent to the LLM. Signal analyses are only reused for the same matched patterns
+    (pattern_descriptions maps pattern IDs to descriptions) and match score.
+    """
+    cache = get_company_cache()
+    # The shared executor bounds these calls together with those of other sessions
+    executor = executor or get_executor()
+    validations, signals = await asyncio.gather(
+        resolve_with_cache(
+            [lead.company for lead in leads],
+            cache.get_validations if cache else None,
+            lambda missing: validate_companies(missing, executor, batch_size),
+            cache.put_validations if cache else None,
+            label="lead validations",
+        ),
+        resolve_with_cache(
+            leads,
+            (lambda missing: cache.get_signals(missing, pattern_descriptions)) if cache else None,
+            lambda missing: analyze_leads_signals(missing, executor, batch_size),
+            (lambda results: cache.put_signals(results, pattern_descriptions)) if cache else None,
+            label="signal analyses",
+        ),
+    )
+    
+    valid_results = [
+        LeadAnalysisResult(lead=lead, validation=validation, signals=signal)
+        for lead, validation, signal in zip(leads, validations, signals)
+        if validation is not None and signal is not None
+    ]
     
-    valid_results = []
-    for result in results:
-        if isinstance(result, LeadAnalysisResult):
-            valid_results.append(result)
+    failed = len(leads) - len(valid_results)
+    if failed:
+        print(f"⚠️  {failed} of {len(leads)} lead analyses failed and were skipped")
     
     return valid_results
@@ -2,7 +2,8 @@ from google import genai
 from google.genai import types
 from config import GEN_ADVANCED_MODEL
 from models import LeadReport
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from llm_client import generation_http_options, get_client
 import json
 
 REPORT_COMPILER_PROMPT = """You are a lead generation report specialist. Your task is to compile a comprehensive lead report.
@@ -22,8 +23,8 @@ Return a JSON object with:
 - methodology_notes: string explaining the analysis process"""
 
 
-def compile_report(consolidated_data: Dict[str, Any]) -> LeadReport:
-    client = genai.Client()
+def compile_report(consolidated_data: Dict[str, Any], client: Optional[genai.Client] = None) -> LeadReport:
+    client = client or get_client()
     
     high_priority = consolidated_data.get("high_priority", [])
     medium_priority = consolidated_data.get("medium_priority", [])
@@ -49,7 +50,8 @@ Generate comprehensive lead report as JSON:"""
         model=GEN_ADVANCED_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
-            response_mime_type="application/json"
+            response_mime_type="application/json",
+            http_options=generation_http_options()
         )
     )
     
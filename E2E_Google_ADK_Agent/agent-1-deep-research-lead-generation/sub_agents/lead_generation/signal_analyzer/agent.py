@@ -1,7 +1,12 @@
+import asyncio
 from google import genai
 from google.genai import types
-from config import GEN_FAST_MODEL
+from concurrency import LLMCallExecutor, run_in_batches
+from config import GEN_FAST_MODEL, LLM_BATCH_SIZE
+from llm_client import get_client
+from typing import List, Optional
 from models import LeadData, SignalAnalysis
+from sub_agents.shared.batching import BATCH_INSTRUCTIONS, batch_response_schema, parse_batch_response
 import json
 
 SIGNAL_ANALYZER_PROMPT = """You are a lead signal analysis expert. Your task is to identify success signals and growth indicators in potential leads.
@@ -19,10 +24,11 @@ Return a JSON object with:
 - growth_indicators: array of positive growth signs
 - risk_factors: array of potential concerns
 - recommendation_score: float 0-1 for pursuing this lead"""
+BATCH_RESPONSE_SCHEMA = batch_response_schema(SignalAnalysis, "lead")
 
 
-def analyze_signals(lead: LeadData) -> SignalAnalysis:
-    client = genai.Client()
+def analyze_signals(lead: LeadData, client: Optional[genai.Client] = None) -> SignalAnalysis:
+    client = client or get_client()
     
     prompt = f"""{SIGNAL_ANALYZER_PROMPT}
 
@@ -47,3 +53,64 @@ Provide signal analysis as JSON:"""
     data = json.loads(response.text)
     result = SignalAnalysis(lead=lead, **data)
     return result
+
+
+def analyze_signals_batch(
+    leads: List[LeadData], client: Optional[genai.Client] = None
+) -> List[Optional[SignalAnalysis]]:
+    """Analyze the signals of several leads in one request, sharing the prompt preamble.
+
+    Returns one analysis per lead, in order, with None for leads missing or
+    malformed in the response.
+    """
+    client = client or get_client()
+    
+    lead_list = "\n\n".join(
+        f"""Company {index}: {lead.company.name}
+Industry: {lead.company.industry}
+Country: {lead.company.country}
+Description: {lead.company.description}
+Match Score: {lead.match_score}
+Matching Patterns: {', '.join(lead.matching_patterns)}"""
+        for index, lead in enumerate(leads, 1)
+    )
+    prompt = f"""{SIGNAL_ANALYZER_PROMPT}
+
+{BATCH_INSTRUCTIONS.format(count=len(leads))}
+
+Leads to analyze:
+{lead_list}
+
+Provide signal analyses as a JSON array:"""
+    
+    response = client.models.generate_content(
+        model=GEN_FAST_MODEL,
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_json_schema=BATCH_RESPONSE_SCHEMA
+        )
+    )
+    
+    entries = parse_batch_response(response.text, [lead.company.name for lead in leads])
+    results = []
+    for lead, data in zip(leads, entries):
+        try:
+            results.append(SignalAnalysis(lead=lead, **data) if data else None)
+        except (TypeError, ValueError):
+            results.append(None)
+    return results
+
+
+async def analyze_leads_signals(
+    leads: List[LeadData], executor: LLMCallExecutor, batch_size: int = LLM_BATCH_SIZE
+) -> List[Optional[SignalAnalysis]]:
+    """Analyze lead signals concurrently, batch_size per request, with None for failed analyses."""
+    if batch_size > 1:
+        return await run_in_batches(executor, analyze_signals_batch, leads, batch_size)
+    
+    results = await asyncio.gather(
+        *[executor.run(analyze_signals, lead, name=f"analyze_signals({lead.company.name})") for lead in leads],
+        return_exceptions=True
+    )
+    return [result if isinstance(result, SignalAnalysis) else None for result in results]
@@ -1,4 +1,6 @@
 import asyncio
+from company_cache import get_company_cache
+from concurrency import get_executor
 from models import IntentExtractionResult, PatternReport
 from sub_agents.pattern_discovery.company_finder.agent import find_companies
 from sub_agents.pattern_discovery.company_formatter.agent import format_companies
@@ -8,15 +10,29 @@ from sub_agents.pattern_discovery.pattern_synthesizer.agent import synthesize_pa
 
 
 async def run_pattern_discovery(intent: IntentExtractionResult) -> PatternReport:
-    """Execute the complete Pattern Discovery workflow."""
-    
-    # Step 1: Find companies
-    print(f"🔍 Finding companies in {intent.industry} ({intent.country})...")
-    raw_companies = find_companies(intent)
+    """Execute the complete Pattern Discovery workflow.
+
+    Blocking LLM calls run on the shared executor, so the event loop keeps serving
+    other sessions meanwhile.
+    """
+    executor = get_executor()
     
-    # Step 2: Format companies
-    print(f"📋 Formatting {len(raw_companies)} companies...")
-    formatted_companies = format_companies(raw_companies)
+    # Step 1: Find companies, reusing a fresh search of the same industry and country
+    cache = get_company_cache()
+    formatted_companies = (
+        await asyncio.to_thread(cache.get_discovery, intent.industry, intent.country) if cache else None
+    )
+    if formatted_companies:
+        print(f"♻️  Reusing {len(formatted_companies)} cached companies in {intent.industry} ({intent.country})")
+    else:
+        print(f"🔍 Finding companies in {intent.industry} ({intent.country})...")
+        raw_companies = await executor.run(find_companies, intent)
+        
+        # Step 2: Format companies
+        print(f"📋 Formatting {len(raw_companies)} companies...")
+        formatted_companies = format_companies(raw_companies, intent.industry, intent.country)
+        if cache and formatted_companies:
+            await asyncio.to_thread(cache.put_discovery, intent.industry, intent.country, formatted_companies)
     
     if not formatted_companies:
         return PatternReport(
@@ -28,7 +44,7 @@ async def run_pattern_discovery(intent: IntentExtractionResult) -> PatternReport
     
     # Step 3: Research orchestration (parallel validation)
     print(f"✅ Validating {len(formatted_companies)} companies in parallel...")
-    validation_results = await orchestrate_research(formatted_companies)
+    validation_results = await orchestrate_research(formatted_companies, executor=executor)
     
     # Step 4: Synthesize data
     print(f"🔄 Consolidating validation results...")
@@ -36,11 +52,7 @@ async def run_pattern_discovery(intent: IntentExtractionResult) -> PatternReport
     
     # Step 5: Pattern synthesis
     print(f"🎯 Synthesizing patterns from {consolidated_data['total_analyzed']} companies...")
-    pattern_report = synthesize_patterns(consolidated_data)
+    pattern_report = await executor.run(synthesize_patterns, consolidated_data)
     
     return pattern_report
 
-
-def pattern_discovery_workflow(intent: IntentExtractionResult) -> PatternReport:
-    """Synchronous wrapper for pattern discovery."""
-    return asyncio.run(run_pattern_discovery(intent))
@@ -2,7 +2,8 @@ from google import genai
 from google.genai import types
 from config import GEN_FAST_MODEL
 from models import IntentExtractionResult
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from llm_client import generation_http_options, get_client
 
 COMPANY_FINDER_PROMPT = """You are a company research specialist. Your task is to find successful companies based on the given criteria.
 
@@ -17,8 +18,8 @@ Focus on:
 Return a list of companies with basic information: name, brief description, and why they're successful."""
 
 
-def find_companies(intent: IntentExtractionResult) -> List[Dict[str, Any]]:
-    client = genai.Client()
+def find_companies(intent: IntentExtractionResult, client: Optional[genai.Client] = None) -> List[Dict[str, Any]]:
+    client = client or get_client()
     
     prompt = f"""{COMPANY_FINDER_PROMPT}
 
@@ -30,7 +31,8 @@ Provide a JSON array of companies with fields: name, description, success_factor
     
     response = client.models.generate_content(
         model=GEN_FAST_MODEL,
-        contents=prompt
+        contents=prompt,
+        config=types.GenerateContentConfig(http_options=generation_http_options())
     )
     
     # Parse the response - in real implementation, this would use structured output
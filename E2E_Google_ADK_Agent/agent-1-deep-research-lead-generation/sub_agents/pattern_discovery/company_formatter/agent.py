@@ -1,8 +1,11 @@
 from typing import List, Dict, Any
 from models import CompanyData
 
-def format_companies(raw_companies: List[Dict[str, Any]]) -> List[CompanyData]:
-    """Transform raw company data into standardized CompanyData objects."""
+def format_companies(raw_companies: List[Dict[str, Any]], industry: str = "", country: str = "") -> List[CompanyData]:
+    """Transform raw company data into standardized CompanyData objects.
+
+    industry and country fill in the searched values where the raw data has none.
+    """
     formatted = []
     seen_names = set()
     
@@ -17,8 +20,8 @@ def format_companies(raw_companies: List[Dict[str, Any]]) -> List[CompanyData]:
         
         company = CompanyData(
             name=name,
-            industry=raw.get("industry", ""),
-            country=raw.get("country", ""),
+            industry=raw.get("industry") or industry,
+            country=raw.get("country") or country,
             website=raw.get("website"),
             description=raw.get("description", ""),
             metadata={
@@ -2,7 +2,8 @@ from google import genai
 from google.genai import types
 from config import GEN_ADVANCED_MODEL
 from models import PatternReport, SuccessPattern
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from llm_client import generation_http_options, get_client
 import json
 
 PATTERN_SYNTHESIZER_PROMPT = """You are a pattern analysis expert. Your task is to identify common success patterns across validated companies.
@@ -28,8 +29,8 @@ Return a JSON object with:
 - confidence_level: string (High/Medium/Low)"""
 
 
-def synthesize_patterns(consolidated_data: Dict[str, Any]) -> PatternReport:
-    client = genai.Client()
+def synthesize_patterns(consolidated_data: Dict[str, Any], client: Optional[genai.Client] = None) -> PatternReport:
+    client = client or get_client()
     
     companies = consolidated_data.get("consolidated_data", {}).get("companies", [])
     
@@ -57,7 +58,8 @@ Generate pattern analysis report as JSON:"""
         model=GEN_ADVANCED_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
-            response_mime_type="application/json"
+            response_mime_type="application/json",
+            http_options=generation_http_options()
         )
     )
     
@@ -1,23 +1,32 @@
-import asyncio
-from typing import List
+from typing import List, Optional
+from company_cache import get_company_cache, resolve_with_cache
+from concurrency import LLMCallExecutor, get_executor
+from config import LLM_BATCH_SIZE
 from models import CompanyData, ValidationResult
-from sub_agents.shared.validator.agent import validate_company
+from sub_agents.shared.validator.agent import validate_companies
 
 
-async def validate_company_async(company: CompanyData) -> ValidationResult:
-    """Async wrapper for company validation."""
-    return validate_company(company)
+async def orchestrate_research(companies: List[CompanyData], batch_size: int = LLM_BATCH_SIZE, executor: Optional[LLMCallExecutor] = None) -> List[ValidationResult]:
+    """Execute validation pipelines in parallel for all companies, batch_size companies per request.
 
-
-async def orchestrate_research(companies: List[CompanyData]) -> List[ValidationResult]:
-    """Execute validation pipelines in parallel for all companies."""
-    validation_tasks = [validate_company_async(company) for company in companies]
-    results = await asyncio.gather(*validation_tasks, return_exceptions=True)
+    Fresh validations from the company cache are reused, only unseen or stale
+    companies are sent to the LLM.
+    """
+    cache = get_company_cache()
+    executor = executor or get_executor()
+    results = await resolve_with_cache(
+        companies,
+        cache.get_validations if cache else None,
+        lambda missing: validate_companies(missing, executor, batch_size),
+        cache.put_validations if cache else None,
+        label="company validations",
+    )
+    
+    # Filter out failures and return valid results
+    valid_results = [result for result in results if result is not None]
     
-    # Filter out exceptions and return valid results
-    valid_results = []
-    for result in results:
-        if isinstance(result, ValidationResult):
-            valid_results.append(result)
+    failed = len(results) - len(valid_results)
+    if failed:
+        print(f"⚠️  {failed} of {len(results)} company validations failed and were skipped")
     
     return valid_results
@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from pydantic import BaseModel, TypeAdapter, create_model
+
+BATCH_INSTRUCTIONS = """You are given {count} numbered companies. Assess each one independently as described above.
+Return ONLY a JSON array with one JSON object per company, each in the format described above plus an
+"index" field holding the company number and a "company_name" field holding the company name exactly as given."""
+
+
+def normalize_company_name(name: str) -> str:
+    """Case and whitespace insensitive company name, used to match batched responses."""
+    return " ".join(name.casefold().split())
+
+
+def batch_response_schema(result_model: Type[BaseModel], subject_field: str) -> Dict[str, Any]:
+    """JSON schema of a batched response: an array of result_model entries plus index and company_name.
+
+    subject_field (the input company or lead) is filled in locally and left out. A JSON
+    schema is used instead of response_schema, which rejects the free-form dict fields
+    of the results in Gemini Developer API mode.
+    """
+    fields = {
+        name: (field.annotation, field)
+        for name, field in result_model.model_fields.items()
+        if name != subject_field
+    }
+    entry = create_model(
+        f"Batch{result_model.__name__}", index=(int, ...), company_name=(str, ...), **fields
+    )
+    return TypeAdapter(List[entry]).json_schema()
+
+
+def parse_batch_response(text: str, names: Sequence[str]) -> List[Optional[Dict[str, Any]]]:
+    """Parse a batched JSON array response into one entry per given company name, in order.
+
+    Entries are matched by their 1-based index and dropped when their company_name does
+    not match the company at that index, so duplicate names in a batch get their own entries.
+    """
+    data = json.loads(text)
+    if not isinstance(data, list):
+        raise ValueError(f"Expected a JSON array of companies, got {type(data).__name__}")
+
+    entries: List[Optional[Dict[str, Any]]] = [None] * len(names)
+    for entry in data:
+        if not isinstance(entry, dict) or not isinstance(entry.get("company_name"), str):
+            continue
+        index = entry.pop("index", None)
+        name = entry.pop("company_name")
+        if (
+            isinstance(index, int)
+            and 1 <= index <= len(names)
+            and entries[index - 1] is None
+            and normalize_company_name(name) == normalize_company_name(names[index - 1])
+        ):
+            entries[index - 1] = entry
+    return entries
@@ -1,7 +1,12 @@
+import asyncio
 from google import genai
 from google.genai import types
-from config import GEN_FAST_MODEL
+from concurrency import LLMCallExecutor, run_in_batches
+from config import GEN_FAST_MODEL, LLM_BATCH_SIZE
+from llm_client import get_client
+from typing import List, Optional
 from models import CompanyData, ValidationResult
+from sub_agents.shared.batching import BATCH_INSTRUCTIONS, batch_response_schema, parse_batch_response
 import json
 
 VALIDATOR_PROMPT = """You are a company validation specialist. Your task is to verify if a company meets quality criteria.
@@ -26,10 +31,11 @@ Example:
   "validation_details": {"legitimacy": 0.9, "accuracy": 0.8},
   "rejection_reasons": null
 }"""
+BATCH_RESPONSE_SCHEMA = batch_response_schema(ValidationResult, "company")
 
 
-def validate_company(company: CompanyData) -> ValidationResult:
-    client = genai.Client()
+def validate_company(company: CompanyData, client: Optional[genai.Client] = None) -> ValidationResult:
+    client = client or get_client()
     
     prompt = f"""{VALIDATOR_PROMPT}
 
@@ -53,3 +59,64 @@ Provide validation assessment as JSON:"""
     data = json.loads(response.text)
     result = ValidationResult(company=company, **data)
     return result
+
+
+def validate_company_batch(
+    companies: List[CompanyData], client: Optional[genai.Client] = None
+) -> List[Optional[ValidationResult]]:
+    """Validate several companies in one request, sharing the prompt preamble.
+
+    Returns one result per company, in order, with None for companies missing or
+    malformed in the response.
+    """
+    client = client or get_client()
+    
+    company_list = "\n\n".join(
+        f"""Company {index}:
+Name: {company.name}
+Industry: {company.industry}
+Country: {company.country}
+Description: {company.description}
+Website: {company.website}"""
+        for index, company in enumerate(companies, 1)
+    )
+    prompt = f"""{VALIDATOR_PROMPT}
+
+{BATCH_INSTRUCTIONS.format(count=len(companies))}
+
+Companies to validate:
+{company_list}
+
+Provide validation assessments as a JSON array:"""
+    
+    response = client.models.generate_content(
+        model=GEN_FAST_MODEL,
+        contents=prompt,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_json_schema=BATCH_RESPONSE_SCHEMA
+        )
+    )
+    
+    entries = parse_batch_response(response.text, [company.name for company in companies])
+    results = []
+    for company, data in zip(companies, entries):
+        try:
+            results.append(ValidationResult(company=company, **data) if data else None)
+        except (TypeError, ValueError):
+            results.append(None)
+    return results
+
+
+async def validate_companies(
+    companies: List[CompanyData], executor: LLMCallExecutor, batch_size: int = LLM_BATCH_SIZE
+) -> List[Optional[ValidationResult]]:
+    """Validate companies concurrently, batch_size per request, with None for failed validations."""
+    if batch_size > 1:
+        return await run_in_batches(executor, validate_company_batch, companies, batch_size)
+    
+    results = await asyncio.gather(
+        *[executor.run(validate_company, company, name=f"validate_company({company.name})") for company in companies],
+        return_exceptions=True
+    )
+    return [result if isinstance(result, ValidationResult) else None for result in results]
@@ -4,11 +4,20 @@ Code Review Assistant - An intelligent code grading system using ADK.
 
 This package provides a multi-agent system for reviewing Python code,
 checking style compliance, running tests, and providing personalized feedback.
+
+`root_agent` is resolved lazily, so importing the package does not build the
+agent tree or import the ADK runtime.
 """
 
-try:
-    from .agent import root_agent
-    __all__ = ["root_agent"]
-except (ImportError, AttributeError):
-    # Module 5 not completed yet
-    __all__ = []
\ No newline at end of file
+__all__ = ["root_agent"]
+
+
+def __getattr__(name):
+    if name == "root_agent":
+        try:
+            from .agent import root_agent
+        except ImportError as e:
+            # Module 5 not completed yet
+            raise AttributeError(f"root_agent is unavailable: {e}") from e
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,45 @@
+"""
+Agent callbacks for the Code Review Assistant.
+"""
+
+import logging
+from typing import Callable, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+
+from .models import TestResults
+
+logger = logging.getLogger(__name__)
+
+
+def cache_test_results(summary_key: str,
+                       results_key: str) -> Callable[[CallbackContext], Optional[types.Content]]:
+    """
+    Build an after_agent_callback that parses a test runner's output once.
+
+    The raw JSON written to summary_key (the agent's output_key) is validated
+    into TestResults and cached in state under results_key, so downstream
+    tools read a structured object instead of re-parsing the LLM text.
+
+    Args:
+        summary_key: State key the agent writes its raw JSON output to
+        results_key: State key to cache the normalized results under
+
+    Returns:
+        Callback suitable for Agent(after_agent_callback=...)
+    """
+    def _callback(callback_context: CallbackContext) -> Optional[types.Content]:
+        raw = callback_context.state.get(summary_key)
+        results = TestResults.parse(raw)
+
+        if results.is_valid:
+            logger.info(f"Callback: Cached {results_key} - {results.passed}/{results.total} "
+                        f"passed ({results.pass_rate:.1f}%)")
+        else:
+            logger.error(f"Callback: Malformed {summary_key}: {results.parse_error}")
+
+        callback_context.state[results_key] = results.model_dump()
+        return None
+
+    return _callback
@@ -2,16 +2,16 @@
 Configuration management for the Code Review Assistant.
 
 This module loads all configuration from environment variables and a .env file,
-using Pydantic for validation.
+using Pydantic for validation. Anything that needs the network, such as
+resolving default Google credentials, is deferred until first use so that
+importing this module stays cheap on cold starts.
 """
 
 import os
 import logging
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field, field_validator, model_validator
-import google.auth
-from google.auth.exceptions import DefaultCredentialsError
+from pydantic import Field, PrivateAttr, field_validator, model_validator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,7 +31,8 @@ class AgentConfig(BaseSettings):
 
     # --- Google Cloud Configuration ---
     google_cloud_project: Optional[str] = Field(
-        default=None, description="GCP project ID, auto-detected if not set."
+        default=None,
+        description="GCP project ID, auto-detected on first use via get_google_cloud_project()."
     )
     google_cloud_location: str = Field(
         default="us-central1", description="GCP region for deployments."
@@ -88,6 +89,23 @@ class AgentConfig(BaseSettings):
     # --- Application Limits ---
     max_grading_attempts: int = Field(default=3, gt=0)
 
+    # --- Multi-tenant Scheduling (main.py) ---
+    max_concurrent_runs: int = Field(
+        default=16, gt=0, description="Maximum agent runs in flight across all users."
+    )
+    max_concurrent_runs_per_user: int = Field(
+        default=2, gt=0, description="Maximum agent runs in flight for a single user."
+    )
+    user_rate_limit_per_minute: float = Field(
+        default=6.0, gt=0, description="Runs each user may start per minute."
+    )
+    user_rate_limit_burst: int = Field(
+        default=5, gt=0, description="Runs a user may start back to back before throttling."
+    )
+    max_queue_wait_seconds: float = Field(
+        default=120.0, gt=0, description="Seconds a run may wait for a slot before a 503."
+    )
+
     # --- Logging & Debugging ---
     log_level: str = Field(default="INFO")
     debug_mode: bool = Field(default=False)
@@ -109,21 +127,34 @@ class AgentConfig(BaseSettings):
             raise ValueError(f"Invalid log_level: {v}. Must be one of {valid_levels}")
         return v.upper()
 
-    @field_validator('google_cloud_project', mode='before')
-    @classmethod
-    def set_google_cloud_project(cls, v: Optional[str]) -> Optional[str]:
-        """Try to auto-detect GCP project if not explicitly set."""
-        if v:
-            return v
+    _project_resolved: bool = PrivateAttr(default=False)
+
+    def get_google_cloud_project(self) -> Optional[str]:
+        """
+        Return the GCP project, auto-detecting it from default credentials on first call.
+
+        google.auth.default() can probe the metadata server, so it is only
+        called when a project is actually needed, and the result is cached.
+        Exports an auto-detected project as GOOGLE_CLOUD_PROJECT unless already set.
+        """
+        if self.google_cloud_project or self._project_resolved:
+            return self.google_cloud_project
+
+        # Deferred import: google.auth is only needed for auto-detection
+        import google.auth
+        from google.auth.exceptions import DefaultCredentialsError
+
+        self._project_resolved = True
         try:
             _, project_id = google.auth.default()
             if project_id:
                 logger.info(f"Auto-detected GCP project: {project_id}")
-                return project_id
+                self.google_cloud_project = project_id
+                os.environ.setdefault("GOOGLE_CLOUD_PROJECT", project_id)
         except (DefaultCredentialsError, FileNotFoundError):
             if os.getenv('K_SERVICE'): # Check if running in Cloud Run
                 logger.warning("Running in a cloud environment but GOOGLE_CLOUD_PROJECT is not set.")
-        return None
+        return self.google_cloud_project
 
 # --- Global Configuration Instance ---
 # This single instance is imported and used throughout the application.
@@ -144,6 +175,6 @@ if config.google_api_key:
 
 # Log a summary of the most important configuration values on startup.
 logger.info("Code Review Assistant Configuration Loaded:")
-logger.info(f"  - GCP Project: {config.google_cloud_project or 'Not set'}")
+logger.info(f"  - GCP Project: {config.google_cloud_project or 'Auto-detect on first use'}")
 logger.info(f"  - Artifact Bucket: {config.artifact_bucket or 'In-memory (local only)'}")
 logger.info(f"  - Models: worker={config.worker_model}, critic={config.critic_model}")
\ No newline at end of file
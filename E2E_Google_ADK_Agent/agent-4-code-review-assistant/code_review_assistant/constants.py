@@ -17,6 +17,7 @@ class StateKeys:
 
     # === Test-related keys ===
     TEST_EXECUTION_SUMMARY = "test_execution_summary"  # From test_runner_agent output_key
+    TEST_RESULTS = "test_results"  # Parsed TestResults, cached after test_runner_agent
 
     # === Review pipeline state ===
     FINAL_GRADE = "final_grade"
@@ -30,6 +31,7 @@ class StateKeys:
     # === Fix pipeline keys ===
     CODE_FIXES = "code_fixes"  # From code_fixer_agent output_key
     FIX_TEST_EXECUTION_SUMMARY = "fix_test_execution_summary"  # From fix_test_runner_agent output_key
+    FIX_TEST_RESULTS = "fix_test_results"  # Parsed TestResults, cached after fix_test_runner_agent
     FIXED_STYLE_SCORE = "fixed_style_score"
     FIXED_STYLE_ISSUES = "fixed_style_issues"
     FIX_REPORT = "fix_report"
@@ -0,0 +1,179 @@
+"""
+Typed state models for the Code Review Assistant.
+
+The TestRunner and FixTestRunner agents write free-form LLM JSON into state
+through their output_key. These models parse and validate that JSON once,
+normalize the two output schemas into a single shape, and are cached in state
+so tools never have to re-parse the raw text.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class TestSummary(BaseModel):
+    """The "test_summary" object emitted by the TestRunner agent."""
+    model_config = ConfigDict(extra='allow')
+
+    total_tests_run: int = Field(default=0, ge=0)
+    tests_passed: int = Field(default=0, ge=0)
+    tests_failed: int = Field(default=0, ge=0)
+    tests_with_errors: int = Field(default=0, ge=0)
+    critical_issues_found: int = Field(default=0, ge=0)
+
+
+class TestRunnerOutput(BaseModel):
+    """Schema of the TestRunner agent's JSON analysis."""
+    model_config = ConfigDict(extra='allow')
+
+    test_summary: TestSummary
+    critical_issues: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class FixTestRunnerOutput(BaseModel):
+    """Schema of the FixTestRunner agent's JSON analysis."""
+    model_config = ConfigDict(extra='allow')
+
+    passed: int = Field(default=0, ge=0)
+    failed: int = Field(default=0, ge=0)
+    total: int = Field(default=0, ge=0)
+    pass_rate: Optional[float] = None
+
+
+class TestResults(BaseModel):
+    """
+    Normalized test results, independent of which agent produced them.
+
+    Stored in state as a plain dict (via model_dump) so that it survives
+    persistent session services, and rehydrated with model_validate.
+    """
+    total: int = 0
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    pass_rate: float = 0.0
+    critical_issues: List[Dict[str, Any]] = Field(default_factory=list)
+    raw: Dict[str, Any] = Field(default_factory=dict)
+    parse_error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        """True if the agent output was parsed and validated successfully."""
+        return self.parse_error is None
+
+    @property
+    def has_results(self) -> bool:
+        """True if at least one test was executed."""
+        return self.is_valid and self.total > 0
+
+    @property
+    def all_tests_pass(self) -> bool:
+        """True if tests were executed and none failed or errored."""
+        return self.has_results and self.failed == 0 and self.errors == 0
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "TestResults":
+        """Validate a decoded JSON payload in either agent's schema."""
+        if 'test_summary' in payload:
+            output = TestRunnerOutput.model_validate(payload)
+            summary = output.test_summary
+            return cls(
+                total=summary.total_tests_run,
+                passed=summary.tests_passed,
+                failed=summary.tests_failed,
+                errors=summary.tests_with_errors,
+                pass_rate=_pass_rate(summary.tests_passed, summary.total_tests_run),
+                critical_issues=output.critical_issues,
+                raw=payload,
+            )
+
+        if 'total' in payload or 'pass_rate' in payload:
+            output = FixTestRunnerOutput.model_validate(payload)
+            pass_rate = output.pass_rate
+            if pass_rate is None:
+                pass_rate = _pass_rate(output.passed, output.total)
+            return cls(
+                total=output.total,
+                passed=output.passed,
+                failed=output.failed,
+                pass_rate=pass_rate,
+                raw=payload,
+            )
+
+        raise ValueError(
+            "Unrecognized test summary schema: expected 'test_summary' or "
+            f"'passed'/'failed'/'total' keys, got {sorted(payload)}"
+        )
+
+    @classmethod
+    def parse(cls, value: Any) -> "TestResults":
+        """
+        Parse raw agent output (JSON text, optionally fenced in markdown, or a dict).
+
+        Never raises: malformed output is returned as an instance with
+        parse_error set, so callers can surface the problem explicitly.
+        """
+        if isinstance(value, Mapping):
+            payload = dict(value)
+        else:
+            text = _strip_code_fence(str(value or ''))
+            if not text:
+                return cls(parse_error="Test summary is empty")
+            try:
+                payload = json.loads(text)
+            except json.JSONDecodeError as e:
+                return cls(parse_error=f"Test summary is not valid JSON: {e}")
+            if not isinstance(payload, dict):
+                return cls(parse_error="Test summary JSON is not an object")
+
+        try:
+            return cls.from_payload(payload)
+        except (ValidationError, ValueError) as e:
+            return cls(raw=payload, parse_error=f"Test summary failed validation: {e}")
+
+
+def _pass_rate(passed: int, total: int) -> float:
+    """Percentage of passing tests, 0.0 if nothing ran."""
+    return (passed / total) * 100 if total > 0 else 0.0
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a surrounding ```json ... ``` fence from LLM output."""
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        if text.rstrip().endswith('```'):
+            text = text.rstrip()[:-3]
+    return text.strip()
+
+
+def load_test_results(state: Mapping[str, Any], results_key: str,
+                      summary_key: str) -> Optional[TestResults]:
+    """
+    Return cached TestResults from state, or None if the agent has not run.
+
+    Falls back to parsing the raw output_key value for sessions created before
+    the results were cached.
+    """
+    cached = state.get(results_key)
+    if cached:
+        return TestResults.model_validate(cached)
+
+    raw = state.get(summary_key)
+    if not raw:
+        return None
+    return TestResults.parse(raw)
+
+
+__all__ = [
+    'TestSummary',
+    'TestRunnerOutput',
+    'FixTestRunnerOutput',
+    'TestResults',
+    'load_test_results',
+]
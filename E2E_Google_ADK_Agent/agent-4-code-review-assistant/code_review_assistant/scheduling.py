@@ -0,0 +1,398 @@
+"""
+Multi-tenant rate limiting and fair scheduling for agent runs.
+
+A per-user token bucket caps how often each user may start a review, and a
+fair-queuing scheduler bounds concurrent runs per user and globally. Waiting
+runs are dispatched round-robin across users, so one user submitting dozens of
+reviews cannot starve everyone else of the shared Gemini quota.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a user has exhausted their token bucket."""
+
+    def __init__(self, user_id: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for user {user_id}, retry in {retry_after:.1f}s")
+        self.user_id = user_id
+        self.retry_after = retry_after
+
+
+class QueueTimeout(Exception):
+    """Raised when a queued run waits longer than the configured maximum."""
+
+    def __init__(self, user_id: str, waited: float):
+        super().__init__(f"Run for user {user_id} timed out after {waited:.1f}s in queue")
+        self.user_id = user_id
+        self.waited = waited
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> Tuple[bool, float]:
+        """
+        Take one token if available.
+
+        Returns:
+            (acquired, seconds until a token becomes available)
+        """
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+    @property
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+@dataclass(eq=False)
+class _Ticket:
+    """A run waiting for a slot."""
+    user_id: str
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class FairScheduler:
+    """
+    Bounded concurrency with least-recently-served fairness across users.
+
+    Whenever a slot frees up, it goes to the waiting user who was served
+    longest ago, so a user with one pending review is never stuck behind
+    another user's backlog.
+
+    Args:
+        max_concurrent: Maximum runs in flight across all users
+        max_concurrent_per_user: Maximum runs in flight for a single user
+        rate_per_minute: Runs each user may start per minute (token refill rate)
+        burst: Token bucket capacity, i.e. runs a user may start back to back
+        max_queue_wait: Seconds a run may wait for a slot before QueueTimeout
+        max_tracked_users: Idle token buckets are pruned beyond this many users
+    """
+
+    def __init__(self, max_concurrent: int, max_concurrent_per_user: int,
+                 rate_per_minute: float, burst: int, max_queue_wait: float,
+                 max_tracked_users: int = 10_000):
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_user = max_concurrent_per_user
+        self.rate_per_second = rate_per_minute / 60
+        self.burst = burst
+        self.max_queue_wait = max_queue_wait
+        self.max_tracked_users = max_tracked_users
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._waiting: Dict[str, Deque[_Ticket]] = {}
+        self._active: Dict[str, int] = {}
+        # Users ordered from least to most recently served
+        self._served: "OrderedDict[str, None]" = OrderedDict()
+        self._total_active = 0
+
+        self._admitted = 0
+        self._rate_limited = 0
+        self._timed_out = 0
+        self._waits: Deque[float] = deque(maxlen=1000)
+
+    # --- Rate limiting ---
+
+    def _check_rate_limit(self, user_id: str) -> None:
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= self.max_tracked_users:
+                self._prune_buckets()
+            bucket = self._buckets[user_id] = TokenBucket(self.rate_per_second, self.burst)
+
+        acquired, retry_after = bucket.try_acquire()
+        if not acquired:
+            self._rate_limited += 1
+            raise RateLimitExceeded(user_id, retry_after)
+
+    def _prune_buckets(self) -> None:
+        """Drop buckets that have fully refilled; they carry no state."""
+        for user_id in [u for u, b in self._buckets.items() if b.is_full]:
+            del self._buckets[user_id]
+
+    # --- Fair queuing ---
+
+    def _can_start(self, user_id: str) -> bool:
+        return (self._total_active < self.max_concurrent
+                and self._active.get(user_id, 0) < self.max_concurrent_per_user)
+
+    def _start(self, user_id: str, waited: float) -> None:
+        self._served[user_id] = None
+        self._served.move_to_end(user_id)
+        if len(self._served) > self.max_tracked_users:
+            self._served.popitem(last=False)
+        self._active[user_id] = self._active.get(user_id, 0) + 1
+        self._total_active += 1
+        self._admitted += 1
+        self._waits.append(waited)
+
+    def _release(self, user_id: str) -> None:
+        self._active[user_id] -= 1
+        if not self._active[user_id]:
+            del self._active[user_id]
+        self._total_active -= 1
+        self._dispatch()
+
+    def _rotation(self) -> List[str]:
+        """Waiting users in dispatch order: never served first, then least recently served."""
+        rank = {user_id: i for i, user_id in enumerate(self._served)}
+        return sorted(self._waiting, key=lambda user_id: rank.get(user_id, -1))
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting users, least recently served first."""
+        while self._waiting and self._total_active < self.max_concurrent:
+            user_id = next((u for u in self._rotation() if self._can_start(u)), None)
+            if user_id is None:
+                return
+            queue = self._waiting[user_id]
+            ticket = queue.popleft()
+            if not queue:
+                del self._waiting[user_id]
+            if ticket.future.done():
+                continue
+            self._start(user_id, time.monotonic() - ticket.enqueued)
+            ticket.future.set_result(None)
+
+    def _remove(self, ticket: _Ticket) -> None:
+        queue = self._waiting.get(ticket.user_id)
+        if queue and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._waiting[ticket.user_id]
+
+    def _ticket_position(self, ticket: _Ticket) -> int:
+        """
+        1-based dispatch position of a waiting ticket.
+
+        Users take turns, so the n-th run in a user's queue is preceded by up
+        to n runs from every other waiting user (n + 1 from users ahead of it
+        in the rotation) plus its own earlier runs.
+        """
+        index = self._waiting[ticket.user_id].index(ticket)
+        position = index + 1
+        ahead = True
+        for user_id in self._rotation():
+            queue = self._waiting[user_id]
+            if user_id == ticket.user_id:
+                ahead = False
+                continue
+            position += min(len(queue), index + 1 if ahead else index)
+        return position
+
+    def queue_position(self, user_id: str) -> Optional[int]:
+        """Position of the user's next waiting run, or None if nothing is queued."""
+        queue = self._waiting.get(user_id)
+        if not queue:
+            return None
+        return self._ticket_position(queue[0])
+
+    @asynccontextmanager
+    async def slot(self, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Acquire a run slot for `user_id`, waiting fairly if none is free.
+
+        Yields:
+            Admission info: initial queue position and seconds waited
+
+        Raises:
+            RateLimitExceeded: The user's token bucket is empty
+            QueueTimeout: No slot became free within max_queue_wait
+        """
+        self._check_rate_limit(user_id)
+
+        admission = {"queue_position": 0, "waited": 0.0}
+        if not self._waiting and self._can_start(user_id):
+            self._start(user_id, 0.0)
+        else:
+            ticket = _Ticket(user_id, asyncio.get_running_loop().create_future())
+            self._waiting.setdefault(user_id, deque()).append(ticket)
+            admission["queue_position"] = self._ticket_position(ticket)
+            self._dispatch()
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.future), self.max_queue_wait)
+            except asyncio.TimeoutError:
+                self._remove(ticket)
+                if not ticket.future.done():
+                    ticket.future.cancel()
+                    self._timed_out += 1
+                    raise QueueTimeout(user_id, time.monotonic() - ticket.enqueued)
+            except asyncio.CancelledError:
+                self._remove(ticket)
+                if ticket.future.done() and not ticket.future.cancelled():
+                    self._release(user_id)  # Slot was granted as we were cancelled
+                else:
+                    ticket.future.cancel()
+                raise
+            admission["waited"] = time.monotonic() - ticket.enqueued
+
+        try:
+            yield admission
+        finally:
+            self._release(user_id)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of scheduler counters and recent queue wait percentiles."""
+        waits = sorted(self._waits)
+
+        def percentile(pct: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(pct / 100 * len(waits)))], 3)
+
+        return {
+            "active_runs": self._total_active,
+            "queued_runs": sum(len(q) for q in self._waiting.values()),
+            "admitted_total": self._admitted,
+            "rate_limited_total": self._rate_limited,
+            "queue_timeouts_total": self._timed_out,
+            "queue_wait_seconds": {"p50": percentile(50), "p95": percentile(95),
+                                   "p99": percentile(99)},
+            "limits": {
+                "max_concurrent": self.max_concurrent,
+                "max_concurrent_per_user": self.max_concurrent_per_user,
+                "rate_per_minute": self.rate_per_second * 60,
+                "burst": self.burst,
+            },
+            "users": {
+                user_id: {"active": self._active.get(user_id, 0),
+                          "queued": len(self._waiting.get(user_id, ()))}
+                for user_id in set(self._active) | set(self._waiting)
+            },
+        }
+
+
+class FairSchedulingMiddleware:
+    """
+    ASGI middleware that gates ADK run endpoints through a FairScheduler.
+
+    Requests to `run_paths` are keyed by the user id in their JSON body (the
+    same id the tools read from state), sent as `user_id` or, by ADK's
+    camelCase request models and web UI, as `userId`. Rate-limited requests get a 429 and
+    queue timeouts a 503, both with Retry-After. Admitted responses carry
+    X-Queue-Position and X-Queue-Wait-Ms headers.
+    """
+
+    def __init__(self, app, scheduler: FairScheduler,
+                 run_paths: Tuple[str, ...] = ("/run", "/run_sse")):
+        self.app = app
+        self.scheduler = scheduler
+        self.run_paths = run_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.run_paths:
+            await self.app(scope, receive, send)
+            return
+
+        body, replay = await _buffer_body(receive)
+        user_id = _user_id_from_request(scope["path"], body)
+
+        try:
+            async with self.scheduler.slot(user_id) as admission:
+                headers = [
+                    (b"x-queue-position", str(admission["queue_position"]).encode()),
+                    (b"x-queue-wait-ms", str(int(admission["waited"] * 1000)).encode()),
+                ]
+
+                async def send_with_headers(message):
+                    if message["type"] == "http.response.start":
+                        message = dict(message, headers=list(message.get("headers", [])) + headers)
+                    await send(message)
+
+                await self.app(scope, replay, send_with_headers)
+        except RateLimitExceeded as e:
+            logger.warning(str(e))
+            await _send_error(send, 429, str(e), e.retry_after)
+        except QueueTimeout as e:
+            logger.warning(str(e))
+            await _send_error(send, 503, str(e), self.scheduler.max_queue_wait)
+
+
+async def _buffer_body(receive) -> Tuple[bytes, Any]:
+    """Read the full request body and return a receive callable that replays it."""
+    chunks: List[bytes] = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+USER_PATH_PATTERN = re.compile(r"/apps/[^/]+/users/([^/]+)")
+
+
+def _user_id_from_request(path: str, body: bytes) -> str:
+    """User id from the JSON body (user_id or userId), else from an /apps/{app}/users/{user_id} path."""
+    try:
+        payload = json.loads(body or b"{}")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        payload = None
+    user_id = None
+    if isinstance(payload, dict):
+        user_id = payload.get("user_id") or payload.get("userId")
+    if not user_id:
+        match = USER_PATH_PATTERN.search(path)
+        user_id = match.group(1) if match else None
+    return str(user_id or "default_user")
+
+
+async def _send_error(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+__all__ = [
+    'RateLimitExceeded',
+    'QueueTimeout',
+    'TokenBucket',
+    'FairScheduler',
+    'FairSchedulingMiddleware',
+]
@@ -27,7 +27,7 @@ def get_session_service():
             # Parse Agent Engine ID from URI
             agent_engine_id = session_uri.replace('vertexai://', '')
             return VertexAiSessionService(
-                project=config.google_cloud_project,
+                project=config.get_google_cloud_project(),
                 location=config.google_cloud_location,
                 agent_engine_id=agent_engine_id
             )
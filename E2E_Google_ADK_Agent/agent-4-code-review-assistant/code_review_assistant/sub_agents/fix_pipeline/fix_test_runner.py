@@ -10,6 +10,8 @@ from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.code_executors import BuiltInCodeExecutor
 from google.adk.utils import instructions_utils
 from code_review_assistant.config import config
+from code_review_assistant.callbacks import cache_test_results
+from code_review_assistant.constants import StateKeys
 
 
 async def fix_test_runner_instruction_provider(context: ReadonlyContext) -> str:
@@ -54,5 +56,8 @@ fix_test_runner_agent = Agent(
     description="Runs comprehensive tests on fixed code to verify all issues are resolved",
     instruction=fix_test_runner_instruction_provider,
     code_executor=BuiltInCodeExecutor(),
-    output_key="fix_test_execution_summary"
+    output_key="fix_test_execution_summary",
+    after_agent_callback=cache_test_results(
+        StateKeys.FIX_TEST_EXECUTION_SUMMARY, StateKeys.FIX_TEST_RESULTS
+    )
 )
\ No newline at end of file
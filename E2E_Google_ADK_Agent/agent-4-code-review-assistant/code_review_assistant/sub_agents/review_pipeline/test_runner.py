@@ -10,6 +10,8 @@ from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.code_executors import BuiltInCodeExecutor
 from google.adk.utils import instructions_utils
 from code_review_assistant.config import config
+from code_review_assistant.callbacks import cache_test_results
+from code_review_assistant.constants import StateKeys
 
 
 async def test_runner_instruction_provider(context: ReadonlyContext) -> str:
@@ -50,5 +52,8 @@ test_runner_agent = Agent(
     description="Generates and runs tests for Python code using safe code execution",
     instruction=test_runner_instruction_provider,
     code_executor=BuiltInCodeExecutor(),
-    output_key="test_execution_summary"
+    output_key="test_execution_summary",
+    after_agent_callback=cache_test_results(
+        StateKeys.TEST_EXECUTION_SUMMARY, StateKeys.TEST_RESULTS
+    )
 )
\ No newline at end of file
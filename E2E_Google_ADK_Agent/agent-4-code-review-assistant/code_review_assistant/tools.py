@@ -10,7 +10,6 @@ import asyncio
 import hashlib
 import json
 import os
-import pycodestyle
 import tempfile
 import logging
 from datetime import datetime
@@ -21,6 +20,7 @@ from google.genai import types
 from google.adk.tools import ToolContext
 
 from .constants import StateKeys
+from .models import load_test_results
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -247,6 +247,8 @@ def _perform_style_check(code: str) -> Dict[str, Any]:
     """Helper to perform style check in thread pool."""
     import io
     import sys
+    # Deferred import: pycodestyle is only needed once a style check runs
+    import pycodestyle
 
     with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as tmp:
         tmp.write(code)
@@ -505,22 +507,11 @@ async def update_grading_progress(tool_context: ToolContext) -> Dict[str, Any]:
         state_updates[StateKeys.SCORE_IMPROVEMENT] = score_improvement
 
         # Track test results if available
-        test_results = tool_context.state.get(StateKeys.TEST_EXECUTION_SUMMARY, {})
-
-        # Parse if it's a string
-        if isinstance(test_results, str):
-            try:
-                test_results = json.loads(test_results)
-            except:
-                test_results = {}
-
-        if test_results and test_results.get('test_summary', {}).get('total_tests_run', 0) > 0:
-            summary = test_results['test_summary']
-            total = summary.get('total_tests_run', 0)
-            passed = summary.get('tests_passed', 0)
-            if total > 0:
-                pass_rate = (passed / total) * 100
-                state_updates[StateKeys.USER_LAST_TEST_PASS_RATE] = pass_rate
+        test_results = load_test_results(
+            tool_context.state, StateKeys.TEST_RESULTS, StateKeys.TEST_EXECUTION_SUMMARY
+        )
+        if test_results and test_results.has_results:
+            state_updates[StateKeys.USER_LAST_TEST_PASS_RATE] = test_results.pass_rate
 
         # Apply all updates atomically
         for key, value in state_updates.items():
@@ -572,14 +563,9 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
         style_issues = tool_context.state.get(StateKeys.STYLE_ISSUES, [])
 
         # Get test results
-        test_results = tool_context.state.get(StateKeys.TEST_EXECUTION_SUMMARY, {})
-
-        # Parse if it's a string
-        if isinstance(test_results, str):
-            try:
-                test_results = json.loads(test_results)
-            except:
-                test_results = {}
+        test_results = load_test_results(
+            tool_context.state, StateKeys.TEST_RESULTS, StateKeys.TEST_EXECUTION_SUMMARY
+        )
 
         timestamp = datetime.now().isoformat()
 
@@ -597,7 +583,7 @@ async def save_grading_report(feedback_text: str, tool_context: ToolContext) ->
                 'score': style_score,
                 'issues': style_issues[:5]  # First 5 issues
             },
-            'tests': test_results,
+            'tests': test_results.model_dump() if test_results else {},
             'feedback': feedback_text,
             'improvements': {
                 'score_change': tool_context.state.get(StateKeys.SCORE_IMPROVEMENT, 0),
@@ -757,49 +743,24 @@ async def compile_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
         original_code = tool_context.state.get(StateKeys.CODE_TO_REVIEW, '')
         code_fixes = tool_context.state.get(StateKeys.CODE_FIXES, '')
 
-        # Test results
-        original_tests = tool_context.state.get(StateKeys.TEST_EXECUTION_SUMMARY, {})
-        fixed_tests = tool_context.state.get(StateKeys.FIX_TEST_EXECUTION_SUMMARY, {})
+        # Test results (parsed once by the test runner callbacks)
+        original_tests = load_test_results(
+            tool_context.state, StateKeys.TEST_RESULTS, StateKeys.TEST_EXECUTION_SUMMARY
+        )
+        fixed_tests = load_test_results(
+            tool_context.state, StateKeys.FIX_TEST_RESULTS, StateKeys.FIX_TEST_EXECUTION_SUMMARY
+        )
 
-        # Parse if strings
-        if isinstance(original_tests, str):
-            try:
-                original_tests = json.loads(original_tests)
-            except:
-                original_tests = {}
+        original_pass_rate = original_tests.pass_rate if original_tests else 0
+        fixed_pass_rate = fixed_tests.pass_rate if fixed_tests else 0
+        all_tests_pass = fixed_tests.all_tests_pass if fixed_tests else False
 
-        if isinstance(fixed_tests, str):
-            try:
-                fixed_tests = json.loads(fixed_tests)
-            except:
-                fixed_tests = {}
-
-        # Extract pass rates
-        original_pass_rate = 0
-        if original_tests:
-            if 'pass_rate' in original_tests:
-                original_pass_rate = original_tests['pass_rate']
-            elif 'test_summary' in original_tests:
-                # Handle test_runner_agent's JSON structure
-                summary = original_tests['test_summary']
-                total = summary.get('total_tests_run', 0)
-                passed = summary.get('tests_passed', 0)
-                if total > 0:
-                    original_pass_rate = (passed / total) * 100
-            elif 'passed' in original_tests and 'total' in original_tests:
-                if original_tests['total'] > 0:
-                    original_pass_rate = (original_tests['passed'] / original_tests['total']) * 100
-
-        fixed_pass_rate = 0
-        all_tests_pass = False
-        if fixed_tests:
-            if 'pass_rate' in fixed_tests:
-                fixed_pass_rate = fixed_tests['pass_rate']
-                all_tests_pass = fixed_tests.get('failed', 1) == 0
-            elif 'passed' in fixed_tests and 'total' in fixed_tests:
-                if fixed_tests['total'] > 0:
-                    fixed_pass_rate = (fixed_tests['passed'] / fixed_tests['total']) * 100
-                all_tests_pass = fixed_tests.get('failed', 0) == 0
+        parse_errors = [
+            results.parse_error for results in (original_tests, fixed_tests)
+            if results and not results.is_valid
+        ]
+        for parse_error in parse_errors:
+            logger.warning(f"Tool: {parse_error}")
 
         # Style scores
         original_style = tool_context.state.get(StateKeys.STYLE_SCORE, 0)
@@ -842,6 +803,7 @@ async def compile_fix_report(tool_context: ToolContext) -> Dict[str, Any]:
                 'tests': test_improvement,
                 'style': style_improvement
             },
+            'test_parse_errors': parse_errors,
             'summary': f"{status_emoji} Fix Status: {fix_status}\n"
                       f"Tests: {original_pass_rate:.1f}% → {fixed_pass_rate:.1f}%\n"
                       f"Style: {original_style}/100 → {fixed_style}/100"
@@ -0,0 +1,3 @@
+"""
+Offline load-testing tools for the Code Review Assistant.
+"""
@@ -0,0 +1,241 @@
+"""
+Concurrency load-test harness for the Code Review Assistant FastAPI app.
+
+Builds the same ADK FastAPI app that main.py serves, swaps Gemini for the
+StubLlm, and drives complete review + fix runs through the real HTTP routes,
+session service, artifact service and tools at a configurable concurrency.
+
+Usage:
+    python -m loadtest.harness --reviews 200 --concurrency 20
+    python -m loadtest.harness --session-service-uri sqlite:///./loadtest.db
+    python -m loadtest.harness --url https://my-service.run.app --reviews 20
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import statistics
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+APP_NAME = "code_review_assistant"
+AGENTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadTestResult:
+    """Aggregated measurements from a load-test run."""
+    reviews: int
+    concurrency: int
+    wall_time: float
+    latencies: List[float] = field(default_factory=list)
+    loop_lags: List[float] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    memory_per_session: Optional[float] = None
+    peak_memory: Optional[int] = None
+
+    def percentile(self, values: List[float], pct: float) -> float:
+        """Nearest-rank percentile, 0.0 for an empty sample."""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Report as a JSON-serializable dictionary."""
+        ok = len(self.latencies)
+        return {
+            "reviews": self.reviews,
+            "concurrency": self.concurrency,
+            "succeeded": ok,
+            "failed": len(self.errors),
+            "wall_time_s": round(self.wall_time, 3),
+            "throughput_rps": round(ok / self.wall_time, 2) if self.wall_time else 0.0,
+            "latency_ms": {
+                "p50": round(self.percentile(self.latencies, 50) * 1000, 1),
+                "p95": round(self.percentile(self.latencies, 95) * 1000, 1),
+                "p99": round(self.percentile(self.latencies, 99) * 1000, 1),
+                "mean": round(statistics.fmean(self.latencies) * 1000, 1) if ok else 0.0,
+            },
+            "event_loop_lag_ms": {
+                "p50": round(self.percentile(self.loop_lags, 50) * 1000, 2),
+                "p99": round(self.percentile(self.loop_lags, 99) * 1000, 2),
+                "max": round(max(self.loop_lags, default=0.0) * 1000, 2),
+            },
+            "memory": {
+                "per_session_kb": (round(self.memory_per_session / 1024, 1)
+                                   if self.memory_per_session is not None else None),
+                "peak_mb": (round(self.peak_memory / (1024 * 1024), 1)
+                            if self.peak_memory is not None else None),
+            },
+            "sample_errors": self.errors[:5],
+        }
+
+
+def build_app(session_service_uri: str = "", artifact_service_uri: str = "",
+              llm_latency: float = 0.0):
+    """Build the ADK FastAPI app with every agent backed by the StubLlm."""
+    from google.adk.cli.fast_api import get_fast_api_app
+    from code_review_assistant.agent import root_agent
+    from .stub_llm import install_stub_llm
+
+    patched = install_stub_llm(root_agent, latency=llm_latency)
+    logger.info(f"Load test: stubbed {patched} LLM agents")
+
+    return get_fast_api_app(
+        agents_dir=AGENTS_DIR,
+        session_service_uri=session_service_uri or None,
+        artifact_service_uri=artifact_service_uri or None,
+        web=False,
+        trace_to_cloud=False,
+    )
+
+
+async def _run_review(client: httpx.AsyncClient, code: str) -> None:
+    """Create a session and run one full review through the /run route."""
+    user_id = f"load_user_{uuid.uuid4().hex[:8]}"
+
+    response = await client.post(f"/apps/{APP_NAME}/users/{user_id}/sessions", json={})
+    response.raise_for_status()
+    session_id = response.json()["id"]
+
+    response = await client.post("/run", json={
+        "app_name": APP_NAME,
+        "user_id": user_id,
+        "session_id": session_id,
+        "new_message": {
+            "role": "user",
+            "parts": [{"text": f"Please analyze ```python\n{code}```"}]
+        },
+        "streaming": False,
+    })
+    response.raise_for_status()
+    events = response.json()
+    if not events:
+        raise RuntimeError("Run returned no events")
+
+
+async def _sample_loop_lag(lags: List[float], stop: asyncio.Event,
+                           interval: float = 0.01) -> None:
+    """Record how late the event loop wakes a sleeping task."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def run_load_test(reviews: int, concurrency: int, url: Optional[str] = None,
+                        session_service_uri: str = "", artifact_service_uri: str = "",
+                        llm_latency: float = 0.0, track_memory: bool = True,
+                        timeout: float = 300.0) -> LoadTestResult:
+    """
+    Run `reviews` complete reviews with at most `concurrency` in flight.
+
+    Args:
+        reviews: Total number of review runs
+        concurrency: Maximum concurrent runs
+        url: Target a deployed server instead of the in-process stubbed app
+        session_service_uri: Session backend for the in-process app
+        artifact_service_uri: Artifact backend for the in-process app
+        llm_latency: Simulated StubLlm latency per call, in seconds
+        track_memory: Measure Python heap growth per session with tracemalloc
+        timeout: Per-request timeout in seconds
+
+    Returns:
+        LoadTestResult with latency, loop-lag and memory measurements
+    """
+    from .stub_llm import SAMPLE_CODE
+
+    if url:
+        transport = None
+        base_url = url.rstrip("/")
+        track_memory = False  # Remote memory is not observable from here
+    else:
+        app = build_app(session_service_uri, artifact_service_uri, llm_latency)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    result = LoadTestResult(reviews=reviews, concurrency=concurrency, wall_time=0.0)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url,
+                                 timeout=timeout) as client:
+        # Warm up lazy imports and model registries outside the measurement
+        if not url:
+            await _run_review(client, SAMPLE_CODE)
+
+        async def one_review() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await _run_review(client, SAMPLE_CODE)
+                    result.latencies.append(time.perf_counter() - start)
+                except Exception as e:
+                    result.errors.append(f"{type(e).__name__}: {e}")
+
+        if track_memory:
+            gc.collect()
+            tracemalloc.start()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(_sample_loop_lag(result.loop_lags, stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(one_review() for _ in range(reviews)))
+        result.wall_time = time.perf_counter() - start
+        stop.set()
+        await lag_task
+
+        if track_memory:
+            gc.collect()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result.memory_per_session = (current - baseline) / max(1, len(result.latencies))
+            result.peak_memory = peak
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the Code Review Assistant.")
+    parser.add_argument("--reviews", type=int, default=50, help="Total review runs")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent runs")
+    parser.add_argument("--url", default=None,
+                        help="Target a running server instead of the stubbed in-process app")
+    parser.add_argument("--session-service-uri", default="",
+                        help="Session backend, e.g. sqlite:///./loadtest.db (default in-memory)")
+    parser.add_argument("--artifact-service-uri", default="",
+                        help="Artifact backend, e.g. gs://bucket (default in-memory)")
+    parser.add_argument("--llm-latency", type=float, default=0.0,
+                        help="Simulated latency per stub LLM call, in seconds")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip tracemalloc memory tracking (lower overhead)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = asyncio.run(run_load_test(
+        reviews=args.reviews,
+        concurrency=args.concurrency,
+        url=args.url,
+        session_service_uri=args.session_service_uri,
+        artifact_service_uri=args.artifact_service_uri,
+        llm_latency=args.llm_latency,
+        track_memory=not args.no_memory,
+    ))
+    print(json.dumps(result.summary(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
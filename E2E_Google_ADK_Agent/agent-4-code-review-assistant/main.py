@@ -2,6 +2,8 @@
 import os
 import uvicorn
 from google.adk.cli.fast_api import get_fast_api_app
+from code_review_assistant.config import config
+from code_review_assistant.scheduling import FairScheduler, FairSchedulingMiddleware
 
 # Get credentials from environment variables
 DB_USER = os.environ.get("DB_USER")
@@ -18,6 +20,10 @@ else:
     SESSION_SERVICE_URI = ""  # Falls back to in-memory
     print("Using in-memory session service (no database credentials provided)")
 
+# Auto-detect the GCP project now, so GOOGLE_CLOUD_PROJECT is set for Cloud Trace
+# and the other Google clients created by the ADK app
+config.get_google_cloud_project()
+
 # Create the FastAPI app with ADK
 app = get_fast_api_app(
     agents_dir=os.path.dirname(os.path.abspath(__file__)),
@@ -28,6 +34,29 @@ app = get_fast_api_app(
     trace_to_cloud=True
 )
 
+# Per-user rate limiting and fair queuing in front of the runner, so one user
+# cannot starve everyone else of the shared Gemini quota.
+scheduler = FairScheduler(
+    max_concurrent=config.max_concurrent_runs,
+    max_concurrent_per_user=config.max_concurrent_runs_per_user,
+    rate_per_minute=config.user_rate_limit_per_minute,
+    burst=config.user_rate_limit_burst,
+    max_queue_wait=config.max_queue_wait_seconds,
+)
+app.add_middleware(FairSchedulingMiddleware, scheduler=scheduler)
+
+
+@app.get("/scheduler/metrics")
+async def scheduler_metrics():
+    """Scheduler counters, per-user load and queue wait percentiles."""
+    return scheduler.metrics()
+
+
+@app.get("/scheduler/queue/{user_id}")
+async def scheduler_queue_position(user_id: str):
+    """Dispatch position of the user's next queued run (null if none queued)."""
+    return {"user_id": user_id, "queue_position": scheduler.queue_position(user_id)}
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,69 @@
+"""
+Cold-start guard: importing the package must stay cheap.
+
+Runs `python -X importtime` in a fresh interpreter and checks that importing
+code_review_assistant neither pulls in the heavy runtime dependencies (which
+are deferred until the agent tree is first built) nor exceeds the time budget.
+Override the budget with IMPORT_TIME_BUDGET_MS on slow CI machines.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+PROJECT_ROOT = Path(__file__).parent.parent
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1000"))
+
+# Modules that must only be imported once the agent tree is built or a tool runs
+DEFERRED_MODULES = [
+    "google.auth",
+    "google.adk.agents",
+    "google.adk.code_executors",
+    "pycodestyle",
+    "code_review_assistant.sub_agents.review_pipeline.test_runner",
+    "code_review_assistant.tools",
+]
+
+
+def _profile_import(statement: str) -> Dict[str, Tuple[int, int]]:
+    """Return (cumulative microseconds, nesting depth) per imported module."""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT))
+    env.pop("GOOGLE_CLOUD_PROJECT", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+    timings = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split(":", 1)[1].split("|")
+        if cumulative.strip().isdigit():
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            timings[name.strip()] = (int(cumulative.strip()), depth)
+    return timings
+
+
+def test_package_import_defers_heavy_dependencies():
+    timings = _profile_import("import code_review_assistant, code_review_assistant.config")
+
+    imported = [module for module in DEFERRED_MODULES if module in timings]
+    assert not imported, f"Imported eagerly at package import: {imported}"
+
+
+def test_package_import_within_budget():
+    timings = _profile_import("import code_review_assistant, code_review_assistant.config")
+
+    # Top-level entries include everything they transitively imported first
+    elapsed_ms = sum(
+        micros for name, (micros, depth) in timings.items()
+        if depth == 0 and name.startswith("code_review_assistant")
+    ) / 1000
+
+    assert elapsed_ms < IMPORT_TIME_BUDGET_MS, (
+        f"Importing code_review_assistant took {elapsed_ms:.0f}ms "
+        f"(budget {IMPORT_TIME_BUDGET_MS:.0f}ms)"
+    )
@@ -0,0 +1,89 @@
+"""
+Unit tests for the typed test-result state models.
+"""
+
+import json
+
+from code_review_assistant import models
+from code_review_assistant.constants import StateKeys
+
+
+TEST_RUNNER_OUTPUT = {
+    "test_summary": {
+        "total_tests_run": 20,
+        "tests_passed": 15,
+        "tests_failed": 4,
+        "tests_with_errors": 1,
+        "critical_issues_found": 1
+    },
+    "critical_issues": [{"type": "bug", "description": "stack is not a list"}],
+    "verdict": {"status": "BUGGY", "confidence": "high", "recommendation": "fix"}
+}
+
+FIX_TEST_RUNNER_OUTPUT = {"passed": 20, "failed": 0, "total": 20, "pass_rate": 100}
+
+
+def test_parses_test_runner_schema():
+    results = models.TestResults.parse(json.dumps(TEST_RUNNER_OUTPUT))
+
+    assert results.is_valid
+    assert (results.total, results.passed, results.failed, results.errors) == (20, 15, 4, 1)
+    assert results.pass_rate == 75.0
+    assert len(results.critical_issues) == 1
+    assert results.raw["verdict"]["status"] == "BUGGY"
+    assert not results.all_tests_pass
+
+
+def test_parses_fix_test_runner_schema():
+    results = models.TestResults.parse(FIX_TEST_RUNNER_OUTPUT)
+
+    assert results.is_valid
+    assert results.pass_rate == 100
+    assert results.all_tests_pass
+
+
+def test_derives_pass_rate_when_missing():
+    results = models.TestResults.parse({"passed": 3, "failed": 1, "total": 4})
+
+    assert results.pass_rate == 75.0
+
+
+def test_strips_markdown_fence():
+    text = "```json\n" + json.dumps(FIX_TEST_RUNNER_OUTPUT) + "\n```"
+
+    assert models.TestResults.parse(text).all_tests_pass
+
+
+def test_malformed_json_is_reported():
+    results = models.TestResults.parse('{"test_summary": ')
+
+    assert not results.is_valid
+    assert "not valid JSON" in results.parse_error
+    assert not results.has_results
+
+
+def test_invalid_schema_is_reported():
+    results = models.TestResults.parse({"test_summary": {"total_tests_run": "many"}})
+
+    assert not results.is_valid
+    assert "failed validation" in results.parse_error
+
+
+def test_load_prefers_cached_results():
+    cached = models.TestResults.parse(FIX_TEST_RUNNER_OUTPUT).model_dump()
+    state = {
+        StateKeys.FIX_TEST_RESULTS: cached,
+        StateKeys.FIX_TEST_EXECUTION_SUMMARY: "not json",
+    }
+
+    results = models.load_test_results(
+        state, StateKeys.FIX_TEST_RESULTS, StateKeys.FIX_TEST_EXECUTION_SUMMARY
+    )
+
+    assert results.is_valid and results.pass_rate == 100
+
+
+def test_load_returns_none_before_agent_runs():
+    assert models.load_test_results(
+        {}, StateKeys.TEST_RESULTS, StateKeys.TEST_EXECUTION_SUMMARY
+    ) is None
@@ -0,0 +1,147 @@
+"""
+Unit tests for per-user rate limiting and fair scheduling.
+"""
+
+import asyncio
+
+import pytest
+
+from code_review_assistant.scheduling import (
+    FairScheduler,
+    FairSchedulingMiddleware,
+    QueueTimeout,
+    RateLimitExceeded,
+    TokenBucket,
+)
+
+
+def make_scheduler(**overrides) -> FairScheduler:
+    options = dict(max_concurrent=2, max_concurrent_per_user=1, rate_per_minute=600,
+                   burst=100, max_queue_wait=5.0)
+    options.update(overrides)
+    return FairScheduler(**options)
+
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate=1.0, capacity=2)
+
+    assert bucket.try_acquire()[0]
+    assert bucket.try_acquire()[0]
+    acquired, retry_after = bucket.try_acquire()
+    assert not acquired
+    assert 0 < retry_after <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_rejects_before_queueing():
+    scheduler = make_scheduler(rate_per_minute=1, burst=1)
+
+    async with scheduler.slot("alice"):
+        pass
+    with pytest.raises(RateLimitExceeded) as excinfo:
+        async with scheduler.slot("alice"):
+            pass
+
+    assert excinfo.value.retry_after > 0
+    assert scheduler.metrics()["rate_limited_total"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fair_order_across_users():
+    scheduler = make_scheduler(max_concurrent=1)
+    order = []
+    release = asyncio.Event()
+
+    async def run(user_id: str, tag: str):
+        async with scheduler.slot(user_id):
+            order.append(tag)
+            await release.wait()
+
+    # A heavy user queues three runs before a light user submits one
+    tasks = [asyncio.create_task(run("heavy", f"heavy-{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(run("light", "light-0")))
+    await asyncio.sleep(0)
+
+    # The light user has never been served, so it goes ahead of the backlog
+    assert scheduler.queue_position("light") == 1
+    assert scheduler.queue_position("heavy") == 2
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["heavy-0", "light-0", "heavy-1", "heavy-2"]
+
+
+@pytest.mark.asyncio
+async def test_per_user_concurrency_limit():
+    scheduler = make_scheduler(max_concurrent=4, max_concurrent_per_user=1)
+    entered = asyncio.Event()
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("alice"):
+            entered.set()
+            await release.wait()
+
+    first = asyncio.create_task(hold())
+    await entered.wait()
+    second = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+
+    metrics = scheduler.metrics()
+    assert metrics["active_runs"] == 1
+    assert metrics["users"]["alice"] == {"active": 1, "queued": 1}
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert scheduler.metrics()["admitted_total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout():
+    scheduler = make_scheduler(max_concurrent=1, max_queue_wait=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot("alice"):
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(QueueTimeout):
+        async with scheduler.slot("bob"):
+            pass
+
+    release.set()
+    await holder
+    metrics = scheduler.metrics()
+    assert metrics["queue_timeouts_total"] == 1
+    assert metrics["queued_runs"] == 0 and metrics["active_runs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_reads_camel_case_user_id():
+    scheduler = make_scheduler()
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(scheduler.metrics()["users"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    middleware = FairSchedulingMiddleware(app, scheduler)
+    body = b'{"appName": "code_review_assistant", "userId": "alice", "sessionId": "s1"}'
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await middleware({"type": "http", "method": "POST", "path": "/run"}, receive, send)
+
+    assert seen == [{"alice": {"active": 1, "queued": 0}}]
+    assert sent[0]["status"] == 200